@@ -0,0 +1,170 @@
+"""
+Benchmark del registro de logs en el camino del perfilado.
+
+Compara la configuración original (archivo de texto síncrono con `diagnose=True` y mensajes con
+f-strings) con el modo `LOG_MODE=json` (registros JSON escritos por un hilo en segundo plano, mensajes
+con formato diferido y muestreo de los mensajes de alto volumen). Varios hilos emiten la misma secuencia
+de mensajes que una petición de perfilado: etapas, bloques del modo streaming, subidas a S3, el
+diccionario de rutas generadas y, de vez en cuando, una excepción. Cada configuración se ejecuta en
+un proceso nuevo, porque los manejadores de loguru se configuran una sola vez por proceso.
+
+Ejemplos:
+    python benchmarks/bench_logging.py
+    python benchmarks/bench_logging.py --threads 16 --requests 500 --sample-every INFO=20
+"""
+from typing import Dict, Any, List
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Bloques del modo streaming y archivos subidos a S3 por petición simulada
+CHUNKS_PER_REQUEST = 20
+OBJECTS_PER_REQUEST = 3
+# Una de cada N peticiones registra una excepción
+EXCEPTION_EVERY = 50
+
+
+def _legacy_request(logger, request: int, routes: Dict[str, Any]) -> None:
+    """Mensajes de una petición con el estilo original (f-strings, todo en nivel INFO)."""
+    logger.info(f"Iniciando perfilado para perfil_{request} con SQL: consulta.sql")
+    for chunk in range(1, CHUNKS_PER_REQUEST + 1):
+        logger.info(f"Bloque {chunk} procesado ({chunk * 50_000} filas acumuladas).")
+    logger.info(f"Etapa 'fetch' completada en {0.1234:.3f} s.")
+    for index in range(OBJECTS_PER_REQUEST):
+        logger.info(f"Subiendo {2048} bytes a s3://bucket/profiling/perfil_{request}.{index}.")
+        logger.info(f"Objeto subido exitosamente a profiling/perfil_{request}.{index} en el bucket bucket.")
+    logger.info(f"Etapa 'upload' completada en {0.0567:.3f} s.")
+    logger.info(f"Rutas de los archivos generados: {routes}")
+    if request % EXCEPTION_EVERY == 0:
+        try:
+            {"columns": list(routes)}["rows"]
+        except KeyError:
+            logger.exception("Error inesperado al generar el perfil")
+
+
+def _structured_request(logger, sampled_logger, request: int, routes: Dict[str, Any]) -> None:
+    """Mensajes de una petición con el estilo actual (formato diferido, muestreo y contexto)."""
+    with logger.contextualize(request_id=f"{request:012x}"):
+        logger.info("Iniciando perfilado para {} con SQL: {}", f"perfil_{request}", "consulta.sql")
+        for chunk in range(1, CHUNKS_PER_REQUEST + 1):
+            sampled_logger.info("Bloque {} procesado ({} filas acumuladas).", chunk, chunk * 50_000)
+        logger.bind(stage="fetch", seconds=0.1234).info("Etapa '{}' completada en {:.3f} s.", "fetch", 0.1234)
+        for index in range(OBJECTS_PER_REQUEST):
+            logger.debug("Subiendo {} bytes a s3://{}/{}.", 2048, "bucket", f"profiling/perfil_{request}.{index}")
+            sampled_logger.info("Objeto subido exitosamente a {} en el bucket {}.",
+                                f"profiling/perfil_{request}.{index}", "bucket")
+        logger.bind(stage="upload", seconds=0.0567).info("Etapa '{}' completada en {:.3f} s.", "upload", 0.0567)
+        logger.debug("Rutas de los archivos generados: {}", routes)
+        if request % EXCEPTION_EVERY == 0:
+            try:
+                {"columns": list(routes)}["rows"]
+            except KeyError:
+                logger.exception("Error inesperado al generar el perfil")
+
+
+def _run_case(case: Dict[str, Any]) -> Dict[str, Any]:
+    """Ejecuta una configuración en el proceso actual y mide la latencia de cada petición simulada."""
+    os.environ.update(case["env"])
+    sys.path.insert(0, os.path.join(REPO_ROOT, "src"))
+    # La consola se descarta para medir solo el costo del registro, no el de la terminal
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 2)
+
+    from logger_config import get_logger, get_sampled_logger
+
+    logger = get_logger()
+    sampled_logger = get_sampled_logger()
+    routes = {"REGIÓN": "us-east-1", "BUCKET_NAME": "bucket",
+              **{f"{fmt} path": f"s3://bucket/profiling/20240101_perfil.{fmt.lower()}" for fmt in ("HTML", "JSON", "CSV")}}
+
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def worker(offset: int) -> None:
+        local: List[float] = []
+        for request in range(offset, case["requests"] * case["threads"], case["threads"]):
+            start = time.perf_counter()
+            if case["style"] == "legacy":
+                _legacy_request(logger, request, routes)
+            else:
+                _structured_request(logger, sampled_logger, request, routes)
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(case["threads"])]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    # Espera a que el hilo en segundo plano escriba los mensajes encolados
+    flush_start = time.perf_counter()
+    logger.remove()
+    flush = time.perf_counter() - flush_start
+
+    logs_dir = os.path.join(case["env"]["APPMAINPATH"], "logs")
+    lines = 0
+    for name in os.listdir(logs_dir):
+        with open(os.path.join(logs_dir, name), "rb") as f:
+            lines += sum(1 for _ in f)
+
+    latencies.sort()
+    return {
+        "name": case["name"],
+        "requests": len(latencies),
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+        "flush_seconds": round(flush, 3),
+        "log_lines": lines,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del registro de logs de DataProfiler.")
+    parser.add_argument("--threads", type=int, default=8, help="Hilos que registran mensajes en paralelo.")
+    parser.add_argument("--requests", type=int, default=200, help="Peticiones simuladas por hilo.")
+    parser.add_argument("--sample-every", default="INFO=10",
+                        help="Valor de LOG_SAMPLE_EVERY en el modo JSON (vacío para no muestrear).")
+    parser.add_argument("--output", default=None, help="Archivo JSON donde guardar los resultados.")
+    args = parser.parse_args()
+
+    cases = [
+        {"name": "text (original)", "style": "legacy", "env": {"LOG_MODE": "text"}},
+        {"name": "json + hilo escritor", "style": "structured", "env": {"LOG_MODE": "json", "LOG_SAMPLE_EVERY": ""}},
+        {"name": f"json + hilo escritor + muestreo {args.sample_every}", "style": "structured",
+         "env": {"LOG_MODE": "json", "LOG_SAMPLE_EVERY": args.sample_every}},
+    ]
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for case in cases:
+        case.update(threads=args.threads, requests=args.requests)
+        case["env"]["APPMAINPATH"] = tempfile.mkdtemp(prefix="dataprofiler-bench-logging-")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            result = executor.submit(_run_case, case).result()
+        results.append(result)
+        print(f"{result['name']:<40} {result['requests_per_second']:>10} pet/s  p50 {result['p50_ms']:>8} ms  "
+              f"p99 {result['p99_ms']:>8} ms  vaciado {result['flush_seconds']:>6} s  {result['log_lines']} líneas",
+              flush=True)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({"threads": args.threads, "requests": args.requests, "results": results}, f, indent=4)
+        print(f"Resultados guardados en {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
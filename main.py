@@ -1,32 +1,204 @@
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
+from typing import Literal, Optional, Dict, List, Any
+from contextlib import asynccontextmanager, ExitStack
+from pathlib import Path
+from datetime import datetime, timedelta
+import asyncio
+import time
+import uuid
+_import_start = time.perf_counter()
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, Field, ValidationError, model_validator
 import uvicorn
-from data_profiler import get_df, run_profiling
+from common import timed_stage, bind_request_timings, bind_query_scope, QueryCancelScope
+from data_profiler import (
+    get_df, run_profiling, get_profile_accumulator, run_streaming_profiling,
+    get_pushdown_profile, run_pushdown_profiling, get_incremental_profile, get_data_fingerprint, list_sql_files,
+    STREAM_CHUNKSIZE
+)
+from df_optimizer import optimize_dtypes
+from sharded_profiler import WIDE_SHARD_COLUMNS
+from profile_tiers import choose_profile_tier, tier_settings
+from job_queue import ProfilingJobManager, ProfilingJob, JobState, JobQueueFullError
+from profiling_pool import shutdown_profiling_pool
+from db_manager import engine_registry
+from aws_secrets_handler import secret_cache
+from result_cache import result_cache, cache_key, CacheEntry
+from result_spool import result_spool
+from profile_history import profile_history
+from profile_manifest import profile_manifest
+from query_guard import AdmissionTimeoutError
+from metrics import observe_fetch, count_profile, render_metrics
+from batch_profiler import (
+    run_batch, BatchItemResult, BATCH_MAX_CONCURRENCY, BATCH_MAX_CONCURRENT_FETCHES,
+    BATCH_MAX_CONCURRENT_PROFILES, BATCH_MAX_ITEMS
+)
+from warmup import warm_up, pending_modules, WARMUP_ON_STARTUP
 from logger_config import get_logger
 
+# Duración de la importación de la API y sus dependencias (sin las librerías que se cargan en el primer uso)
+API_IMPORT_SECONDS = round(time.perf_counter() - _import_start, 3)
+
+# Obtener logger
+logger = get_logger()
+
+# Cola de trabajos de perfilado asíncronos
+job_manager = ProfilingJobManager()
+
+# Cada cuánto se comprueba si el cliente de `POST /profile/` sigue conectado
+DISCONNECT_POLL_SECONDS = 1.0
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Calienta el perfilado al iniciar (si está configurado) y libera los recursos compartidos al detener la API."""
+    import_times = {"api": API_IMPORT_SECONDS}
+    if WARMUP_ON_STARTUP:
+        import_times.update(warm_up()["imports"])
+    logger.info("Tiempos de importación al iniciar (s): {}; "
+                "se cargan en el primer uso: {}.", import_times, pending_modules() or 'ninguno')
+    yield
+    job_manager.shutdown(wait=False)
+    shutdown_profiling_pool()
+    engine_registry.dispose_all()
+
 # Inicializar FastAPI
 app = FastAPI(
     title="Data Profiler API",
     description="API para generar perfiles de datos a partir de consultas SQL.",
-    version="1.2.0"
+    version="1.2.0",
+    lifespan=lifespan
 )
 
-# Obtener logger
-logger = get_logger()
-
 # 📌 Modelo de validación con Pydantic
 class ProfileRequest(BaseModel):
     profile_name: str = Field(..., example="market_prod.investments", description="Nombre del perfil a generar.")
     sql_filename: str = Field(default="01_dql_investments.sql", example="01_dql_investments.sql",
                               description="Nombre del archivo SQL en la carpeta /sql/.")
+    mode: Literal["full", "wide", "streaming", "pushdown", "incremental"] = Field(default="full",
+                                               description="'full' carga todo el resultado y genera el reporte de ydata-profiling; "
+                                                           "'wide' carga todo el resultado y perfila grupos de columnas en paralelo (tablas anchas); "
+                                                           "'streaming' lee por bloques y genera solo el resumen JSON/CSV; "
+                                                           "'pushdown' calcula el resumen JSON/CSV con agregaciones en la base de datos; "
+                                                           "'incremental' lee solo las filas nuevas desde la última marca de agua.")
+    profile_tier: Literal["auto", "minimal", "standard", "full"] = Field(default="full",
+                                                                          description="Nivel del reporte de ydata-profiling en modo 'full': "
+                                                                                      "'minimal' solo estadísticas por variable; 'standard' añade correlaciones, "
+                                                                                      "duplicados y el diagrama de barras de faltantes; 'full' añade interacciones "
+                                                                                      "y todas las matrices; 'auto' elige según filas x columnas y los presupuestos.")
+    time_budget_seconds: Optional[float] = Field(default=None, gt=0,
+                                                 description="Duración máxima estimada del reporte para el nivel 'auto' "
+                                                             "(por defecto PROFILE_TIME_BUDGET_SECONDS).")
+    approximate_columns: List[str] = Field(default_factory=list, example=["id", "item"],
+                                           description="Columnas cuyos valores distintos, cuantiles y valores frecuentes se "
+                                                       "estiman con HyperLogLog, KLL y Misra-Gries en modos 'full', 'streaming' "
+                                                       "e 'incremental' ('*' para todas).")
+    shard_columns: int = Field(default=WIDE_SHARD_COLUMNS, gt=0, description="Columnas por grupo en modo 'wide'.")
+    chunksize: int = Field(default=STREAM_CHUNKSIZE, gt=0, description="Filas por bloque en modo 'streaming'.")
+    histogram_bins: int = Field(default=0, ge=0, description="Intervalos de los histogramas numéricos en modo 'pushdown' (0 para omitirlos).")
+    watermark_column: str = Field(default="created_at", description="Columna creciente usada como marca de agua en modo 'incremental'.")
+    reset_state: bool = Field(default=False, description="Descarta el estado incremental guardado y perfila la consulta completa.")
+    fetch_backend: Literal["sqlalchemy", "arrow"] = Field(default="sqlalchemy",
+                                                          description="Lectura del resultado en modos 'full' y 'wide': 'arrow' lee en formato columnar "
+                                                                      "(COPY en PostgreSQL) y guarda el texto como string[pyarrow].")
+    optimize_dtypes: bool = Field(default=True,
+                                  description="En modos 'full' y 'wide', reduce los enteros y convierte a 'category' y a datetime el texto "
+                                              "que ydata-profiling tiparía como categórico o como fecha, antes del perfilado.")
+    outputs: List[Literal["html", "json", "csv"]] = Field(default=["html", "json", "csv"], min_length=1,
+                                                          description="Formatos a generar y subir a S3. 'html' solo aplica en modos 'full' y 'wide'.")
+    fingerprint_column: str = Field(default="updated_at",
+                                    description="Columna cuyo máximo, junto con el número de filas, forma la huella de los datos "
+                                                "para reutilizar un perfil anterior.")
+    use_spool: bool = Field(default=False,
+                            description="En modos 'full' y 'wide', guarda el resultado de la consulta en el spool local de Arrow IPC "
+                                        "y reutiliza el guardado (sin consultar la base) mientras no expire.")
+    over_budget: Optional[Literal["reject", "sample", "queue"]] = Field(default=None,
+                                                                        description="En modos 'full' y 'wide', qué hacer si la memoria estimada del resultado "
+                                                                                    "supera QUERY_MEMORY_BUDGET_MB: 'reject' rechaza la petición, 'sample' perfila "
+                                                                                    "una muestra aleatoria que cabe en el presupuesto y 'queue' espera memoria libre "
+                                                                                    "en el pool del proceso (por defecto QUERY_OVER_BUDGET_ACTION).")
+    force_refresh: bool = Field(default=False, description="Ignora la caché de resultados y el spool, y genera el perfil aunque los datos no hayan cambiado.")
+    run_async: bool = Field(default=False,
+                            description="Si es True, encola el perfilado y devuelve de inmediato el identificador del trabajo.")
+
+class BatchItem(BaseModel):
+    profile_name: str = Field(..., example="market_prod.investments", description="Nombre del perfil a generar.")
+    sql_filename: str = Field(..., example="01_dql_investments.sql", description="Nombre del archivo SQL en la carpeta /sql/.")
+
+class BatchProfileRequest(BaseModel):
+    items: List[BatchItem] = Field(default_factory=list, description="Pares (profile_name, sql_filename) a perfilar.")
+    sql_glob: Optional[str] = Field(default=None, example="market_*.sql",
+                                    description="Patrón glob sobre /sql/; el nombre del perfil es `profile_prefix` + nombre del archivo sin extensión.")
+    profile_prefix: str = Field(default="", description="Prefijo de los nombres de perfil generados con `sql_glob`.")
+    options: Dict[str, Any] = Field(default_factory=dict, example={"mode": "streaming", "outputs": ["json", "csv"]},
+                                    description="Campos de `POST /profile/` aplicados a todos los elementos (salvo `run_async`).")
+    max_concurrency: int = Field(default=BATCH_MAX_CONCURRENCY, ge=1, description="Elementos procesados a la vez.")
+    max_concurrent_fetches: int = Field(default=BATCH_MAX_CONCURRENT_FETCHES, ge=1, description="Lecturas simultáneas de la base de datos.")
+    max_concurrent_profiles: int = Field(default=BATCH_MAX_CONCURRENT_PROFILES, ge=1, description="Reportes generados simultáneamente.")
+
+    @model_validator(mode="after")
+    def check_items(self):
+        """Exige al menos un par o un patrón glob."""
+        if not self.items and not self.sql_glob:
+            raise ValueError("Debe indicar 'items' o 'sql_glob'.")
+        return self
 
-def process_profiling(profile_request: ProfileRequest):
+def _unused_tier(profile_request: ProfileRequest) -> Optional[Dict[str, Any]]:
+    """
+    Indica que se pidió `profile_tier` en un modo que no lo usa.
+
+    Args:
+        profile_request (ProfileRequest): Datos validados de la petición.
+
+    Returns:
+        Optional[Dict[str, Any]]: Nivel pedido y motivo, o None si el modo es 'full' o no se pidió un nivel.
+    """
+    if profile_request.mode == "full" or "profile_tier" not in profile_request.model_fields_set:
+        return None
+    return {"requested": profile_request.profile_tier, "tier": None,
+            "reason": f"profile_tier solo aplica en modo 'full'; el modo '{profile_request.mode}' no lo usa"}
+
+
+def _build_message(profile_request: ProfileRequest, columns: List[str], rows: int,
+                   profiling_message: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Construye la respuesta de un perfilado.
+
+    Args:
+        profile_request (ProfileRequest): Datos validados de la petición.
+        columns (List[str]): Columnas perfiladas.
+        rows (int): Filas perfiladas.
+        profiling_message (Dict[str, Any]): Rutas en S3 de los archivos generados.
+
+    Returns:
+        Dict[str, Any]: Mensaje de respuesta.
+    """
+    return {
+        "message": f"Perfil generado correctamente para {profile_request.profile_name}",
+        "profile_name": profile_request.profile_name,
+        "sql_filename": profile_request.sql_filename,
+        "mode": profile_request.mode,
+        "columns": columns,
+        "rows": rows,
+        "columns_count": len(columns),
+        "profile_path": f"/app/profiles/{profile_request.profile_name}.html",
+        "profiling_message": profiling_message
+    }
+
+def process_profiling(profile_request: ProfileRequest, timings: Optional[Dict[str, float]] = None,
+                      cancel_scope: Optional[QueryCancelScope] = None):
     """
     Función que ejecuta el proceso de perfilado de datos.
 
+    Los logs emitidos durante la petición llevan un `request_id` propio (y el `job_id` si se ejecuta
+    como trabajo asíncrono).
+
     Args:
         profile_request (ProfileRequest): Datos validados de la petición.
+        timings (Optional[Dict[str, float]]): Diccionario donde se registra la duración de cada etapa.
+        cancel_scope (Optional[QueryCancelScope]): Alcance con el que se cancelan las consultas en curso
+            de la petición (por ejemplo, si el cliente se desconecta).
 
     Returns:
         str: Mensaje de éxito.
@@ -34,61 +206,435 @@ def process_profiling(profile_request: ProfileRequest):
     Raises:
         HTTPException: Si hay errores en la ejecución.
     """
+    with logger.contextualize(request_id=uuid.uuid4().hex[:12]):
+        return _process_profiling(profile_request, timings, cancel_scope)
+
+def _process_profiling(profile_request: ProfileRequest, timings: Optional[Dict[str, float]] = None,
+                       cancel_scope: Optional[QueryCancelScope] = None):
+    """Ejecuta el perfilado de una petición (ver `process_profiling`)."""
+    timings = {} if timings is None else timings
+    bind_request_timings(timings)
+    bind_query_scope(cancel_scope)
+    # Mantiene la reserva de memoria del resultado hasta terminar el perfilado
+    admission = ExitStack()
     try:
-        logger.info(f"Iniciando perfilado para {profile_request.profile_name} con SQL: {profile_request.sql_filename}")
+        logger.info("Iniciando perfilado para {} con SQL: {}", profile_request.profile_name, profile_request.sql_filename)
+        memory, optimization, tier, spool, query_guard, sample = None, None, None, None, None, None
+        unused_tier = _unused_tier(profile_request)
+
+        # Reutilizar el perfil anterior si la consulta y la huella de los datos no cambiaron
+        entry_key, fingerprint = None, None
+        if profile_request.mode != "incremental" and result_cache.enabled:
+            with timed_stage(timings, "fingerprint"):
+                sql_hash, fingerprint = get_data_fingerprint(profile_request.sql_filename, profile_request.fingerprint_column)
+            if fingerprint is not None:
+                options = {"mode": profile_request.mode, "outputs": sorted(profile_request.outputs),
+                           "histogram_bins": profile_request.histogram_bins}
+                if profile_request.mode in ("full", "wide"):
+                    options["fetch_backend"] = profile_request.fetch_backend
+                    options["optimize_dtypes"] = profile_request.optimize_dtypes
+                if profile_request.mode == "wide":
+                    options["shard_columns"] = profile_request.shard_columns
+                if profile_request.mode == "streaming":
+                    options["chunksize"] = profile_request.chunksize
+                if profile_request.approximate_columns:
+                    options["approximate_columns"] = sorted(profile_request.approximate_columns)
+                if profile_request.mode == "full":
+                    options["profile_tier"] = profile_request.profile_tier
+                    options["time_budget_seconds"] = profile_request.time_budget_seconds
+                entry_key = cache_key(sql_hash, profile_request.profile_name, options)
+                cached = None if profile_request.force_refresh else result_cache.get(entry_key, fingerprint)
+                if cached is not None:
+                    message = _build_message(profile_request, cached.columns, cached.rows, cached.profiling_message)
+                    message["cache"] = {"hit": True, "fingerprint": fingerprint, "created_at": cached.created_at.isoformat()}
+                    if (cached.profile_tier or unused_tier) is not None:
+                        message["profile_tier"] = cached.profile_tier or unused_tier
+                    message["timings"] = dict(timings)
+                    count_profile(profile_request.mode, "cached")
+                    return message
+
+        if profile_request.mode == "streaming":
+            # Perfilar por bloques sin materializar el resultado completo
+            with timed_stage(timings, "fetch"):
+                accumulator = get_profile_accumulator(profile_request.sql_filename, profile_request.chunksize,
+                                                      profile_request.approximate_columns)
+            observe_fetch(profile_request.mode, accumulator.n_rows)
+            if accumulator.n_rows == 0:
+                raise ValueError("La consulta no devolvió filas. Verifique la consulta SQL.")
+
+            profiling_message = run_streaming_profiling(accumulator, profile_request.profile_name, timings,
+                                                        profile_request.outputs)
+            columns, rows = list(accumulator.columns), accumulator.n_rows
+        elif profile_request.mode == "incremental":
+            # Perfilar solo las filas nuevas y combinarlas con el estado guardado
+            with timed_stage(timings, "fetch"):
+                accumulator, incremental = get_incremental_profile(
+                    profile_request.sql_filename, profile_request.profile_name, profile_request.watermark_column,
+                    profile_request.chunksize, profile_request.reset_state, profile_request.approximate_columns
+                )
+            observe_fetch(profile_request.mode, incremental["delta_rows"])
+            if accumulator.n_rows == 0:
+                raise ValueError("La consulta no devolvió filas. Verifique la consulta SQL.")
+
+            profiling_message = {**run_streaming_profiling(accumulator, profile_request.profile_name, timings,
+                                                           profile_request.outputs),
+                                 "incremental": incremental}
+            columns, rows = list(accumulator.columns), accumulator.n_rows
+        elif profile_request.mode == "pushdown":
+            # Calcular las estadísticas dentro de la base de datos
+            with timed_stage(timings, "fetch"):
+                report = get_pushdown_profile(profile_request.sql_filename, profile_request.histogram_bins)
+            observe_fetch(profile_request.mode, report["table"]["n"])
+            if report["table"]["n"] == 0:
+                raise ValueError("La consulta no devolvió filas. Verifique la consulta SQL.")
+
+            profiling_message = run_pushdown_profiling(report, profile_request.profile_name, timings,
+                                                       profile_request.outputs)
+            columns, rows = list(report["variables"]), report["table"]["n"]
+        else:
+            # Obtener DataFrame desde la consulta SQL
+            with timed_stage(timings, "fetch"):
+                df = get_df(profile_request.sql_filename, profile_request.fetch_backend, profile_request.use_spool,
+                            profile_request.force_refresh, profile_request.over_budget, admission)
+            if cancel_scope is not None:
+                cancel_scope.raise_if_cancelled()
+            spool, query_guard = df.attrs.get("spool"), df.attrs.get("query_guard")
+            sample = query_guard if query_guard is not None and query_guard["action"] == "sample" else None
+            observe_fetch(profile_request.mode, df.shape[0], int(df.memory_usage(index=False, deep=True).sum()))
+            if df.empty:
+                raise ValueError("El DataFrame está vacío. Verifique la consulta SQL.")
 
-        # Obtener DataFrame desde la consulta SQL
-        df = get_df(profile_request.sql_filename)
-        if df.empty:
-            raise ValueError("El DataFrame está vacío. Verifique la consulta SQL.")
+            # Los tipos se optimizan con la configuración del nivel: de ella depende cómo tipa ydata-profiling
+            if profile_request.mode == "full":
+                tier = choose_profile_tier(df, profile_request.profile_tier, profile_request.time_budget_seconds)
+            if profile_request.optimize_dtypes:
+                with timed_stage(timings, "optimize"):
+                    df, optimization = optimize_dtypes(df, tier_settings(tier["tier"]) if tier else None)
 
-        # Ejecutar el perfilado
-        profiling_message = run_profiling(df, profile_request.profile_name)
+            # Ejecutar el perfilado
+            if profile_request.mode == "wide":
+                profiling_message = run_profiling(df, profile_request.profile_name, timings, profile_request.outputs,
+                                                  shard_columns=profile_request.shard_columns, sample=sample)
+            else:
+                profiling_message = run_profiling(df, profile_request.profile_name, timings, profile_request.outputs,
+                                                  tier=tier["tier"], approximate_columns=profile_request.approximate_columns,
+                                                  sample=sample)
+            columns, rows = df.columns.tolist(), df.shape[0]
+            memory = df.attrs.get("arrow_memory")
 
-        logger.info(f"Perfil generado exitosamente para {profile_request.profile_name}")
+        logger.info("Perfil generado exitosamente para {}", profile_request.profile_name)
         
-        message = {
-            "message": f"Perfil generado correctamente para {profile_request.profile_name}",
-            "profile_name": profile_request.profile_name,
-            "sql_filename": profile_request.sql_filename,
-            "columns": df.columns.tolist(),
-            "rows": df.shape[0],
-            "columns_count": df.shape[1],
-            "profile_path": f"/app/profiles/{profile_request.profile_name}.html",
-            "profiling_message": profiling_message
-        }
+        message = _build_message(profile_request, columns, rows, profiling_message)
+        # El perfil de una muestra no se reutiliza como perfil de la consulta completa
+        if sample is not None:
+            entry_key = None
+        # Tampoco un perfil con archivos que no se subieron a S3
+        if profiling_message.get("failed_uploads"):
+            entry_key = None
+        if entry_key is not None:
+            result_cache.put(CacheEntry(key=entry_key, profile_name=profile_request.profile_name, sql_hash=sql_hash,
+                                        fingerprint=fingerprint, columns=columns, rows=rows,
+                                        profiling_message=profiling_message, profile_tier=tier))
+            message["cache"] = {"hit": False, "fingerprint": fingerprint}
+        if memory is not None:
+            message["memory"] = memory
+        if optimization is not None:
+            message["dtype_optimization"] = optimization
+        if (tier or unused_tier) is not None:
+            message["profile_tier"] = tier or unused_tier
+        if spool is not None:
+            message["spool"] = spool
+        if query_guard is not None:
+            message["query_guard"] = query_guard
+        message["timings"] = dict(timings)
+        count_profile(profile_request.mode, "succeeded")
         
         return message
 
     except FileNotFoundError:
-        logger.error(f"Archivo SQL '{profile_request.sql_filename}' no encontrado.")
+        logger.error("Archivo SQL '{}' no encontrado.", profile_request.sql_filename)
+        count_profile(profile_request.mode, "failed")
         raise HTTPException(status_code=404, detail=f"El archivo SQL '{profile_request.sql_filename}' no existe.")
 
     except ValueError as ve:
-        logger.warning(f"Advertencia: {str(ve)}")
+        logger.warning("Advertencia: {}", str(ve))
+        count_profile(profile_request.mode, "failed")
         raise HTTPException(status_code=400, detail=str(ve))
 
+    except AdmissionTimeoutError as e:
+        logger.warning("Advertencia: {}", str(e))
+        count_profile(profile_request.mode, "failed")
+        raise HTTPException(status_code=503, detail=str(e))
+
     except Exception as e:
-        logger.error(f"Error inesperado al generar el perfil: {str(e)}")
+        if cancel_scope is not None and cancel_scope.cancelled:
+            logger.warning("Perfilado de {} cancelado: {}", profile_request.profile_name, str(e))
+            count_profile(profile_request.mode, "cancelled")
+            # 499: el cliente cerró la conexión (nadie recibe esta respuesta)
+            raise HTTPException(status_code=499, detail="La petición fue cancelada porque el cliente se desconectó.")
+        logger.error("Error inesperado al generar el perfil: {}", str(e))
+        count_profile(profile_request.mode, "failed")
         raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
 
+    finally:
+        admission.close()
+        bind_query_scope(None)
+        bind_request_timings(None)
+
 @app.post("/profile/")
-def generate_profile(profile_request: ProfileRequest):
+async def generate_profile(profile_request: ProfileRequest, request: Request):
     """
     Endpoint para generar un perfil de datos.
 
     - Obtiene los datos desde un archivo SQL.
     - Ejecuta el perfilado con `run_profiling()`.
+    - Si `run_async` es True, encola el trabajo y responde con 202 y el identificador del trabajo.
+    - Si el cliente se desconecta antes de la respuesta, cancela las consultas en curso en la base de datos.
     
     Args:
         profile_request (ProfileRequest): Datos validados mediante Pydantic.
+        request (Request): Petición HTTP, para detectar la desconexión del cliente.
 
     Returns:
         dict: Mensaje de éxito o error.
     """
-    message = process_profiling(profile_request)
+    if profile_request.run_async:
+        try:
+            job = job_manager.submit(process_profiling, profile_request)
+        except JobQueueFullError as e:
+            logger.warning("Advertencia: {}", str(e))
+            raise HTTPException(status_code=429, detail=str(e))
+
+        return JSONResponse(status_code=202, content={
+            "job_id": job.job_id,
+            "state": job.state.value,
+            "status_url": f"/profile/{job.job_id}"
+        })
+
+    cancel_scope = QueryCancelScope()
+    task = asyncio.ensure_future(run_in_threadpool(process_profiling, profile_request, None, cancel_scope))
+    while not task.done():
+        await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+        if not task.done() and await request.is_disconnected():
+            cancelled = cancel_scope.cancel()
+            logger.warning("El cliente se desconectó; se cancelan {} consultas en curso de "
+                           "{}.", cancelled, profile_request.profile_name)
+            break
+    message = await task
     return {"message": message}
 
+@app.post("/profile/batch")
+def generate_profile_batch(batch_request: BatchProfileRequest):
+    """
+    Endpoint para perfilar varios archivos SQL en una sola petición.
+
+    - Acepta una lista de pares (profile_name, sql_filename) y/o un patrón glob sobre /sql/.
+    - Comparte la caché de secretos, el pool de conexiones y el cliente de S3 entre todos los elementos.
+    - Ejecuta los perfilados en paralelo con límites de concurrencia para la lectura y el reporte.
+    - Devuelve el resultado de cada elemento, incluidos los que fallaron.
+
+    Args:
+        batch_request (BatchProfileRequest): Datos validados mediante Pydantic.
+
+    Returns:
+        dict: Totales del lote y resultado por elemento.
+    """
+    pairs = [(item.profile_name, item.sql_filename) for item in batch_request.items]
+    if batch_request.sql_glob:
+        try:
+            sql_filenames = list_sql_files(batch_request.sql_glob)
+        except ValueError as ve:
+            raise HTTPException(status_code=400, detail=str(ve))
+        if not sql_filenames:
+            raise HTTPException(status_code=404, detail=f"Ningún archivo SQL coincide con '{batch_request.sql_glob}'.")
+        pairs += [(f"{batch_request.profile_prefix}{Path(sql_filename).stem}", sql_filename) for sql_filename in sql_filenames]
+
+    if len(pairs) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"El lote tiene {len(pairs)} elementos; el máximo es {BATCH_MAX_ITEMS}.")
+
+    try:
+        requests = [
+            ProfileRequest(**{**batch_request.options, "profile_name": profile_name,
+                              "sql_filename": sql_filename, "run_async": False})
+            for profile_name, sql_filename in pairs
+        ]
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=f"Opciones de perfilado inválidas: {e}")
+
+    start = time.perf_counter()
+    results: List[BatchItemResult] = run_batch(
+        process_profiling, requests, batch_request.max_concurrency,
+        batch_request.max_concurrent_fetches, batch_request.max_concurrent_profiles
+    )
+    failed = sum(1 for result in results if result.status == "failed")
+    return {
+        "total": len(results),
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "seconds": round(time.perf_counter() - start, 4),
+        "items": [result.model_dump() for result in results],
+    }
+
+@app.get("/profile/", response_model=List[ProfilingJob])
+def list_profile_jobs(state: Optional[JobState] = None, limit: int = 100):
+    """
+    Endpoint para listar los trabajos de perfilado asíncronos más recientes.
+
+    Args:
+        state (Optional[JobState]): Estado por el que filtrar.
+        limit (int): Número máximo de trabajos a devolver.
+
+    Returns:
+        List[ProfilingJob]: Trabajos con su estado, tiempos por etapa y resultado.
+    """
+    return job_manager.list(state=state, limit=limit)
+
+@app.get("/profile/{job_id}", response_model=ProfilingJob)
+def get_profile_job(job_id: str):
+    """
+    Endpoint para consultar el estado de un trabajo de perfilado asíncrono.
+
+    Args:
+        job_id (str): Identificador devuelto por `POST /profile/`.
+
+    Returns:
+        ProfilingJob: Estado, tiempos por etapa y rutas en S3 del resultado.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"El trabajo '{job_id}' no existe.")
+    return job
+
+@app.get("/profiles")
+def list_profiles(profile_name: Optional[str] = None, limit: int = 20, refresh: bool = False):
+    """
+    Endpoint para consultar los perfiles generados y sus archivos en S3 con una sola lectura del manifiesto.
+
+    Args:
+        profile_name (Optional[str]): Perfil a consultar. Si no se indica, se devuelven todos.
+        limit (int): Ejecuciones más recientes por perfil.
+        refresh (bool): Reconstruir antes el manifiesto desde el listado completo del bucket.
+
+    Returns:
+        dict: Fecha de actualización del manifiesto y, por perfil, sus ejecuciones con la ruta y el tamaño de cada archivo.
+    """
+    if not profile_manifest.enabled:
+        raise HTTPException(status_code=404, detail="El manifiesto de perfiles está desactivado.")
+    try:
+        if refresh:
+            profile_manifest.rebuild()
+        return profile_manifest.lookup(profile_name=profile_name, limit=limit)
+    except Exception as e:
+        logger.exception("Error al consultar el manifiesto de perfiles")
+        raise HTTPException(status_code=502, detail=f"No se pudo leer el manifiesto de perfiles: {e}")
+
+@app.get("/history/{profile_name}")
+def list_profile_runs(profile_name: str, limit: int = 100):
+    """
+    Endpoint para listar las ejecuciones guardadas en el historial de un perfil.
+
+    Args:
+        profile_name (str): Nombre del perfil.
+        limit (int): Número máximo de ejecuciones a devolver.
+
+    Returns:
+        List[dict]: Fecha, filas, columnas y rutas en S3 de cada ejecución, de la más reciente a la más antigua.
+    """
+    return profile_history.runs(profile_name, limit=limit)
+
+@app.get("/history/{profile_name}/trend")
+def get_profile_trend(profile_name: str, column: str, metrics: str = "p_missing,n_distinct,mean,std",
+                      since: Optional[datetime] = None, until: Optional[datetime] = None,
+                      days: Optional[int] = None):
+    """
+    Endpoint para consultar la evolución de las estadísticas de una columna entre ejecuciones.
+
+    Args:
+        profile_name (str): Nombre del perfil.
+        column (str): Columna perfilada.
+        metrics (str): Estadísticas separadas por coma (por ejemplo `p_missing,mean,50%`).
+        since (Optional[datetime]): Fecha mínima de ejecución.
+        until (Optional[datetime]): Fecha máxima de ejecución.
+        days (Optional[int]): Alternativa a `since`: ejecuciones de los últimos N días.
+
+    Returns:
+        dict: Perfil, columna y un punto por ejecución en orden cronológico.
+    """
+    if days is not None:
+        since = datetime.now() - timedelta(days=days)
+    try:
+        points = profile_history.trend(profile_name, column, [m.strip() for m in metrics.split(",") if m.strip()],
+                                       since=since, until=until)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    if not points:
+        raise HTTPException(status_code=404, detail=f"No hay historial de la columna '{column}' en el perfil '{profile_name}'.")
+    return {"profile_name": profile_name, "column": column, "points": points}
+
+@app.get("/history/{profile_name}/drift")
+def get_profile_drift(profile_name: str, base_run: Optional[datetime] = None, target_run: Optional[datetime] = None):
+    """
+    Endpoint para comparar las estadísticas por columna de dos ejecuciones de un perfil.
+
+    Args:
+        profile_name (str): Nombre del perfil.
+        base_run (Optional[datetime]): Ejecución base. Por defecto, la penúltima.
+        target_run (Optional[datetime]): Ejecución comparada. Por defecto, la última.
+
+    Returns:
+        dict: Medidas de deriva por columna y columnas que superan los umbrales.
+    """
+    try:
+        return profile_history.drift(profile_name,
+                                     base_run=base_run.isoformat() if base_run else None,
+                                     target_run=target_run.isoformat() if target_run else None)
+    except ValueError as ve:
+        raise HTTPException(status_code=404, detail=str(ve))
+
+@app.get("/cache/secrets")
+def get_secret_cache_stats():
+    """
+    Endpoint para consultar los contadores de la caché de secretos.
+
+    Returns:
+        dict: Aciertos, fallos, invalidaciones y entradas de la caché.
+    """
+    return secret_cache.stats()
+
+@app.get("/cache/results")
+def get_result_cache_stats():
+    """
+    Endpoint para consultar los contadores de la caché de resultados de perfilado.
+
+    Returns:
+        dict: Aciertos, fallos, entradas y límites de la caché.
+    """
+    return result_cache.stats()
+
+@app.get("/cache/spool")
+def get_result_spool_stats():
+    """
+    Endpoint para consultar los contadores del spool local de resultados de consultas.
+
+    Returns:
+        dict: Aciertos, fallos, entradas, bytes usados y límites del spool.
+    """
+    return result_spool.stats()
+
+@app.get("/metrics")
+def get_metrics():
+    """
+    Endpoint de métricas en formato Prometheus.
+
+    Incluye duración y pico de memoria por etapa, fallas por etapa y tipo de excepción,
+    filas y bytes leídos por modo y perfilados terminados por resultado.
+
+    Returns:
+        Response: Exposición de métricas en texto.
+    """
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
+
 # 📌 Ejecutar el servidor Uvicorn al ejecutar el script directamente
 if __name__ == "__main__":
     logger.info("Iniciando API con Uvicorn en http://0.0.0.0:8000 🚀")
@@ -0,0 +1,141 @@
+from typing import List, Optional, Dict, Any
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from logger_config import get_logger
+
+# Configuración de logs
+logger = get_logger()
+
+# Tamaño aproximado de un `str` vacío y de un `Decimal` de CPython, más el puntero del arreglo object
+PY_STR_OVERHEAD = 49
+PY_DECIMAL_SIZE = 104
+POINTER_SIZE = 8
+
+
+def write_ipc(df: pd.DataFrame, path: str) -> int:
+    """
+    Escribe un DataFrame en un archivo Arrow IPC sin compresión, apto para memory-mapping.
+
+    Args:
+        df (pd.DataFrame): DataFrame a escribir.
+        path (str): Ruta del archivo destino.
+
+    Returns:
+        int: Tamaño en bytes del archivo escrito.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        size = sink.tell()
+    logger.debug("DataFrame de {} filas escrito en formato Arrow IPC en {} ({} bytes).", df.shape[0], path, size)
+    return size
+
+
+def read_ipc(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Lee un archivo Arrow IPC mediante memory-mapping.
+
+    Los buffers se leen directamente desde el mapa de memoria, sin deserializar el archivo completo.
+
+    Args:
+        path (str): Ruta del archivo Arrow IPC.
+        columns (Optional[List[str]]): Subconjunto de columnas a leer. Por defecto, todas.
+
+    Returns:
+        pd.DataFrame: DataFrame reconstruido.
+    """
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select(columns)
+        return table.to_pandas()
+
+
+def _is_string(data_type: pa.DataType) -> bool:
+    """Indica si un tipo Arrow es texto."""
+    return pa.types.is_string(data_type) or pa.types.is_large_string(data_type)
+
+
+def _pandas_type(data_type: pa.DataType) -> Optional[Any]:
+    """
+    Elige el dtype de pandas de cada columna Arrow.
+
+    El texto se mantiene respaldado por Arrow (`string[pyarrow]`); los enteros y booleanos con nulos usan
+    los dtypes anulables de pandas y el resto la conversión por defecto, porque ydata-profiling no
+    reconoce como numéricas ni como fechas las columnas `ArrowDtype`.
+    """
+    if _is_string(data_type):
+        return pd.ArrowDtype(data_type)
+    if pa.types.is_integer(data_type):
+        return pd.Int64Dtype()
+    if pa.types.is_boolean(data_type):
+        return pd.BooleanDtype()
+    return None
+
+
+def arrow_to_pandas(table: pa.Table) -> pd.DataFrame:
+    """
+    Convierte una tabla Arrow en un DataFrame con el texto respaldado por Arrow.
+
+    Los decimales se convierten a `float64` y las fechas a `datetime64`, igual que en el perfilado por bloques.
+
+    Args:
+        table (pa.Table): Tabla Arrow.
+
+    Returns:
+        pd.DataFrame: DataFrame con columnas `string[pyarrow]` para el texto.
+    """
+    for index, field in enumerate(table.schema):
+        if pa.types.is_decimal(field.type):
+            table = table.set_column(index, field.name, pc.cast(table.column(index), pa.float64()))
+        elif pa.types.is_date(field.type):
+            table = table.set_column(index, field.name, pc.cast(table.column(index), pa.timestamp("ms")))
+    return table.to_pandas(types_mapper=_pandas_type)
+
+
+def estimate_object_memory(table: pa.Table) -> int:
+    """
+    Estima la memoria que ocuparía la tabla como DataFrame con columnas `object` (lectura con SQLAlchemy).
+
+    Args:
+        table (pa.Table): Tabla Arrow.
+
+    Returns:
+        int: Bytes estimados.
+    """
+    total = 0
+    for column in table.columns:
+        n_values = len(column) - column.null_count
+        if _is_string(column.type):
+            text_bytes = sum(chunk.buffers()[2].size for chunk in column.chunks if chunk.buffers()[2] is not None)
+            total += len(column) * POINTER_SIZE + n_values * PY_STR_OVERHEAD + text_bytes
+        elif pa.types.is_decimal(column.type):
+            total += len(column) * POINTER_SIZE + n_values * PY_DECIMAL_SIZE
+        else:
+            total += len(column) * POINTER_SIZE
+    return total
+
+
+def memory_report(table: pa.Table, df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Compara la memoria del DataFrame respaldado por Arrow con la estimada para columnas `object`.
+
+    Args:
+        table (pa.Table): Tabla Arrow leída.
+        df (pd.DataFrame): DataFrame resultante de `arrow_to_pandas`.
+
+    Returns:
+        Dict[str, Any]: Filas, bytes del DataFrame, bytes estimados con `object` y ahorro.
+    """
+    df_bytes = int(df.memory_usage(index=False, deep=True).sum())
+    object_bytes = estimate_object_memory(table)
+    saved_bytes = max(object_bytes - df_bytes, 0)
+    return {
+        "rows": table.num_rows,
+        "dataframe_bytes": df_bytes,
+        "object_bytes_estimate": object_bytes,
+        "saved_bytes": saved_bytes,
+        "saved_pct": round(100 * saved_bytes / object_bytes, 2) if object_bytes else 0.0,
+    }
@@ -1,14 +1,36 @@
 
-import boto3
+from typing import Dict, Optional, Union, List, Tuple, Any
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import io
+import os
+import string
+import threading
 from botocore.exceptions import (
     NoCredentialsError,
     PartialCredentialsError,
     ClientError,
 )
-from logger_config import get_logger
+from logger_config import get_logger, get_sampled_logger
 
 # Configuración de logs
 logger = get_logger()
+# Mensajes por objeto, muestreados según LOG_SAMPLE_EVERY
+sampled_logger = get_sampled_logger()
+
+S3_MULTIPART_CHUNKSIZE_MB = int(os.environ.get('S3_MULTIPART_CHUNKSIZE_MB', 8))
+S3_MAX_CONCURRENCY = int(os.environ.get('S3_MAX_CONCURRENCY', 10))
+S3_UPLOAD_WORKERS = int(os.environ.get('S3_UPLOAD_WORKERS', 4))
+S3_LIST_WORKERS = int(os.environ.get('S3_LIST_WORKERS', 32))
+# Caracteres usados como límites al dividir un rango de claves en subrangos que se listan en paralelo.
+# Las claves con otros caracteres también se listan: solo quedan en el subrango vecino.
+LIST_SHARD_ALPHABET = sorted(string.digits + string.ascii_lowercase)
+
+# Tipo de contenido según la extensión del objeto
+CONTENT_TYPES: Dict[str, str] = {
+    "html": "text/html; charset=utf-8",
+    "json": "application/json",
+    "csv": "text/csv; charset=utf-8",
+}
 
 def handle_s3_exceptions(func):
     """Decorador para manejar excepciones de boto3 en operaciones con S3."""
@@ -26,10 +48,10 @@ def handle_s3_exceptions(func):
             return False
         except ClientError as e:
             error_code = e.response['Error']['Code']
-            logger.error(f"Error en {func.__name__}: {error_code} - {e}")
+            logger.error("Error en {}: {} - {}", func.__name__, error_code, e)
             return False
         except Exception as e:
-            logger.error(f"Error inesperado en {func.__name__}: {e}")
+            logger.error("Error inesperado en {}: {}", func.__name__, e)
             return False
     return wrapper
 
@@ -38,15 +60,37 @@ class S3Manager:
     Clase para manejar operaciones de Amazon S3 (Subida, Descarga y Creación de Buckets).
     """
 
-    def __init__(self, region_name: str = "us-east-1"):
+    def __init__(self, region_name: str = "us-east-1", multipart_chunksize_mb: int = S3_MULTIPART_CHUNKSIZE_MB,
+                 max_concurrency: int = S3_MAX_CONCURRENCY, upload_workers: int = S3_UPLOAD_WORKERS):
         """
         Inicializa el cliente de S3.
 
         :param region_name: Región de AWS donde se trabajará con S3.
+        :param multipart_chunksize_mb: Tamaño en MB de cada parte de las subidas multiparte.
+        :param max_concurrency: Partes de un mismo objeto que se suben en paralelo.
+        :param upload_workers: Objetos que `upload_many` sube en paralelo.
         """
+        # boto3 se importa al crear el primer cliente para no cargarlo al iniciar la API
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+        from botocore.config import Config
+
         self.region_name = region_name
-        self.s3 = boto3.client("s3", region_name=self.region_name)
-        logger.info(f"Cliente S3 inicializado en la región {self.region_name}.")
+        self.upload_workers = max(1, upload_workers)
+        chunksize = multipart_chunksize_mb * 1024 * 1024
+        self.transfer_config = TransferConfig(
+            multipart_threshold=chunksize,
+            multipart_chunksize=chunksize,
+            max_concurrency=max_concurrency,
+        )
+        # El pool de conexiones debe admitir todas las partes de todos los objetos en curso
+        # y todas las páginas de un listado en paralelo
+        self.s3 = boto3.client(
+            "s3",
+            region_name=self.region_name,
+            config=Config(max_pool_connections=max(10, max_concurrency * self.upload_workers, S3_LIST_WORKERS)),
+        )
+        logger.info("Cliente S3 inicializado en la región {}.", self.region_name)
 
     @handle_s3_exceptions
     def upload_file(self, local_path: str, bucket_name: str, s3_path: str) -> bool:
@@ -58,11 +102,58 @@ class S3Manager:
         :param s3_path: Ruta en S3 donde se subirá el archivo.
         :return: True si la operación es exitosa, False en caso contrario.
         """
-        logger.info(f"Subiendo {local_path} a s3://{bucket_name}/{s3_path}.")
+        logger.info("Subiendo {} a s3://{}/{}.", local_path, bucket_name, s3_path)
         self.s3.upload_file(local_path, bucket_name, s3_path)
-        logger.info(f"Archivo {local_path} subido exitosamente a {s3_path} en el bucket {bucket_name}.")
+        logger.info("Archivo {} subido exitosamente a {} en el bucket {}.", local_path, s3_path, bucket_name)
         return True
 
+    @handle_s3_exceptions
+    def upload_bytes(self, data: Union[bytes, str], bucket_name: str, s3_path: str,
+                     content_type: Optional[str] = None) -> bool:
+        """
+        Sube un objeto a S3 desde memoria, en partes paralelas si supera el tamaño de parte.
+
+        :param data: Contenido del objeto (los textos se codifican en UTF-8).
+        :param bucket_name: Nombre del bucket de S3.
+        :param s3_path: Ruta en S3 donde se subirá el objeto.
+        :param content_type: Tipo de contenido; por defecto se deduce de la extensión.
+        :return: True si la operación es exitosa, False en caso contrario.
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if content_type is None:
+            content_type = CONTENT_TYPES.get(s3_path.rsplit(".", 1)[-1].lower())
+        extra_args = {"ContentType": content_type} if content_type else None
+
+        logger.debug("Subiendo {} bytes a s3://{}/{}.", len(data), bucket_name, s3_path)
+        self.s3.upload_fileobj(io.BytesIO(data), bucket_name, s3_path,
+                               ExtraArgs=extra_args, Config=self.transfer_config)
+        sampled_logger.info("Objeto subido exitosamente a {} en el bucket {}.", s3_path, bucket_name)
+        return True
+
+    def upload_many(self, objects: Dict[str, Union[bytes, str]], bucket_name: str) -> Dict[str, bool]:
+        """
+        Sube en paralelo varios objetos a S3 desde memoria.
+
+        :param objects: Ruta en S3 -> contenido del objeto.
+        :param bucket_name: Nombre del bucket de S3.
+        :return: Ruta en S3 -> True si el objeto se subió, False en caso contrario.
+        """
+        if not objects:
+            return {}
+        workers = min(self.upload_workers, len(objects))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="s3-upload") as executor:
+            futures = {
+                s3_path: executor.submit(self.upload_bytes, data, bucket_name, s3_path)
+                for s3_path, data in objects.items()
+            }
+            results = {s3_path: future.result() for s3_path, future in futures.items()}
+
+        failed = [s3_path for s3_path, ok in results.items() if not ok]
+        if failed:
+            logger.error("No se pudieron subir {} de {} objetos: {}", len(failed), len(objects), failed)
+        return results
+
     @handle_s3_exceptions
     def download_file(self, bucket_name: str, s3_path: str, local_path: str) -> bool:
         """
@@ -73,9 +164,9 @@ class S3Manager:
         :param local_path: Ruta donde se guardará el archivo localmente.
         :return: True si la operación es exitosa, False en caso contrario.
         """
-        logger.info(f"Descargando {s3_path} de s3://{bucket_name} a {local_path}.")
+        logger.info("Descargando {} de s3://{} a {}.", s3_path, bucket_name, local_path)
         self.s3.download_file(bucket_name, s3_path, local_path)
-        logger.info(f"Archivo {s3_path} descargado exitosamente en {local_path}.")
+        logger.info("Archivo {} descargado exitosamente en {}.", s3_path, local_path)
         return True
 
     @handle_s3_exceptions
@@ -86,12 +177,12 @@ class S3Manager:
         :param bucket_name: Nombre del bucket a crear.
         :return: True si el bucket fue creado, False en caso contrario.
         """
-        logger.info(f"Creando bucket {bucket_name}.")
+        logger.info("Creando bucket {}.", bucket_name)
         self.s3.create_bucket(
             Bucket=bucket_name,
             CreateBucketConfiguration={'LocationConstraint': self.region_name}
         )
-        logger.info(f"Bucket {bucket_name} creado exitosamente en la región {self.region_name}.")
+        logger.info("Bucket {} creado exitosamente en la región {}.", bucket_name, self.region_name)
         return True
 
     @handle_s3_exceptions
@@ -103,11 +194,119 @@ class S3Manager:
         :param prefix: Prefijo opcional para filtrar archivos.
         :return: Lista con los nombres de los archivos en el bucket.
         """
-        logger.info(f"Listando archivos en s3://{bucket_name}/{prefix}.")
-        response = self.s3.list_objects_v2(Bucket=bucket_name, Prefix=prefix)
-        files = [obj["Key"] for obj in response.get("Contents", [])]
-        logger.info(f"Se encontraron {len(files)} archivos en {bucket_name}.")
-        return files
+        return [obj["Key"] for obj in self._list_objects(bucket_name, prefix)]
+
+    @handle_s3_exceptions
+    def list_objects(self, bucket_name: str, prefix: str = "") -> list:
+        """
+        Lista los objetos de un prefijo con su tamaño y fecha de modificación.
+
+        :param bucket_name: Nombre del bucket de S3.
+        :param prefix: Prefijo opcional para filtrar objetos.
+        :return: Lista de diccionarios con `Key`, `Size`, `LastModified` y `ETag`, ordenada por clave.
+        """
+        return self._list_objects(bucket_name, prefix)
+
+    def _list_objects(self, bucket_name: str, prefix: str) -> List[Dict[str, Any]]:
+        """
+        Lista todas las páginas de un prefijo, dividiendo el espacio de claves en subrangos paralelos.
+
+        Cada tarea pide una página (hasta 1.000 claves) de un rango `(inicio, fin]` con `StartAfter`.
+        Si el rango continúa, el resto se divide en subrangos cuyos límites se forman con los
+        caracteres siguientes a los de la última clave (ver `_split_range`), y cada subrango se lista
+        en paralelo de la misma forma. Los rangos son contiguos, por lo que no se omite ni se repite
+        ninguna clave aunque los límites no coincidan con la distribución real de las claves.
+
+        :param bucket_name: Nombre del bucket de S3.
+        :param prefix: Prefijo de los objetos.
+        :return: Objetos del prefijo ordenados por clave.
+        """
+        logger.info("Listando archivos en s3://{}/{}.", bucket_name, prefix)
+        objects: List[Dict[str, Any]] = []
+        requests = 0
+        with ThreadPoolExecutor(max_workers=max(1, S3_LIST_WORKERS), thread_name_prefix="s3-list") as executor:
+            pending = {executor.submit(self._list_page, bucket_name, prefix, None, None)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page, continuation = future.result()
+                    requests += 1
+                    objects.extend(page)
+                    if continuation is not None:
+                        pending |= {executor.submit(self._list_page, bucket_name, prefix, start, end)
+                                    for start, end in _split_range(prefix, page, *continuation)}
+        objects.sort(key=lambda obj: obj["Key"])
+        logger.info("Se encontraron {} archivos en {} ({} solicitudes de listado).",
+                    len(objects), bucket_name, requests)
+        return objects
+
+    def _list_page(self, bucket_name: str, prefix: str, start_after: Optional[str],
+                   end: Optional[str]) -> Tuple[List[Dict[str, Any]], Optional[Tuple[str, Optional[str]]]]:
+        """
+        Lista una página del rango `(start_after, end]` de un prefijo.
+
+        :param bucket_name: Nombre del bucket de S3.
+        :param prefix: Prefijo de los objetos.
+        :param start_after: Clave exclusiva de inicio (None para el inicio del prefijo).
+        :param end: Clave inclusiva de fin (None para el final del prefijo).
+        :return: Objetos del rango en la página y, si el rango continúa, el rango pendiente.
+        """
+        kwargs = {"Bucket": bucket_name, "Prefix": prefix}
+        if start_after is not None:
+            kwargs["StartAfter"] = start_after
+        response = self.s3.list_objects_v2(**kwargs)
+        contents = response.get("Contents", [])
+        page = [
+            {"Key": obj["Key"], "Size": obj["Size"], "LastModified": obj["LastModified"], "ETag": obj.get("ETag")}
+            for obj in contents if end is None or obj["Key"] <= end
+        ]
+        # Si la página llegó a la clave de fin, el rango terminó aunque el listado siga truncado
+        if (response.get("IsTruncated") and len(page) == len(contents) and page
+                and (end is None or page[-1]["Key"] < end)):
+            return page, (page[-1]["Key"], end)
+        return page, None
+
+    def read_object(self, bucket_name: str, s3_path: str) -> Optional[Tuple[bytes, str]]:
+        """
+        Lee un objeto completo en memoria.
+
+        :param bucket_name: Nombre del bucket de S3.
+        :param s3_path: Ruta del objeto en S3.
+        :return: Contenido y ETag del objeto, o None si no existe.
+        :raises ClientError: Si S3 devuelve un error distinto de objeto inexistente.
+        """
+        try:
+            response = self.s3.get_object(Bucket=bucket_name, Key=s3_path)
+        except ClientError as e:
+            if e.response['Error']['Code'] in ("NoSuchKey", "404"):
+                return None
+            raise
+        return response["Body"].read(), response["ETag"]
+
+    def write_object_if(self, data: Union[bytes, str], bucket_name: str, s3_path: str,
+                        etag: Optional[str]) -> bool:
+        """
+        Escribe un objeto solo si no cambió desde que se leyó (escritura condicional de S3).
+
+        :param data: Contenido del objeto (los textos se codifican en UTF-8).
+        :param bucket_name: Nombre del bucket de S3.
+        :param s3_path: Ruta del objeto en S3.
+        :param etag: ETag leído con `read_object`, o None si el objeto no debe existir.
+        :return: True si se escribió, False si otro proceso lo modificó (o lo creó) antes.
+        :raises ClientError: Si S3 devuelve otro error.
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        condition = {"IfMatch": etag} if etag is not None else {"IfNoneMatch": "*"}
+        content_type = CONTENT_TYPES.get(s3_path.rsplit(".", 1)[-1].lower())
+        try:
+            self.s3.put_object(Bucket=bucket_name, Key=s3_path, Body=data,
+                               **({"ContentType": content_type} if content_type else {}), **condition)
+        except ClientError as e:
+            if e.response['Error']['Code'] in ("PreconditionFailed", "ConditionalRequestConflict", "412", "409"):
+                return False
+            raise
+        return True
 
     @handle_s3_exceptions
     def delete_file(self, bucket_name: str, s3_path: str) -> bool:
@@ -118,7 +317,59 @@ class S3Manager:
         :param s3_path: Ruta del archivo en S3.
         :return: True si el archivo fue eliminado, False en caso contrario.
         """
-        logger.info(f"Eliminando {s3_path} de s3://{bucket_name}.")
+        logger.info("Eliminando {} de s3://{}.", s3_path, bucket_name)
         self.s3.delete_object(Bucket=bucket_name, Key=s3_path)
-        logger.info(f"Archivo {s3_path} eliminado exitosamente de {bucket_name}.")
+        logger.info("Archivo {} eliminado exitosamente de {}.", s3_path, bucket_name)
         return True
+
+
+def _split_range(prefix: str, page: List[Dict[str, Any]], last: str,
+                 end: Optional[str]) -> List[Tuple[str, Optional[str]]]:
+    """
+    Divide el rango pendiente `(last, end]` de un listado en subrangos contiguos.
+
+    Los límites son la última clave cortada en cada posición, desde donde difiere del fin del rango
+    hasta donde empiezan a diferir las claves de la página, seguida de cada carácter de
+    `LIST_SHARD_ALPHABET` (o de cada dígito, si en esa posición la página solo tiene dígitos) mayor
+    que el de la clave. Así, con claves que empiezan con una fecha, los subrangos cercanos separan
+    por ejemplo días y los lejanos, meses o años; un subrango que sigue teniendo muchas claves se
+    vuelve a dividir al listarse.
+
+    :param prefix: Prefijo del listado.
+    :param page: Objetos de la página que terminó en `last`.
+    :param last: Última clave listada.
+    :param end: Clave inclusiva de fin del rango (None para el final del prefijo).
+    :return: Pares `(inicio exclusivo, fin inclusivo)` que cubren `(last, end]`.
+    """
+    floor = len(os.path.commonprefix([last, end])) if end is not None else len(prefix)
+    varying = max(floor, len(os.path.commonprefix([page[0]["Key"], last])))
+    boundaries = set()
+    for level in range(floor, varying + 1):
+        current = last[level] if level < len(last) else ""
+        # En posiciones donde la página solo tiene dígitos (por ejemplo, una fecha) se usan solo dígitos
+        numeric = all(len(obj["Key"]) > level and obj["Key"][level].isdigit() for obj in page)
+        for char in (string.digits if numeric else LIST_SHARD_ALPHABET):
+            if char > current and (end is None or level > floor or char < end[level]):
+                boundaries.add(last[:level] + char)
+    starts = [last, *sorted(boundaries)]
+    return list(zip(starts, [*starts[1:], end]))
+
+
+_s3_managers: Dict[str, S3Manager] = {}
+_s3_managers_lock = threading.Lock()
+
+
+def get_s3_manager(region_name: str = "us-east-1") -> S3Manager:
+    """
+    Devuelve el `S3Manager` compartido del proceso para una región.
+
+    Los clientes de boto3 son seguros entre hilos, por lo que se crean una sola vez y se reutilizan
+    (con su pool de conexiones) entre solicitudes.
+
+    :param region_name: Región de AWS.
+    :return: Cliente de S3 compartido.
+    """
+    with _s3_managers_lock:
+        if region_name not in _s3_managers:
+            _s3_managers[region_name] = S3Manager(region_name)
+        return _s3_managers[region_name]
@@ -1,8 +1,9 @@
 
 import os
 import json
-from typing import Dict, Any, List, Optional
-import boto3
+import threading
+import time
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from botocore.exceptions import ClientError
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
@@ -12,6 +13,8 @@ from logger_config import get_logger
 load_dotenv()
 logger = get_logger()
 
+SECRET_CACHE_TTL_SECONDS = float(os.getenv("SECRET_CACHE_TTL_SECONDS", 300))
+
 # Decorador para manejo centralizado de excepciones
 def handle_boto3_exceptions(func):
     """Decorador para manejar excepciones de Boto3 y registrar errores."""
@@ -20,10 +23,10 @@ def handle_boto3_exceptions(func):
             return func(self, *args, **kwargs)
         except ClientError as e:
             error_code = e.response['Error']['Code']
-            logger.error(f"Error en {func.__name__}: {error_code} - {e}")
+            logger.error("Error en {}: {} - {}", func.__name__, error_code, e)
             raise
         except Exception as e:
-            logger.error(f"Error inesperado en {func.__name__}: {e}")
+            logger.error("Error inesperado en {}: {}", func.__name__, e)
             raise
     return wrapper
 
@@ -44,9 +47,12 @@ class AWSSecretsManager:
 
         :param region_name: Región de AWS (opcional, por defecto se toma de variables de entorno).
         """
+        # boto3 se importa al crear el primer cliente para no cargarlo al iniciar la API
+        import boto3
+
         self.region_name = region_name or os.getenv("REGION_NAME", "us-east-2")
         self.client = boto3.client("secretsmanager", region_name=self.region_name)
-        logger.info(f"Cliente de Secrets Manager inicializado en la región {self.region_name}.")
+        logger.info("Cliente de Secrets Manager inicializado en la región {}.", self.region_name)
     
     def __enter__(self):
         """Habilita el uso de 'with' para conexiones seguras."""
@@ -68,9 +74,9 @@ class AWSSecretsManager:
         if isinstance(secret_data, dict):
             secret_data = json.dumps(secret_data)
 
-        logger.info(f"Creando secreto: {secret_name}")
+        logger.info("Creando secreto: {}", secret_name)
         self.client.create_secret(Name=secret_name, SecretString=secret_data)
-        logger.info(f"Secreto '{secret_name}' creado exitosamente.")
+        logger.info("Secreto '{}' creado exitosamente.", secret_name)
 
     @handle_boto3_exceptions
     def get_secret(self, secret_name: str) -> Dict[str, Any]:
@@ -80,7 +86,7 @@ class AWSSecretsManager:
         :param secret_name: Nombre del secreto.
         :return: Diccionario con el secreto decodificado.
         """
-        logger.info(f"Obteniendo secreto: {secret_name}")
+        logger.info("Obteniendo secreto: {}", secret_name)
         response = self.client.get_secret_value(SecretId=secret_name)
         secret_data = json.loads(response["SecretString"])
 
@@ -107,7 +113,7 @@ class AWSSecretsManager:
         logger.info("Listando secretos en AWS Secrets Manager.")
         response = self.client.list_secrets()
         secret_names = [secret["Name"] for secret in response.get("SecretList", [])]
-        logger.info(f"Se encontraron {len(secret_names)} secretos.")
+        logger.info("Se encontraron {} secretos.", len(secret_names))
         return secret_names
 
     @handle_boto3_exceptions
@@ -121,6 +127,110 @@ class AWSSecretsManager:
         if isinstance(secret_data, dict):
             secret_data = json.dumps(secret_data)
 
-        logger.info(f"Actualizando secreto: {secret_name}")
+        logger.info("Actualizando secreto: {}", secret_name)
         self.client.update_secret(SecretId=secret_name, SecretString=secret_data)
-        logger.info(f"Secreto '{secret_name}' actualizado correctamente.")
+        logger.info("Secreto '{}' actualizado correctamente.", secret_name)
+
+
+class SecretCache:
+    """
+    Caché en memoria de secretos con TTL y deduplicación de lecturas concurrentes.
+
+    Mantiene un único cliente de Secrets Manager reutilizado entre peticiones. Si varias peticiones
+    piden el mismo secreto a la vez, solo una llama a AWS y el resto espera su resultado.
+    """
+
+    def __init__(self, ttl: float = SECRET_CACHE_TTL_SECONDS,
+                 manager_factory: Optional[Callable[[], AWSSecretsManager]] = None):
+        """
+        Inicializa la caché.
+
+        :param ttl: Segundos que un secreto permanece válido en la caché (0 desactiva la caché).
+        :param manager_factory: Función que crea el cliente de secretos. Permite usar un sustituto local en pruebas.
+        """
+        self.ttl = ttl
+        self._manager_factory = manager_factory or AWSSecretsManager
+        self._manager: Optional[AWSSecretsManager] = None
+        self._entries: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._inflight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _get_manager(self) -> AWSSecretsManager:
+        """Crea el cliente de Secrets Manager en el primer uso y lo reutiliza después."""
+        with self._lock:
+            if self._manager is None:
+                self._manager = self._manager_factory()
+            return self._manager
+
+    def get(self, secret_name: str, force_refresh: bool = False) -> Dict[str, Any]:
+        """
+        Obtiene un secreto desde la caché o, si expiró, desde Secrets Manager.
+
+        :param secret_name: Nombre del secreto.
+        :param force_refresh: Si es True, ignora la entrada en caché (por ejemplo, tras una rotación).
+        :return: Copia del diccionario del secreto.
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(secret_name)
+                if entry and not force_refresh and time.monotonic() < entry[0]:
+                    self.hits += 1
+                    return dict(entry[1])
+
+                event = self._inflight.get(secret_name)
+                is_leader = event is None
+                if is_leader:
+                    event = self._inflight[secret_name] = threading.Event()
+                    self.misses += 1
+
+            if not is_leader:
+                # Otra petición ya está leyendo el secreto: se espera su resultado y se vuelve a consultar.
+                event.wait()
+                force_refresh = False
+                continue
+
+            try:
+                secret = self._get_manager().get_secret(secret_name)
+                with self._lock:
+                    self._entries[secret_name] = (time.monotonic() + self.ttl, secret)
+                return dict(secret)
+            finally:
+                with self._lock:
+                    self._inflight.pop(secret_name, None)
+                event.set()
+
+    def invalidate(self, secret_name: Optional[str] = None) -> None:
+        """
+        Elimina un secreto (o todos) de la caché para forzar su lectura en la próxima petición.
+
+        :param secret_name: Nombre del secreto. Si es None, se vacía la caché completa.
+        """
+        with self._lock:
+            if secret_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(secret_name, None)
+            self.invalidations += 1
+        logger.info("Caché de secretos invalidada: {}.", secret_name or 'todos')
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Devuelve los contadores de la caché.
+
+        :return: Aciertos, fallos, invalidaciones, entradas y TTL configurado.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "ttl_seconds": self.ttl,
+            }
+
+
+# Caché compartida por todo el proceso
+secret_cache = SecretCache()
@@ -0,0 +1,92 @@
+from typing import Dict, Any, Optional, List, Callable
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+import time
+from fastapi import HTTPException
+from pydantic import BaseModel, Field
+from common import bind_stage_limits
+from logger_config import get_logger
+
+# Configuración de logs
+logger = get_logger()
+
+BATCH_MAX_CONCURRENCY = int(os.environ.get('BATCH_MAX_CONCURRENCY', 4))
+BATCH_MAX_CONCURRENT_FETCHES = int(os.environ.get('BATCH_MAX_CONCURRENT_FETCHES', 2))
+BATCH_MAX_CONCURRENT_PROFILES = int(os.environ.get('BATCH_MAX_CONCURRENT_PROFILES', 2))
+BATCH_MAX_ITEMS = int(os.environ.get('BATCH_MAX_ITEMS', 200))
+
+
+class BatchItemResult(BaseModel):
+    """
+    Resultado de un elemento de un lote de perfilados.
+    """
+
+    profile_name: str = Field(..., description="Nombre del perfil")
+    sql_filename: str = Field(..., description="Archivo SQL perfilado")
+    status: str = Field(..., description="'succeeded' o 'failed'")
+    status_code: int = Field(..., description="Código HTTP equivalente al de `POST /profile/`")
+    seconds: float = Field(..., description="Duración del perfilado del elemento")
+    result: Optional[Dict[str, Any]] = Field(None, description="Respuesta del perfilado, si terminó bien")
+    error: Optional[str] = Field(None, description="Detalle del error, si falló")
+
+
+def run_batch(func: Callable[[Any, Dict[str, float]], Dict[str, Any]], requests: List[Any],
+              max_concurrency: int = BATCH_MAX_CONCURRENCY,
+              max_concurrent_fetches: int = BATCH_MAX_CONCURRENT_FETCHES,
+              max_concurrent_profiles: int = BATCH_MAX_CONCURRENT_PROFILES) -> List[BatchItemResult]:
+    """
+    Ejecuta un lote de perfilados en paralelo y devuelve el resultado de cada uno, aunque alguno falle.
+
+    Todos los elementos comparten la caché de secretos, el motor de base de datos del registro y el
+    cliente de S3 del proceso. Además de `max_concurrency` elementos a la vez, se limita cuántos leen
+    de la base de datos (etapa `fetch`) y cuántos generan el reporte (etapa `report`) simultáneamente.
+
+    Args:
+        func (Callable[[Any, Dict[str, float]], Dict[str, Any]]): Función que perfila una petición,
+            con la misma firma que en `ProfilingJobManager.submit`.
+        requests (List[Any]): Peticiones de perfilado.
+        max_concurrency (int): Elementos procesados a la vez.
+        max_concurrent_fetches (int): Lecturas simultáneas de la base de datos.
+        max_concurrent_profiles (int): Reportes generados simultáneamente.
+
+    Returns:
+        List[BatchItemResult]: Resultados en el mismo orden que las peticiones.
+    """
+    limits = {
+        "fetch": threading.Semaphore(max_concurrent_fetches),
+        "report": threading.Semaphore(max_concurrent_profiles),
+    }
+
+    def run_item(request: Any) -> BatchItemResult:
+        bind_stage_limits(limits)
+        start = time.perf_counter()
+        result, error, status_code = None, None, 200
+        try:
+            result = func(request, {})
+        except HTTPException as e:
+            error, status_code = str(e.detail), e.status_code
+        except Exception as e:
+            error, status_code = str(e), 500
+        finally:
+            bind_stage_limits(None)
+
+        return BatchItemResult(
+            profile_name=request.profile_name,
+            sql_filename=request.sql_filename,
+            status="succeeded" if error is None else "failed",
+            status_code=status_code,
+            seconds=round(time.perf_counter() - start, 4),
+            result=result,
+            error=error,
+        )
+
+    logger.info("Iniciando lote de {} perfilados (concurrencia {}, lecturas {}, reportes {}).",
+                len(requests), max_concurrency, max_concurrent_fetches, max_concurrent_profiles)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(requests))),
+                            thread_name_prefix="profiling-batch") as executor:
+        results = list(executor.map(run_item, requests))
+
+    failed = sum(1 for result in results if result.status == "failed")
+    logger.info("Lote terminado: {} perfilados correctos y {} con error.", len(results) - failed, failed)
+    return results
@@ -0,0 +1,551 @@
+from typing import Dict, Any, List, Optional, Iterable, Sequence
+from collections import Counter
+from datetime import date, datetime
+from decimal import Decimal
+import math
+import numpy as np
+import pandas as pd
+from sketches import HyperLogLog, KLLSketch, HeavyHitters, QUANTILES, hash_values
+from logger_config import get_logger, get_sampled_logger
+
+# Configuración de logs
+logger = get_logger()
+# Mensajes por bloque, muestreados según LOG_SAMPLE_EVERY
+sampled_logger = get_sampled_logger()
+
+# Número de valores más frecuentes que se reportan por columna
+DEFAULT_TOP_K = 10
+# Capacidad del contador de frecuencias antes de recortarlo (cota de memoria por columna)
+DEFAULT_TOP_CAPACITY = 10_000
+# En `approximate_columns`, indica que todas las columnas usan estadísticas aproximadas
+APPROXIMATE_ALL = "*"
+
+# Orden de las columnas del resumen, alineado con el CSV que genera `run_profiling`
+SUMMARY_COLUMNS: List[str] = [
+    "n_distinct", "p_distinct", "is_unique", "n_unique", "p_unique", "type",
+    "n_missing", "n", "p_missing", "count", "min", "max", "range",
+    "n_negative", "p_negative", "n_infinite", "n_zeros", "mean", "std", "variance",
+    "kurtosis", "skewness", "sum", "cv", "p_zeros", "p_infinite",
+]
+# Columnas adicionales del resumen cuando alguna columna usa estadísticas aproximadas
+QUANTILE_COLUMNS: List[str] = [*QUANTILES, "iqr"]
+
+KIND_TO_TYPE = {
+    "numeric": "Numeric",
+    "datetime": "DateTime",
+    "boolean": "Boolean",
+    "categorical": "Categorical",
+}
+
+
+def normalize_series(series: pd.Series) -> pd.Series:
+    """
+    Normaliza columnas de tipo `object` que en realidad contienen decimales o fechas.
+
+    Los drivers devuelven DECIMAL como `Decimal` y DATE como `datetime.date`, ambos con dtype `object`.
+
+    Args:
+        series (pd.Series): Columna del bloque.
+
+    Returns:
+        pd.Series: Columna con dtype numérico o de fecha cuando aplica.
+    """
+    if series.dtype != object:
+        return series
+
+    non_null = series.dropna()
+    if non_null.empty:
+        return series
+
+    sample = non_null.iloc[0]
+    if isinstance(sample, Decimal):
+        return pd.to_numeric(series, errors="coerce")
+    if isinstance(sample, (date, datetime)):
+        return pd.to_datetime(series, errors="coerce")
+    return series
+
+
+def infer_kind(series: pd.Series) -> str:
+    """Clasifica una columna en 'boolean', 'numeric', 'datetime' o 'categorical'."""
+    if pd.api.types.is_bool_dtype(series):
+        return "boolean"
+    if pd.api.types.is_numeric_dtype(series):
+        return "numeric"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "datetime"
+    return "categorical"
+
+
+class ColumnAccumulator:
+    """
+    Acumulador combinable de estadísticas de una columna.
+
+    Cada bloque de datos se resume con `update` y dos acumuladores se combinan con `merge`,
+    por lo que el uso de memoria depende del tamaño del bloque y no del tamaño de la tabla.
+    Los momentos se combinan con las fórmulas por pares de Chan/Pébay.
+
+    Con `approximate`, los valores distintos, los cuantiles y los valores frecuentes se calculan con
+    resúmenes combinables de memoria acotada (`HyperLogLog`, `KLLSketch` y `HeavyHitters`) en lugar
+    del contador exacto.
+    """
+
+    def __init__(self, name: str, top_k: int = DEFAULT_TOP_K, top_capacity: int = DEFAULT_TOP_CAPACITY,
+                 approximate: bool = False):
+        """
+        Inicializa un acumulador vacío.
+
+        Args:
+            name (str): Nombre de la columna.
+            top_k (int): Número de valores más frecuentes a reportar.
+            top_capacity (int): Máximo de valores distintos que se guardan en el contador.
+            approximate (bool): Usar estadísticas aproximadas para distintos, cuantiles y frecuentes.
+        """
+        self.name = name
+        self.top_k = top_k
+        self.top_capacity = top_capacity
+        self.approximate = approximate
+        self.kind: Optional[str] = None
+        self.n = 0
+        self.n_missing = 0
+        self.count = 0
+        self.min: Any = None
+        self.max: Any = None
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.sum = 0.0
+        self.n_zeros = 0
+        self.n_negative = 0
+        self.n_infinite = 0
+        self.top_values: Counter = Counter()
+        self.top_values_exact = True
+        self.distinct: Optional[HyperLogLog] = HyperLogLog() if approximate else None
+        self.quantiles: Optional[KLLSketch] = KLLSketch() if approximate else None
+        self.heavy_hitters: Optional[HeavyHitters] = HeavyHitters() if approximate else None
+
+    def update(self, series: pd.Series) -> None:
+        """
+        Incorpora un bloque de valores de la columna.
+
+        Args:
+            series (pd.Series): Valores del bloque.
+        """
+        series = normalize_series(series)
+        chunk = ColumnAccumulator(self.name, self.top_k, self.top_capacity, self.approximate)
+        chunk.n = int(series.shape[0])
+        non_null = series.dropna()
+        chunk.count = int(non_null.shape[0])
+        chunk.n_missing = chunk.n - chunk.count
+
+        if chunk.count:
+            chunk.kind = infer_kind(non_null)
+            if chunk.kind in ("numeric", "boolean"):
+                values = non_null.to_numpy(dtype="float64")
+                chunk._set_numeric(values)
+            elif chunk.kind == "datetime":
+                chunk.min = non_null.min()
+                chunk.max = non_null.max()
+            if self.approximate:
+                chunk._set_sketches(non_null)
+            else:
+                chunk.top_values = Counter(non_null.astype(str).value_counts(sort=False).to_dict())
+
+        self.merge(chunk)
+
+    def _set_numeric(self, values: np.ndarray) -> None:
+        """Calcula momentos y contadores numéricos de un bloque sin nulos."""
+        infinite = np.isinf(values)
+        self.n_infinite = int(infinite.sum())
+        self.n_zeros = int((values == 0).sum())
+        self.n_negative = int((values < 0).sum())
+        finite = values[~infinite]
+        if finite.size == 0:
+            return
+        self.min = float(finite.min())
+        self.max = float(finite.max())
+        self.sum = float(finite.sum())
+        self.mean = float(finite.mean())
+        deltas = finite - self.mean
+        self.m2 = float(np.sum(deltas ** 2))
+        self.m3 = float(np.sum(deltas ** 3))
+        self.m4 = float(np.sum(deltas ** 4))
+
+    def _set_sketches(self, non_null: pd.Series) -> None:
+        """Resume un bloque sin nulos con los estimadores aproximados."""
+        self.distinct.update(hash_values(non_null))
+        if self.kind == "numeric":
+            values = non_null.to_numpy(dtype="float64")
+            self.quantiles.update(values[np.isfinite(values)])
+        # Los conteos se calculan sobre los valores originales y solo el índice resultante pasa a texto
+        value_counts = non_null.value_counts(sort=False)
+        value_counts.index = value_counts.index.astype(str)
+        if not value_counts.index.is_unique:
+            value_counts = value_counts.groupby(level=0).sum()
+        self.heavy_hitters.update(value_counts)
+
+    @property
+    def _n_moments(self) -> int:
+        """Número de valores finitos sobre los que se calcularon los momentos."""
+        return self.count - self.n_infinite if self.kind in ("numeric", "boolean") else 0
+
+    def merge(self, other: "ColumnAccumulator") -> "ColumnAccumulator":
+        """
+        Combina otro acumulador de la misma columna en este.
+
+        Args:
+            other (ColumnAccumulator): Acumulador a combinar.
+
+        Returns:
+            ColumnAccumulator: Este mismo acumulador, actualizado.
+        """
+        if other.kind is not None:
+            if self.kind is None:
+                self.kind = other.kind
+            elif self.kind != other.kind:
+                if {self.kind, other.kind} <= {"numeric", "boolean"}:
+                    self.kind = "numeric"
+                else:
+                    logger.warning("Tipos inconsistentes en la columna '{}': {} y {}.",
+                                   self.name, self.kind, other.kind)
+                    self.kind = "categorical"
+
+        n_a, n_b = self._n_moments, other._n_moments
+        if n_b:
+            if n_a == 0:
+                self.mean, self.m2, self.m3, self.m4 = other.mean, other.m2, other.m3, other.m4
+            else:
+                n = n_a + n_b
+                delta = other.mean - self.mean
+                delta2, delta3, delta4 = delta ** 2, delta ** 3, delta ** 4
+                m4 = (self.m4 + other.m4
+                      + delta4 * n_a * n_b * (n_a ** 2 - n_a * n_b + n_b ** 2) / n ** 3
+                      + 6.0 * delta2 * (n_a ** 2 * other.m2 + n_b ** 2 * self.m2) / n ** 2
+                      + 4.0 * delta * (n_a * other.m3 - n_b * self.m3) / n)
+                m3 = (self.m3 + other.m3
+                      + delta3 * n_a * n_b * (n_a - n_b) / n ** 2
+                      + 3.0 * delta * (n_a * other.m2 - n_b * self.m2) / n)
+                self.m2 = self.m2 + other.m2 + delta2 * n_a * n_b / n
+                self.m3, self.m4 = m3, m4
+                self.mean = self.mean + delta * n_b / n
+
+        self.min = other.min if self.min is None else (self.min if other.min is None else min(self.min, other.min))
+        self.max = other.max if self.max is None else (self.max if other.max is None else max(self.max, other.max))
+        self.n += other.n
+        self.n_missing += other.n_missing
+        self.count += other.count
+        self.sum += other.sum
+        self.n_zeros += other.n_zeros
+        self.n_negative += other.n_negative
+        self.n_infinite += other.n_infinite
+        if self.approximate != other.approximate:
+            raise ValueError(f"No se pueden combinar estadísticas exactas y aproximadas de la columna '{self.name}'.")
+        if self.approximate:
+            self.distinct.merge(other.distinct)
+            self.quantiles.merge(other.quantiles)
+            self.heavy_hitters.merge(other.heavy_hitters)
+        else:
+            self.top_values.update(other.top_values)
+            self.top_values_exact = self.top_values_exact and other.top_values_exact
+            self._trim_top_values()
+        return self
+
+    def _trim_top_values(self) -> None:
+        """Recorta el contador de frecuencias para acotar la memoria por columna."""
+        if len(self.top_values) > self.top_capacity:
+            self.top_values = Counter(dict(self.top_values.most_common(self.top_capacity // 2)))
+            self.top_values_exact = False
+
+    def to_summary(self) -> Dict[str, Any]:
+        """
+        Genera el resumen de la columna con las mismas claves que el CSV de `run_profiling`.
+
+        Returns:
+            Dict[str, Any]: Estadísticas de la columna.
+        """
+        summary: Dict[str, Any] = {key: None for key in SUMMARY_COLUMNS}
+        summary.update({
+            "type": KIND_TO_TYPE.get(self.kind, "Unsupported"),
+            "n": self.n,
+            "count": self.count,
+            "n_missing": self.n_missing,
+            "p_missing": self.n_missing / self.n if self.n else 0.0,
+        })
+
+        if self.approximate:
+            n_distinct = min(int(round(self.distinct.estimate())), self.count)
+            summary.update({
+                "n_distinct": n_distinct,
+                "p_distinct": n_distinct / self.count if self.count else 0.0,
+            })
+            if self.kind == "numeric" and self.quantiles.n:
+                estimates = dict(zip(QUANTILES, self.quantiles.quantiles(list(QUANTILES.values()))))
+                summary.update({**estimates, "iqr": estimates["75%"] - estimates["25%"]})
+        elif self.top_values_exact:
+            n_distinct = len(self.top_values)
+            n_unique = sum(1 for value in self.top_values.values() if value == 1)
+            summary.update({
+                "n_distinct": n_distinct,
+                "p_distinct": n_distinct / self.count if self.count else 0.0,
+                "is_unique": n_distinct == self.count and self.count > 0,
+                "n_unique": n_unique,
+                "p_unique": n_unique / self.count if self.count else 0.0,
+            })
+
+        if self.kind == "datetime" and self.min is not None:
+            summary.update({"min": self.min, "max": self.max, "range": self.max - self.min})
+
+        n_moments = self._n_moments
+        if n_moments:
+            variance = self.m2 / (n_moments - 1) if n_moments > 1 else float("nan")
+            std = math.sqrt(variance) if n_moments > 1 else float("nan")
+            summary.update({
+                "min": self.min,
+                "max": self.max,
+                "range": self.max - self.min,
+                "mean": self.mean,
+                "std": std,
+                "variance": variance,
+                "sum": self.sum,
+                "skewness": self._skewness(n_moments),
+                "kurtosis": self._kurtosis(n_moments),
+                "cv": std / self.mean if self.mean else float("nan"),
+                "n_zeros": self.n_zeros,
+                "p_zeros": self.n_zeros / self.n if self.n else 0.0,
+                "n_negative": self.n_negative,
+                "p_negative": self.n_negative / self.n if self.n else 0.0,
+                "n_infinite": self.n_infinite,
+                "p_infinite": self.n_infinite / self.n if self.n else 0.0,
+            })
+        return summary
+
+    def _skewness(self, n: int) -> float:
+        """Asimetría muestral ajustada, equivalente a `pd.Series.skew`."""
+        if n < 3 or self.m2 == 0:
+            return float("nan")
+        g1 = math.sqrt(n) * self.m3 / self.m2 ** 1.5
+        return g1 * math.sqrt(n * (n - 1)) / (n - 2)
+
+    def _kurtosis(self, n: int) -> float:
+        """Curtosis en exceso ajustada, equivalente a `pd.Series.kurt`."""
+        if n < 4 or self.m2 == 0:
+            return float("nan")
+        adj = 3.0 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+        return (n + 1) * n * (n - 1) * self.m4 / ((n - 2) * (n - 3) * self.m2 ** 2) - adj
+
+    def most_common(self) -> Dict[str, int]:
+        """Devuelve los `top_k` valores más frecuentes y sus conteos."""
+        if self.approximate:
+            return self.heavy_hitters.top(self.top_k)
+        return dict(self.top_values.most_common(self.top_k))
+
+    def error_bounds(self) -> Dict[str, Any]:
+        """
+        Devuelve las cotas de error de las estadísticas aproximadas.
+
+        Returns:
+            Dict[str, Any]: Error relativo de `n_distinct`, error de rango de los cuantiles y error
+            absoluto máximo de los conteos de `top_values`.
+        """
+        return {
+            "n_distinct_relative_error": round(self.distinct.relative_error, 6),
+            "quantile_rank_error": round(self.quantiles.rank_error, 6) if self.kind == "numeric" else None,
+            "top_values_max_error": self.heavy_hitters.error,
+        }
+
+    def to_report_entry(self) -> Dict[str, Any]:
+        """
+        Genera la entrada de la columna en la sección `variables` del reporte JSON.
+
+        Returns:
+            Dict[str, Any]: Resumen, valores frecuentes y, si aplica, cotas de error.
+        """
+        summary = self.to_summary()
+        summary["top_values"] = self.most_common()
+        summary["top_values_exact"] = self.heavy_hitters.exact if self.approximate else self.top_values_exact
+        summary["approximate"] = self.approximate
+        if self.approximate:
+            summary["error_bounds"] = self.error_bounds()
+        return {key: str(value) if isinstance(value, (pd.Timestamp, pd.Timedelta)) else value
+                for key, value in summary.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serializa el estado del acumulador a un diccionario compatible con JSON.
+
+        Returns:
+            Dict[str, Any]: Estado del acumulador.
+        """
+        sketches = ("distinct", "quantiles", "heavy_hitters")
+        state = {key: value for key, value in self.__dict__.items() if key not in ("top_values", "min", "max", *sketches)}
+        state["top_values"] = dict(self.top_values)
+        for key in sketches:
+            sketch = getattr(self, key)
+            state[key] = sketch.to_dict() if sketch is not None else None
+        if self.kind == "datetime":
+            state["min"] = self.min.isoformat() if self.min is not None else None
+            state["max"] = self.max.isoformat() if self.max is not None else None
+        else:
+            state["min"], state["max"] = self.min, self.max
+        return state
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "ColumnAccumulator":
+        """
+        Reconstruye un acumulador a partir de su estado serializado.
+
+        Args:
+            state (Dict[str, Any]): Estado generado por `to_dict`.
+
+        Returns:
+            ColumnAccumulator: Acumulador restaurado.
+        """
+        sketches = {"distinct": HyperLogLog, "quantiles": KLLSketch, "heavy_hitters": HeavyHitters}
+        accumulator = cls(state["name"], state["top_k"], state["top_capacity"], state.get("approximate", False))
+        for key, value in state.items():
+            if key not in ("top_values", "min", "max", *sketches):
+                setattr(accumulator, key, value)
+        accumulator.top_values = Counter(state["top_values"])
+        for key, sketch_cls in sketches.items():
+            if state.get(key) is not None:
+                setattr(accumulator, key, sketch_cls.from_dict(state[key]))
+        if accumulator.kind == "datetime":
+            accumulator.min = pd.Timestamp(state["min"]) if state["min"] is not None else None
+            accumulator.max = pd.Timestamp(state["max"]) if state["max"] is not None else None
+        else:
+            accumulator.min, accumulator.max = state["min"], state["max"]
+        return accumulator
+
+
+class ProfileAccumulator:
+    """
+    Conjunto de acumuladores por columna para perfilar un resultado por bloques.
+    """
+
+    def __init__(self, top_k: int = DEFAULT_TOP_K, top_capacity: int = DEFAULT_TOP_CAPACITY,
+                 approximate_columns: Optional[Sequence[str]] = None):
+        """
+        Inicializa un perfil vacío.
+
+        Args:
+            top_k (int): Número de valores más frecuentes a reportar por columna.
+            top_capacity (int): Máximo de valores distintos que se guardan por columna.
+            approximate_columns (Optional[Sequence[str]]): Columnas con estadísticas aproximadas
+                (`APPROXIMATE_ALL` para todas).
+        """
+        self.top_k = top_k
+        self.top_capacity = top_capacity
+        self.approximate_columns = list(approximate_columns or [])
+        self.columns: Dict[str, ColumnAccumulator] = {}
+        self.n_rows = 0
+        self.n_chunks = 0
+
+    def update(self, df: pd.DataFrame) -> None:
+        """
+        Incorpora un bloque de filas al perfil.
+
+        Args:
+            df (pd.DataFrame): Bloque de datos.
+        """
+        for column in df.columns:
+            if column not in self.columns:
+                self.columns[column] = ColumnAccumulator(column, self.top_k, self.top_capacity,
+                                                         self.is_approximate(column))
+            self.columns[column].update(df[column])
+        self.n_rows += int(df.shape[0])
+        self.n_chunks += 1
+
+    def is_approximate(self, column: str) -> bool:
+        """Indica si una columna usa estadísticas aproximadas."""
+        return APPROXIMATE_ALL in self.approximate_columns or column in self.approximate_columns
+
+    def update_many(self, chunks: Iterable[pd.DataFrame]) -> "ProfileAccumulator":
+        """
+        Consume un iterable de bloques, liberando cada uno antes de leer el siguiente.
+
+        Args:
+            chunks (Iterable[pd.DataFrame]): Bloques de datos.
+
+        Returns:
+            ProfileAccumulator: Este mismo perfil, actualizado.
+        """
+        for chunk in chunks:
+            self.update(chunk)
+            sampled_logger.info("Bloque {} procesado ({} filas acumuladas).", self.n_chunks, self.n_rows)
+        return self
+
+    def merge(self, other: "ProfileAccumulator") -> "ProfileAccumulator":
+        """
+        Combina otro perfil (por ejemplo, de otra partición) en este.
+
+        Args:
+            other (ProfileAccumulator): Perfil a combinar.
+
+        Returns:
+            ProfileAccumulator: Este mismo perfil, actualizado.
+        """
+        for column, accumulator in other.columns.items():
+            if column in self.columns:
+                self.columns[column].merge(accumulator)
+            else:
+                self.columns[column] = ColumnAccumulator.from_dict(accumulator.to_dict())
+        self.n_rows += other.n_rows
+        self.n_chunks += other.n_chunks
+        return self
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Construye la tabla resumen con el mismo formato que el CSV de `run_profiling`.
+
+        Returns:
+            pd.DataFrame: Una fila por variable.
+        """
+        rows = [{"variable": column, **accumulator.to_summary()} for column, accumulator in self.columns.items()]
+        columns = ["variable", *SUMMARY_COLUMNS]
+        if any(accumulator.approximate for accumulator in self.columns.values()):
+            columns += QUANTILE_COLUMNS
+        return pd.DataFrame(rows, columns=columns)
+
+    def to_report(self) -> Dict[str, Any]:
+        """
+        Genera un reporte JSON con secciones `table` y `variables` como el de ydata-profiling.
+
+        Returns:
+            Dict[str, Any]: Reporte serializable.
+        """
+        variables = {column: accumulator.to_report_entry() for column, accumulator in self.columns.items()}
+
+        n_cells_missing = sum(accumulator.n_missing for accumulator in self.columns.values())
+        n_cells = self.n_rows * len(self.columns)
+        table = {
+            "n": self.n_rows,
+            "n_var": len(self.columns),
+            "n_cells_missing": n_cells_missing,
+            "n_vars_with_missing": sum(1 for a in self.columns.values() if a.n_missing),
+            "n_vars_all_missing": sum(1 for a in self.columns.values() if a.n and a.n_missing == a.n),
+            "p_cells_missing": n_cells_missing / n_cells if n_cells else 0.0,
+            "n_chunks": self.n_chunks,
+            "approximate_columns": [column for column, accumulator in self.columns.items() if accumulator.approximate],
+        }
+        return {"table": table, "variables": variables}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializa el estado completo del perfil."""
+        return {
+            "top_k": self.top_k,
+            "top_capacity": self.top_capacity,
+            "approximate_columns": self.approximate_columns,
+            "n_rows": self.n_rows,
+            "n_chunks": self.n_chunks,
+            "columns": {column: accumulator.to_dict() for column, accumulator in self.columns.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "ProfileAccumulator":
+        """Reconstruye un perfil a partir del estado generado por `to_dict`."""
+        profile = cls(state["top_k"], state["top_capacity"], state.get("approximate_columns"))
+        profile.n_rows = state["n_rows"]
+        profile.n_chunks = state["n_chunks"]
+        profile.columns = {column: ColumnAccumulator.from_dict(column_state)
+                           for column, column_state in state["columns"].items()}
+        return profile
@@ -1,6 +1,12 @@
 
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Tuple, Callable
+from contextlib import contextmanager
+from contextvars import ContextVar
 import os
+import re
+import threading
+import time
+from metrics import observe_stage
 from logger_config import get_logger
 from dotenv import load_dotenv
 load_dotenv()
@@ -21,14 +27,184 @@ def get_sql_statement(sql_file: str) -> str:
     Raises:
         FileNotFoundError: Si el archivo no se encuentra.
     """
-    logging.info(f"Intentando leer el archivo SQL desde: {sql_file}")
+    logging.info("Intentando leer el archivo SQL desde: {}", sql_file)
     if not os.path.exists(sql_file):
-        logging.error(f"El archivo {sql_file} no se encuentra.")
+        logging.error("El archivo {} no se encuentra.", sql_file)
         raise FileNotFoundError(f"El archivo {sql_file} no se encuentra.")
 
     with open(sql_file, "r") as file:
         sql_statement = file.read()
-        logging.info(f"Archivo SQL leído correctamente desde: {sql_file}")
+        logging.info("Archivo SQL leído correctamente desde: {}", sql_file)
 
     return sql_statement
 
+# Diccionario de tiempos de la petición en curso, para las etapas que no lo reciben como argumento
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+def bind_request_timings(timings: Optional[Dict[str, float]]) -> None:
+    """
+    Asocia un diccionario de tiempos a la petición en curso (hilo o tarea actual).
+
+    Las etapas medidas con `timed_stage(None, ...)` dentro de la petición se registran en él.
+
+    Args:
+        timings (Optional[Dict[str, float]]): Diccionario etapa -> segundos.
+    """
+    _request_timings.set(timings)
+
+# Semáforos por etapa que limitan cuántas peticiones ejecutan la misma etapa a la vez (por ejemplo, en lotes)
+_stage_limits: ContextVar[Optional[Dict[str, threading.Semaphore]]] = ContextVar("stage_limits", default=None)
+
+def bind_stage_limits(limits: Optional[Dict[str, threading.Semaphore]]) -> None:
+    """
+    Asocia límites de concurrencia por etapa a la petición en curso.
+
+    Args:
+        limits (Optional[Dict[str, threading.Semaphore]]): Etapa -> semáforo compartido entre peticiones.
+    """
+    _stage_limits.set(limits)
+
+class QueryCancelledError(Exception):
+    """Excepción lanzada cuando se cancelan las consultas de una petición (por ejemplo, el cliente se desconectó)."""
+    pass
+
+class QueryCancelScope:
+    """
+    Consultas en curso de una petición, para poder cancelarlas desde otro hilo.
+
+    Cada lectura de la base registra una función que cancela su consulta en el servidor mientras se
+    ejecuta (ver `SQLProcessor._cancellable`); `cancel` las invoca todas y marca la petición como
+    cancelada, de modo que las consultas siguientes no llegan a ejecutarse.
+    """
+
+    def __init__(self):
+        """Inicializa un alcance sin consultas en curso."""
+        self.cancelled = False
+        self._cancellers: Dict[int, Callable[[], None]] = {}
+        self._next_token = 0
+        self._lock = threading.Lock()
+
+    def register(self, cancel: Callable[[], None]) -> int:
+        """
+        Registra la función que cancela una consulta en curso.
+
+        Args:
+            cancel (Callable[[], None]): Cancela la consulta en el servidor.
+
+        Returns:
+            int: Identificador para `unregister`.
+
+        Raises:
+            QueryCancelledError: Si la petición ya fue cancelada.
+        """
+        with self._lock:
+            self.raise_if_cancelled()
+            self._next_token += 1
+            self._cancellers[self._next_token] = cancel
+            return self._next_token
+
+    def unregister(self, token: int) -> None:
+        """Quita una consulta terminada."""
+        with self._lock:
+            self._cancellers.pop(token, None)
+
+    def cancel(self) -> int:
+        """
+        Cancela las consultas en curso y las siguientes de la petición.
+
+        Returns:
+            int: Consultas en curso canceladas.
+        """
+        with self._lock:
+            self.cancelled = True
+            cancellers = list(self._cancellers.values())
+        for cancel in cancellers:
+            try:
+                cancel()
+            except Exception as e:
+                logging.warning("No se pudo cancelar una consulta en curso: {}", e)
+        return len(cancellers)
+
+    def raise_if_cancelled(self) -> None:
+        """Lanza `QueryCancelledError` si la petición fue cancelada."""
+        if self.cancelled:
+            raise QueryCancelledError("La petición fue cancelada.")
+
+# Alcance de cancelación de la petición en curso
+_query_scope: ContextVar[Optional[QueryCancelScope]] = ContextVar("query_scope", default=None)
+
+def bind_query_scope(scope: Optional[QueryCancelScope]) -> None:
+    """
+    Asocia un alcance de cancelación a la petición en curso (hilo o tarea actual).
+
+    Args:
+        scope (Optional[QueryCancelScope]): Alcance cuyas consultas se pueden cancelar.
+    """
+    _query_scope.set(scope)
+
+def current_query_scope() -> Optional[QueryCancelScope]:
+    """Devuelve el alcance de cancelación de la petición en curso, si lo hay."""
+    return _query_scope.get()
+
+@contextmanager
+def timed_stage(timings: Optional[Dict[str, float]], stage: str):
+    """
+    Mide la duración de una etapa del proceso, la registra en un diccionario y en las métricas de Prometheus.
+
+    Si la etapa se ejecuta varias veces, las duraciones se suman. Si termina con una excepción,
+    se cuenta como falla de la etapa y la excepción se propaga.
+
+    Args:
+        timings (Optional[Dict[str, float]]): Diccionario etapa -> segundos. Si es None, se usa el de
+            la petición en curso (ver `bind_request_timings`), si lo hay.
+        stage (str): Nombre de la etapa.
+
+    Si la petición tiene un límite para la etapa (ver `bind_stage_limits`), se espera un cupo antes
+    de empezar a medir.
+    """
+    if timings is None:
+        timings = _request_timings.get()
+    limit = (_stage_limits.get() or {}).get(stage)
+    if limit is not None:
+        limit.acquire()
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        if limit is not None:
+            limit.release()
+        elapsed = time.perf_counter() - start
+        if timings is not None:
+            timings[stage] = round(timings.get(stage, 0.0) + elapsed, 4)
+        observe_stage(stage, elapsed, error)
+        if error is None:
+            logging.bind(stage=stage, seconds=round(elapsed, 4)).info("Etapa '{}' completada en {:.3f} s.", stage, elapsed)
+        else:
+            logging.bind(stage=stage, seconds=round(elapsed, 4)).warning(
+                "Etapa '{}' falló tras {:.3f} s: {}", stage, elapsed, type(error).__name__)
+
+def as_subquery(sql: str, alias: str = "q") -> str:
+    """
+    Envuelve una consulta SQL como subconsulta para poder agregarla o filtrarla.
+
+    Elimina el punto y coma y las líneas de comentario `--` finales, y agrega un salto de línea
+    antes del paréntesis de cierre para que un comentario al final de la consulta no lo anule.
+
+    Args:
+        sql (str): Consulta SQL original (por ejemplo, la devuelta por `get_sql_statement`).
+        alias (str): Alias de la subconsulta.
+
+    Returns:
+        str: Fragmento `(consulta) alias` listo para usar en un FROM.
+    """
+    statement = sql.strip()
+    while True:
+        trimmed = re.sub(r"(?m)^\s*--[^\n]*\Z", "", statement).rstrip().rstrip(";").rstrip()
+        if trimmed == statement:
+            break
+        statement = trimmed
+    return f"(\n{statement}\n) {alias}"
@@ -1,15 +1,27 @@
-from typing import List, Dict, Any
+from typing import Dict, Any, Optional, Callable, TypeVar, Tuple, Sequence, List
+from contextlib import ExitStack
+import io
 import os
 from pathlib import Path
 from datetime import datetime
 import json
 import pandas as pd
-from ydata_profiling import ProfileReport
 
-from common import get_sql_statement
-from aws_secrets_handler import AWSSecretsManager
-from db_manager import SQLProcessor, DatabaseConfig
-from aws_s3_handler import S3Manager
+from common import get_sql_statement, timed_stage, as_subquery
+from aws_secrets_handler import secret_cache
+from db_manager import SQLProcessor, DatabaseConfig, DatabaseConnectionError, is_authentication_error
+from aws_s3_handler import get_s3_manager
+from column_stats import ProfileAccumulator
+from profiling_pool import get_profiling_pool
+from report_renderer import render_profile, OUTPUT_FORMATS
+from sharded_profiler import render_sharded_profile
+from pushdown_profiler import PushdownProfiler, report_to_frame, quote_identifier, limit_query
+from profile_state import ProfileState, ProfileStateStore, hash_sql
+from result_spool import result_spool, datasource_id
+from profile_history import profile_history
+from profile_manifest import profile_manifest, artifact_key
+from query_guard import (QUERY_GUARD_ENABLED, QUERY_QUEUE_TIMEOUT_SECONDS, QueryBudgetExceededError,
+                         AdmissionTimeoutError, guard_query, memory_admission)
 from logger_config import get_logger
 
 # Configuración de logs
@@ -19,8 +31,14 @@ APPMAINPATH = os.environ.get('APPMAINPATH')
 REGION_NAME = os.environ.get('REGION_NAME')
 BUCKET_NAME = os.environ.get('BUCKET_NAME')
 SECRET_NAME = os.environ.get('SECRET_NAME')
+STREAM_CHUNKSIZE = int(os.environ.get('STREAM_CHUNKSIZE', 50_000))
+STAGE_PROFILE_OUTPUT = os.environ.get('STAGE_PROFILE_OUTPUT', 'true').lower() in ('1', 'true', 'yes')
 
-def get_df(sql_filename: str) -> pd.DataFrame:
+T = TypeVar("T")
+
+def get_df(sql_filename: str, fetch_backend: str = "sqlalchemy", use_spool: bool = False,
+           refresh_spool: bool = False, over_budget: Optional[str] = None,
+           admission: Optional[ExitStack] = None) -> pd.DataFrame:
     """
     Obtiene un DataFrame a partir de una consulta SQL almacenada en un archivo.
 
@@ -30,98 +48,650 @@ def get_df(sql_filename: str) -> pd.DataFrame:
     - Carga la consulta SQL desde el archivo indicado.
     - Ejecuta la consulta y devuelve los resultados en un DataFrame de pandas.
 
+    Con `use_spool`, el resultado se guarda en el spool local de Arrow IPC y las siguientes lecturas
+    de la misma consulta sobre el mismo origen lo leen mediante memory-mapping mientras no expire.
+
+    Antes de leer, se estiman las filas y la memoria del resultado (ver `query_guard.guard_query`):
+    si superan el presupuesto, la consulta se rechaza, se lee una muestra aleatoria o espera memoria
+    libre en el pool del proceso según `over_budget`. La decisión queda en `df.attrs["query_guard"]`.
+
     Args:
         sql_filename (str): Nombre del archivo SQL dentro del directorio `/sql/`.
+        fetch_backend (str, opcional): 'sqlalchemy' (columnas `object`) o 'arrow' (lectura columnar
+            con texto `string[pyarrow]` y reporte de memoria en `df.attrs["arrow_memory"]`).
+        use_spool (bool, opcional): Reutilizar y guardar el resultado en el spool local.
+        refresh_spool (bool, opcional): Ignorar el resultado guardado, consultar la base y reemplazarlo.
+        over_budget (Optional[str], opcional): 'reject', 'sample' o 'queue' si la estimación supera el
+            presupuesto (por defecto `QUERY_OVER_BUDGET_ACTION`).
+        admission (Optional[ExitStack], opcional): Pila donde se mantiene la reserva de memoria del pool
+            hasta que el llamador la cierre (por ejemplo, al terminar el perfilado). Si es None, la
+            reserva se libera al terminar la lectura.
 
     Returns:
         pd.DataFrame: DataFrame con los resultados de la consulta SQL.
 
+    Raises:
+        ValueError: Si alguna de las variables de entorno necesarias no está definida.
+        FileNotFoundError: Si el archivo SQL no existe.
+        QueryBudgetExceededError: Si el resultado estimado supera el presupuesto y se debe rechazar.
+        AdmissionTimeoutError: Si no hubo memoria libre en el pool antes del tiempo máximo de espera.
+        Exception: Si hay un error en la conexión a la base de datos o en la ejecución del SQL.
+    """
+    logger.info("Obteniendo DataFrame desde la base de datos con la consulta '{}'...", sql_filename)
+    sql_path = _resolve_sql_path(sql_filename)
+
+    try:
+        logger.info("Cargando consulta SQL desde el archivo '{}'...", sql_path)
+        sql = get_sql_statement(str(sql_path))
+
+        spool_args = None
+        if use_spool and result_spool.enabled:
+            spool_args = (hash_sql(sql), datasource_id(_get_sql_processor().config), fetch_backend)
+            df = None if refresh_spool else result_spool.get(*spool_args)
+            if df is not None:
+                return df
+
+        logger.info("Ejecutando consulta SQL (lectura '{}')...", fetch_backend)
+        with ExitStack() as fetch_admission:
+            df = _run_with_credentials(lambda sqlprocessor: _fetch_guarded(
+                sqlprocessor, sql, fetch_backend, over_budget, admission or fetch_admission))
+
+        # Una muestra no representa el resultado de la consulta: no se reutiliza en otras peticiones
+        if df.attrs.get("query_guard", {}).get("action") == "sample":
+            spool_args = None
+        if spool_args is not None:
+            with timed_stage(None, "spool"):
+                entry = result_spool.put(df, *spool_args)
+            df.attrs["spool"] = {"hit": False, "stored": entry is not None}
+        return df
+
+    except (QueryBudgetExceededError, AdmissionTimeoutError) as e:
+        logger.warning(str(e))
+        raise
+    except Exception as e:
+        logger.error("Error al obtener el DataFrame desde la base de datos: {}", e)
+        raise Exception(f"Error al obtener el DataFrame desde la base de datos: {e}")
+
+def _fetch_guarded(sqlprocessor: SQLProcessor, sql: str, fetch_backend: str, over_budget: Optional[str],
+                   admission: ExitStack) -> pd.DataFrame:
+    """
+    Lee una consulta tras estimar su costo y reservar su memoria en el pool del proceso.
+
+    Args:
+        sqlprocessor (SQLProcessor): Procesador conectado a la base de datos.
+        sql (str): Consulta SQL.
+        fetch_backend (str): 'sqlalchemy' o 'arrow'.
+        over_budget (Optional[str]): Acción si la estimación supera el presupuesto.
+        admission (ExitStack): Pila donde se mantiene la reserva de memoria.
+
+    Returns:
+        pd.DataFrame: Resultado de la consulta (o de su muestra).
+    """
+    decision = None
+    if QUERY_GUARD_ENABLED:
+        with timed_stage(None, "guard"):
+            sql, decision = guard_query(sqlprocessor, sql, over_budget)
+        with timed_stage(None, "admission"):
+            admission.enter_context(memory_admission.reserve(decision["reserved_bytes"], QUERY_QUEUE_TIMEOUT_SECONDS))
+    df = sqlprocessor.fetch_arrow(sql) if fetch_backend == "arrow" else sqlprocessor.fetch_data(sql)
+    if decision is not None:
+        df.attrs["query_guard"] = decision
+    return df
+
+def get_profile_accumulator(sql_filename: str, chunksize: int = STREAM_CHUNKSIZE,
+                            approximate_columns: Sequence[str] = ()) -> ProfileAccumulator:
+    """
+    Perfila una consulta SQL por bloques sin cargar el resultado completo en memoria.
+
+    Esta función:
+    - Ejecuta la consulta con un cursor del lado del servidor.
+    - Lee el resultado en bloques de `chunksize` filas.
+    - Combina cada bloque en acumuladores por columna (conteos, nulos, min/max, momentos y valores frecuentes).
+
+    Args:
+        sql_filename (str): Nombre del archivo SQL dentro del directorio `/sql/`.
+        chunksize (int, opcional): Número de filas por bloque.
+        approximate_columns (Sequence[str], opcional): Columnas con distintos, cuantiles y valores
+            frecuentes aproximados (`*` para todas).
+
+    Returns:
+        ProfileAccumulator: Estadísticas acumuladas de todas las columnas.
+
     Raises:
         ValueError: Si alguna de las variables de entorno necesarias no está definida.
         FileNotFoundError: Si el archivo SQL no existe.
         Exception: Si hay un error en la conexión a la base de datos o en la ejecución del SQL.
     """
-    logger.info(f"Obteniendo DataFrame desde la base de datos con la consulta '{sql_filename}'...")
+    logger.info("Perfilando por bloques de {} filas la consulta '{}'...", chunksize, sql_filename)
+    sql_path = _resolve_sql_path(sql_filename)
+
+    try:
+        logger.info("Cargando consulta SQL desde el archivo '{}'...", sql_path)
+        sql = get_sql_statement(str(sql_path))
+
+        logger.info("Ejecutando consulta SQL en modo streaming...")
+        return _run_with_credentials(
+            lambda sqlprocessor: ProfileAccumulator(approximate_columns=approximate_columns).update_many(
+                sqlprocessor.fetch_data_chunks(sql, chunksize)
+            )
+        )
+
+    except Exception as e:
+        logger.error("Error al perfilar por bloques la consulta: {}", e)
+        raise Exception(f"Error al perfilar por bloques la consulta: {e}")
+
+def get_pushdown_profile(sql_filename: str, histogram_bins: int = 0) -> Dict[str, Any]:
+    """
+    Perfila una consulta SQL calculando las estadísticas dentro de la base de datos.
+
+    Esta función:
+    - Carga la consulta SQL desde el archivo indicado.
+    - Obtiene una muestra pequeña para inferir el tipo de cada columna.
+    - Ejecuta consultas de agregación (conteos, nulos, distintos, min/max, media y desviación estándar).
+    - Opcionalmente, calcula histogramas de las columnas numéricas en la base de datos.
+
+    Args:
+        sql_filename (str): Nombre del archivo SQL dentro del directorio `/sql/`.
+        histogram_bins (int, opcional): Intervalos de los histogramas numéricos (0 para omitirlos).
+
+    Returns:
+        Dict[str, Any]: Reporte con secciones `table`, `variables` y `sample`.
+
+    Raises:
+        ValueError: Si alguna de las variables de entorno necesarias no está definida.
+        FileNotFoundError: Si el archivo SQL no existe.
+        Exception: Si hay un error en la conexión a la base de datos o en la ejecución del SQL.
+    """
+    logger.info("Perfilando en la base de datos la consulta '{}'...", sql_filename)
+    sql_path = _resolve_sql_path(sql_filename)
+
+    try:
+        logger.info("Cargando consulta SQL desde el archivo '{}'...", sql_path)
+        sql = get_sql_statement(str(sql_path))
+
+        logger.info("Ejecutando consultas de agregación...")
+        return _run_with_credentials(
+            lambda sqlprocessor: PushdownProfiler(sqlprocessor).profile(sql, histogram_bins)
+        )
+
+    except Exception as e:
+        logger.error("Error al perfilar la consulta en la base de datos: {}", e)
+        raise Exception(f"Error al perfilar la consulta en la base de datos: {e}")
+
+def get_incremental_profile(sql_filename: str, profile_name: str, watermark_column: str,
+                            chunksize: int = STREAM_CHUNKSIZE, reset: bool = False,
+                            approximate_columns: Sequence[str] = ()) -> Tuple[ProfileAccumulator, Dict[str, Any]]:
+    """
+    Actualiza un perfil incremental leyendo solo las filas posteriores a la última marca de agua.
+
+    Esta función:
+    - Carga el estado guardado del perfil (estadísticas combinables y última marca de agua).
+    - Lee por bloques las filas cuya columna `watermark_column` es mayor que la marca de agua.
+    - Combina esas filas con el estado guardado y persiste el nuevo estado.
+
+    Si no hay estado, si la consulta o las columnas aproximadas cambiaron o si `reset` es True, se perfila
+    la consulta completa.
+    Las filas modificadas después de ser procesadas no se descuentan: el modo está pensado para
+    tablas de solo inserción con una columna como `created_at`.
+
+    Args:
+        sql_filename (str): Nombre del archivo SQL dentro del directorio `/sql/`.
+        profile_name (str): Nombre del perfil (identifica el estado guardado).
+        watermark_column (str): Columna creciente usada como marca de agua.
+        chunksize (int, opcional): Número de filas por bloque.
+        reset (bool, opcional): Si es True, descarta el estado guardado.
+        approximate_columns (Sequence[str], opcional): Columnas con distintos, cuantiles y valores
+            frecuentes aproximados (`*` para todas).
+
+    Returns:
+        Tuple[ProfileAccumulator, Dict[str, Any]]: Perfil acumulado y detalle de la actualización incremental.
+
+    Raises:
+        ValueError: Si faltan variables de entorno o la columna de marca de agua no existe en el resultado.
+        FileNotFoundError: Si el archivo SQL no existe.
+        Exception: Si hay un error en la conexión a la base de datos o en la ejecución del SQL.
+    """
+    logger.info("Actualizando el perfil incremental {} con la marca de agua '{}'...", profile_name, watermark_column)
+    sql_path = _resolve_sql_path(sql_filename)
+
+    try:
+        logger.info("Cargando consulta SQL desde el archivo '{}'...", sql_path)
+        sql = get_sql_statement(str(sql_path))
+
+        state_store = _get_state_store()
+        state = None if reset else state_store.load(profile_name)
+        if state is not None and (state.sql_hash != hash_sql(sql) or state.watermark_column != watermark_column):
+            logger.warning("La consulta o la columna de marca de agua cambiaron; se reconstruye el perfil completo.")
+            state = None
+        if state is not None and sorted(state.accumulator.get("approximate_columns") or []) != sorted(approximate_columns):
+            logger.warning("Las columnas con estadísticas aproximadas cambiaron; se reconstruye el perfil completo.")
+            state = None
+        watermark = state.get_watermark() if state is not None else None
+
+        def fetch_delta(sqlprocessor: SQLProcessor) -> ProfileAccumulator:
+            query = f"SELECT * FROM {as_subquery(sql)}"
+            params = None
+            if watermark is not None:
+                query += f"\nWHERE {quote_identifier(watermark_column, sqlprocessor.config.db_type)} > :watermark"
+                params = {"watermark": watermark}
+            return ProfileAccumulator(approximate_columns=approximate_columns).update_many(
+                sqlprocessor.fetch_data_chunks(query, chunksize, params)
+            )
+
+        logger.info("Leyendo filas con {} > {}...", watermark_column, watermark)
+        delta = _run_with_credentials(fetch_delta)
+
+        delta_column = delta.columns.get(watermark_column)
+        if delta.n_rows and delta_column is None:
+            raise ValueError(f"La columna de marca de agua '{watermark_column}' no existe en el resultado de la consulta.")
+        if delta_column is not None and delta_column.kind not in (None, "datetime", "numeric"):
+            raise ValueError(f"La columna de marca de agua '{watermark_column}' debe ser numérica o de fecha.")
+
+        accumulator = state.get_accumulator().merge(delta) if state is not None else delta
+        new_state = ProfileState(
+            profile_name=profile_name,
+            sql_hash=hash_sql(sql),
+            watermark_column=watermark_column,
+            watermark=state.watermark if state is not None else None,
+            watermark_kind=state.watermark_kind if state is not None else None,
+            accumulator=accumulator.to_dict(),
+            runs=(state.runs if state is not None else 0) + 1,
+        )
+        if delta_column is not None and delta_column.max is not None:
+            new_state.watermark_kind = "datetime" if delta_column.kind == "datetime" else "numeric"
+            new_state.watermark = (pd.Timestamp(delta_column.max).isoformat()
+                                   if new_state.watermark_kind == "datetime" else delta_column.max)
+        state_store.save(new_state)
+
+        incremental = {
+            "watermark_column": watermark_column,
+            "previous_watermark": state.watermark if state is not None else None,
+            "watermark": new_state.watermark,
+            "delta_rows": delta.n_rows,
+            "total_rows": accumulator.n_rows,
+            "runs": new_state.runs,
+        }
+        logger.info("Perfil incremental actualizado: {}", incremental)
+        return accumulator, incremental
+
+    except ValueError:
+        raise
+
+    except Exception as e:
+        logger.error("Error al actualizar el perfil incremental: {}", e)
+        raise Exception(f"Error al actualizar el perfil incremental: {e}")
+
+def get_data_fingerprint(sql_filename: str, fingerprint_column: str) -> Tuple[str, Optional[str]]:
+    """
+    Calcula una huella barata de los datos de una consulta para decidir si un perfil anterior sigue vigente.
+
+    La huella es el número de filas y el valor máximo de `fingerprint_column` (por ejemplo, `updated_at`),
+    calculados con una sola consulta de agregación en la base de datos. Si la columna no existe en el
+    resultado no se calcula huella, porque el conteo de filas por sí solo no detecta filas modificadas.
+    Si las consultas de la huella fallan, tampoco se calcula y el perfilado continúa sin caché.
+
+    Args:
+        sql_filename (str): Nombre del archivo SQL dentro del directorio `/sql/`.
+        fingerprint_column (str): Columna que cambia cada vez que se modifica una fila.
+
+    Returns:
+        Tuple[str, Optional[str]]: Hash del texto de la consulta y huella de los datos (None si no se pudo calcular).
+
+    Raises:
+        ValueError: Si alguna de las variables de entorno necesarias no está definida.
+        FileNotFoundError: Si el archivo SQL no existe.
+        Exception: Si no se pudo leer la consulta SQL.
+    """
+    sql_path = _resolve_sql_path(sql_filename)
+
+    try:
+        sql = get_sql_statement(str(sql_path))
+
+        def fetch_fingerprint(sqlprocessor: SQLProcessor) -> Optional[str]:
+            db_type = sqlprocessor.config.db_type
+            columns = sqlprocessor.fetch_data(limit_query(sql, 0, db_type)).columns
+            if fingerprint_column not in columns:
+                logger.warning("La columna de huella '{}' no existe en el resultado; "
+                               "no se usará la caché de resultados.", fingerprint_column)
+                return None
+            column = quote_identifier(fingerprint_column, db_type)
+            row = sqlprocessor.fetch_data(
+                f"SELECT COUNT(*) AS n_rows, MAX({column}) AS max_value FROM {as_subquery(sql)}"
+            ).iloc[0]
+            return f"{int(row.iloc[0])}|{row.iloc[1]}"
+
+        try:
+            fingerprint = _run_with_credentials(fetch_fingerprint)
+        except Exception as e:
+            # Por ejemplo, SQL Server no admite un CTE o un ORDER BY sin TOP dentro de una subconsulta
+            logger.warning("No se pudo calcular la huella de los datos de '{}' ({}); "
+                           "no se usará la caché de resultados.", sql_filename, e)
+            fingerprint = None
+        logger.info("Huella de datos de '{}': {}", sql_filename, fingerprint)
+        return hash_sql(sql), fingerprint
+
+    except Exception as e:
+        logger.error("Error al calcular la huella de los datos: {}", e)
+        raise Exception(f"Error al calcular la huella de los datos: {e}")
+
+def _get_state_store() -> ProfileStateStore:
+    """
+    Crea el almacén de estados incrementales en `APPMAINPATH/profile_state`, replicado en S3 si hay bucket.
+
+    Returns:
+        ProfileStateStore: Almacén de estados.
+    """
+    s3_manager = get_s3_manager(REGION_NAME) if BUCKET_NAME else None
+    return ProfileStateStore(f"{APPMAINPATH}/profile_state", s3_manager, BUCKET_NAME)
+
+def _resolve_sql_path(sql_filename: str) -> Path:
+    """
+    Valida las variables de entorno y devuelve la ruta del archivo SQL.
+
+    Args:
+        sql_filename (str): Nombre del archivo SQL dentro del directorio `/sql/`.
+
+    Returns:
+        Path: Ruta absoluta del archivo SQL.
+
+    Raises:
+        ValueError: Si alguna de las variables de entorno necesarias no está definida.
+        FileNotFoundError: Si el archivo SQL no existe.
+    """
     if not REGION_NAME or not SECRET_NAME or not APPMAINPATH:
         logger.error("Las variables de entorno 'REGION_NAME', 'SECRET_NAME' o 'APPMAINPATH' no están definidas.")
         raise ValueError("Las variables de entorno 'REGION_NAME', 'SECRET_NAME' o 'APPMAINPATH' no están definidas.")
 
-    logger.info(f"Obteniendo DataFrame desde la base de datos con la consulta '{sql_filename}'...")
     sql_path = Path(APPMAINPATH) / "sql" / sql_filename
 
     if not sql_path.exists():
-        logger.error(f"El archivo SQL '{sql_path}' no existe.")
+        logger.error("El archivo SQL '{}' no existe.", sql_path)
         raise FileNotFoundError(f"El archivo SQL '{sql_path}' no existe.")
 
-    try:
-        logger.info("Obteniendo credenciales de AWS Secrets Manager...")
-        with AWSSecretsManager(REGION_NAME) as sm:
-            secret = {"db_type": "postgresql", **sm.get_secret(SECRET_NAME)}
+    return sql_path
 
-        logger.info("Configurando conexión a la base de datos...")
-        dbconfig = DatabaseConfig(**secret)
-        sqlprocessor = SQLProcessor(dbconfig)
+def list_sql_files(pattern: str) -> List[str]:
+    """
+    Lista los archivos SQL del directorio `/sql/` que coinciden con un patrón glob.
 
-        logger.info(f"Cargando consulta SQL desde el archivo '{sql_path}'...")
-        sql = get_sql_statement(str(sql_path))
+    Args:
+        pattern (str): Patrón relativo al directorio `/sql/` (por ejemplo, `market_*.sql` o `ventas/*.sql`).
 
-        logger.info("Ejecutando consulta SQL...")
-        return sqlprocessor.fetch_data(sql)
+    Returns:
+        List[str]: Nombres de archivo relativos a `/sql/`, ordenados.
 
-    except Exception as e:
-        logger.error(f"Error al obtener el DataFrame desde la base de datos: {e}")
-        raise Exception(f"Error al obtener el DataFrame desde la base de datos: {e}")
+    Raises:
+        ValueError: Si el patrón sale del directorio `/sql/` o faltan variables de entorno.
+    """
+    if not APPMAINPATH:
+        raise ValueError("La variable de entorno 'APPMAINPATH' no está definida.")
+    if Path(pattern).is_absolute() or ".." in Path(pattern).parts:
+        raise ValueError(f"El patrón '{pattern}' debe ser relativo al directorio /sql/.")
+
+    sql_dir = Path(APPMAINPATH) / "sql"
+    return sorted(str(path.relative_to(sql_dir)) for path in sql_dir.glob(pattern) if path.is_file())
+
+def _get_sql_processor(force_refresh: bool = False) -> SQLProcessor:
+    """
+    Obtiene las credenciales desde la caché de AWS Secrets Manager y crea el procesador SQL.
+
+    Args:
+        force_refresh (bool): Si es True, vuelve a leer el secreto desde AWS ignorando la caché.
 
-def run_profiling(df: pd.DataFrame, profile_name: str) -> Dict[str, Any]:
+    Returns:
+        SQLProcessor: Procesador conectado a la base de datos.
+    """
+    logger.info("Obteniendo credenciales de AWS Secrets Manager...")
+    with timed_stage(None, "secrets"):
+        secret = {"db_type": "postgresql", **secret_cache.get(SECRET_NAME, force_refresh=force_refresh)}
+
+    logger.info("Configurando conexión a la base de datos...")
+    dbconfig = DatabaseConfig(**secret)
+    return SQLProcessor(dbconfig)
+
+def _run_with_credentials(action: Callable[[SQLProcessor], T]) -> T:
+    """
+    Ejecuta una acción sobre la base de datos y, si falla la autenticación, reintenta una vez
+    con el secreto leído de nuevo desde AWS (el secreto pudo haber sido rotado).
+
+    Args:
+        action (Callable[[SQLProcessor], T]): Acción a ejecutar con el procesador SQL.
+
+    Returns:
+        T: Resultado de la acción.
+    """
+    sqlprocessor = _get_sql_processor()
+    try:
+        return action(sqlprocessor)
+    except DatabaseConnectionError as e:
+        if not is_authentication_error(e):
+            raise
+        logger.warning("Fallo de autenticación en la base de datos; se refresca el secreto y se reintenta.")
+        sqlprocessor.dispose_engine()
+        return action(_get_sql_processor(force_refresh=True))
+
+def run_profiling(df: pd.DataFrame, profile_name: str, timings: Optional[Dict[str, float]] = None,
+                  outputs: Sequence[str] = OUTPUT_FORMATS, shard_columns: Optional[int] = None,
+                  tier: str = "full", approximate_columns: Sequence[str] = (),
+                  sample: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Genera un informe de perfilado de datos y lo guarda en formatos HTML, JSON y CSV.
     Luego, sube estos archivos a un bucket de S3.
 
+    La descripción del DataFrame se calcula una sola vez y todos los formatos se generan
+    en memoria a partir de ella; solo se generan los formatos indicados en `outputs`.
+    Si se indica `shard_columns`, las columnas se perfilan por grupos en paralelo (tablas anchas).
+
     Args:
         df (pd.DataFrame): DataFrame a ser perfilado.
         profile_name (str): Nombre del perfil para los archivos generados.
+        timings (Optional[Dict[str, float]]): Diccionario donde se registra la duración de cada etapa.
+        outputs (Sequence[str]): Formatos a generar ('html', 'json', 'csv').
+        shard_columns (Optional[int]): Columnas por grupo en el perfilado de tablas anchas.
+        tier (str): Nivel de perfilado de ydata-profiling ('minimal', 'standard' o 'full'); no aplica por grupos.
+        approximate_columns (Sequence[str]): Columnas con estadísticas aproximadas (`*` para todas); no aplica por grupos.
+        sample (Optional[Dict[str, Any]]): Decisión de `query_guard` si el DataFrame es una muestra de la
+            consulta; el título del reporte lo indica y la ejecución no se guarda en el historial.
 
     Returns:
-        None
+        Dict[str, Any]: Rutas de los archivos generados en S3.
     """
     actual_datetime: str = datetime.now().strftime("%Y%m%d_%H%M%S")
-    html_filepath: str = f"{APPMAINPATH}/profile_output/{actual_datetime}_{profile_name}.html"
-    json_filepath: str = f"{APPMAINPATH}/profile_output/{actual_datetime}_{profile_name}.json"
-    csv_filepath: str = f"{APPMAINPATH}/profile_output/{actual_datetime}_{profile_name}.csv"
-    
-    profile = ProfileReport(df, title=f"{actual_datetime}.{profile_name}")
-    profile.to_file(html_filepath)
-    profile.to_file(json_filepath)
-
-    with open(json_filepath, "r") as f:
-        data = json.load(f)
-
-    vars_to_omit: List[str] = ["value_counts_without_nan", "value_counts_index_sorted", "histogram"]
-    consolidated_data = {}
-    
-    for var in data["variables"].keys():
-        consolidated_data[var] = {}
-        for key in data["variables"][var].keys():
-            if key not in vars_to_omit:
-                consolidated_data[var][key] = data["variables"][var][key]
-    
-    df_output = pd.DataFrame(consolidated_data).T.reset_index().rename(columns={"index": "variable"})
-    df_output.to_csv(csv_filepath, index=False)
-
-    s3_manager = S3Manager(REGION_NAME)
-    s3_manager.upload_file(html_filepath, BUCKET_NAME, f"profiling/{actual_datetime}_{profile_name}.html")
-    s3_manager.upload_file(json_filepath, BUCKET_NAME, f"profiling/{actual_datetime}_{profile_name}.json")
-    s3_manager.upload_file(csv_filepath, BUCKET_NAME, f"profiling/{actual_datetime}_{profile_name}.csv")
-    
+    # El historial se alimenta del CSV, que se genera aunque no se haya pedido (no se sube a S3)
+    render_outputs = list(outputs) + ["csv"] if profile_history.enabled and "csv" not in outputs else list(outputs)
+
+    with timed_stage(timings, "report"):
+        title = f"{actual_datetime}.{profile_name}"
+        if sample is not None:
+            title += f" (muestra aleatoria de {len(df)} de ~{sample['estimated_rows']} filas)"
+        profiling_pool = get_profiling_pool()
+        if shard_columns is not None:
+            rendered = render_sharded_profile(df, title, render_outputs, shard_columns, timings)
+        elif profiling_pool is not None:
+            rendered = profiling_pool.run(render_profile, df, title, render_outputs, tier, list(approximate_columns))
+        else:
+            rendered = render_profile(df, title, render_outputs, tier, approximate_columns)
+
+        contents = {output_format.upper(): rendered[output_format]
+                    for output_format in OUTPUT_FORMATS if output_format in rendered and output_format in outputs}
+
+    with timed_stage(timings, "write"):
+        _stage_outputs(contents, actual_datetime, profile_name)
+
+    with timed_stage(timings, "upload"):
+        message = _upload_outputs(contents, actual_datetime, profile_name)
+
+    if sample is not None:
+        logger.info("El perfil de {} es de una muestra; no se guarda en el historial.", profile_name)
+    elif "csv" in rendered:
+        _record_history(lambda: pd.read_csv(io.StringIO(rendered["csv"])), actual_datetime, profile_name, message, timings)
+    return message
+
+def run_streaming_profiling(accumulator: ProfileAccumulator, profile_name: str,
+                            timings: Optional[Dict[str, float]] = None,
+                            outputs: Sequence[str] = OUTPUT_FORMATS) -> Dict[str, Any]:
+    """
+    Genera los archivos JSON y CSV de un perfil calculado por bloques y los sube a S3.
+
+    El CSV mantiene el formato del que genera `run_profiling`. No se genera HTML porque
+    ydata-profiling necesita el DataFrame completo en memoria.
+
+    Args:
+        accumulator (ProfileAccumulator): Estadísticas acumuladas por `get_profile_accumulator`.
+        profile_name (str): Nombre del perfil para los archivos generados.
+        timings (Optional[Dict[str, float]]): Diccionario donde se registra la duración de cada etapa.
+        outputs (Sequence[str]): Formatos a generar ('json', 'csv'); 'html' se ignora.
+
+    Returns:
+        Dict[str, Any]: Rutas de los archivos generados en S3.
+    """
+    with timed_stage(timings, "report"):
+        report, summary = accumulator.to_report(), accumulator.to_frame()
+    return _write_summary_outputs(report, summary, profile_name, timings, outputs)
+
+def run_pushdown_profiling(report: Dict[str, Any], profile_name: str,
+                           timings: Optional[Dict[str, float]] = None,
+                           outputs: Sequence[str] = OUTPUT_FORMATS) -> Dict[str, Any]:
+    """
+    Genera los archivos JSON y CSV de un perfil calculado en la base de datos y los sube a S3.
+
+    Args:
+        report (Dict[str, Any]): Reporte generado por `get_pushdown_profile`.
+        profile_name (str): Nombre del perfil para los archivos generados.
+        timings (Optional[Dict[str, float]]): Diccionario donde se registra la duración de cada etapa.
+        outputs (Sequence[str]): Formatos a generar ('json', 'csv'); 'html' se ignora.
+
+    Returns:
+        Dict[str, Any]: Rutas de los archivos generados en S3.
+    """
+    with timed_stage(timings, "report"):
+        summary = report_to_frame(report)
+    return _write_summary_outputs(report, summary, profile_name, timings, outputs)
+
+def _write_summary_outputs(report: Dict[str, Any], summary: pd.DataFrame, profile_name: str,
+                           timings: Optional[Dict[str, float]] = None,
+                           outputs: Sequence[str] = OUTPUT_FORMATS) -> Dict[str, Any]:
+    """
+    Guarda un reporte resumido en JSON y su tabla en CSV, y los sube a S3.
+
+    Args:
+        report (Dict[str, Any]): Reporte con secciones `table` y `variables`.
+        summary (pd.DataFrame): Tabla resumen con el formato del CSV de `run_profiling`.
+        profile_name (str): Nombre del perfil para los archivos generados.
+        timings (Optional[Dict[str, float]]): Diccionario donde se registra la duración de cada etapa.
+        outputs (Sequence[str]): Formatos a generar ('json', 'csv'); 'html' se ignora.
+
+    Returns:
+        Dict[str, Any]: Rutas de los archivos generados en S3.
+    """
+    actual_datetime: str = datetime.now().strftime("%Y%m%d_%H%M%S")
+    contents: Dict[str, str] = {}
+
+    with timed_stage(timings, "report"):
+        if "json" in outputs:
+            contents["JSON"] = json.dumps(report, indent=4, default=str)
+        if "csv" in outputs:
+            contents["CSV"] = summary.to_csv(index=False)
+
+    with timed_stage(timings, "write"):
+        _stage_outputs(contents, actual_datetime, profile_name)
+
+    with timed_stage(timings, "upload"):
+        message = _upload_outputs(contents, actual_datetime, profile_name)
+
+    _record_history(lambda: summary, actual_datetime, profile_name, message, timings)
+    return message
+
+def _record_history(get_summary: Callable[[], pd.DataFrame], actual_datetime: str, profile_name: str,
+                    message: Dict[str, Any], timings: Optional[Dict[str, float]] = None) -> None:
+    """
+    Guarda el resumen por columna de la ejecución en el historial de perfiles.
+
+    Un error del historial se registra como advertencia: los archivos ya se subieron a S3 y la
+    petición no debe fallar por esta causa. Si algún archivo no se pudo subir, la ejecución no se
+    guarda, porque el historial apuntaría a archivos que no existen.
+
+    Args:
+        get_summary (Callable[[], pd.DataFrame]): Devuelve la tabla resumen con el formato del CSV.
+        actual_datetime (str): Marca de tiempo usada en los nombres de archivo.
+        profile_name (str): Nombre del perfil.
+        message (Dict[str, Any]): Rutas en S3 de los archivos generados.
+        timings (Optional[Dict[str, float]]): Diccionario donde se registra la duración de cada etapa.
+    """
+    if not profile_history.enabled:
+        return
+    if message.get("failed_uploads"):
+        logger.warning("La ejecución de {} no se guarda en el historial: "
+                       "no se subieron {}.", profile_name, message['failed_uploads'])
+        return
+    try:
+        with timed_stage(timings, "history"):
+            profile_history.record_run(profile_name, datetime.strptime(actual_datetime, "%Y%m%d_%H%M%S"),
+                                       get_summary(), message)
+    except Exception as e:
+        logger.warning("No se pudo guardar el perfil {} en el historial: {}", profile_name, e)
+
+def _stage_outputs(contents: Dict[str, str], actual_datetime: str, profile_name: str) -> None:
+    """
+    Guarda una copia local de los archivos generados en `profile_output/` si `STAGE_PROFILE_OUTPUT` está activo.
+
+    Args:
+        contents (Dict[str, str]): Formato ('HTML', 'JSON', 'CSV') -> contenido del archivo.
+        actual_datetime (str): Marca de tiempo usada en los nombres de archivo.
+        profile_name (str): Nombre del perfil.
+    """
+    if not STAGE_PROFILE_OUTPUT:
+        return
+    for output_format, content in contents.items():
+        filepath = f"{APPMAINPATH}/profile_output/{actual_datetime}_{profile_name}.{output_format.lower()}"
+        with open(filepath, "w") as f:
+            f.write(content)
+
+def _upload_outputs(contents: Dict[str, str], actual_datetime: str, profile_name: str) -> Dict[str, Any]:
+    """
+    Sube en paralelo a S3, desde memoria, los archivos generados y construye el mensaje con sus rutas.
+
+    Los archivos subidos se registran en el manifiesto de perfiles (ver `ProfileManifest`); un error
+    del manifiesto se registra como advertencia y no hace fallar la petición. Las rutas de los archivos
+    que no se pudieron subir no se incluyen en el mensaje: sus formatos quedan en `failed_uploads`.
+
+    Args:
+        contents (Dict[str, str]): Formato ('HTML', 'JSON', 'CSV') -> contenido del archivo.
+        actual_datetime (str): Marca de tiempo usada en los nombres de archivo.
+        profile_name (str): Nombre del perfil.
+
+    Returns:
+        Dict[str, Any]: Región, bucket, rutas en S3 de cada archivo subido y, si alguno falló, `failed_uploads`.
+    """
     message: Dict[str, Any] = {
         "REGIÓN": REGION_NAME,
         "BUCKET_NAME": BUCKET_NAME,
-        "HTML path": f"s3://{BUCKET_NAME}/profiling/{actual_datetime}_{profile_name}.html",
-        "JSON path": f"s3://{BUCKET_NAME}/profiling/{actual_datetime}_{profile_name}.json",
-        "CSV path": f"s3://{BUCKET_NAME}/profiling/{actual_datetime}_{profile_name}.csv"
-        }
-    
-    logger.info(f"Perfil generado exitosamente para {profile_name}.")
-    logger.info(f"Rutas de los archivos generados: {message}")
-    
-    return message
\ No newline at end of file
+    }
+
+    objects: Dict[str, bytes] = {}
+    formats: Dict[str, str] = {}
+    for output_format, content in contents.items():
+        s3_key = artifact_key(actual_datetime, profile_name, output_format)
+        objects[s3_key] = content.encode("utf-8")
+        formats[s3_key] = output_format
+    uploaded = get_s3_manager(REGION_NAME).upload_many(objects, BUCKET_NAME)
+    for s3_key, ok in uploaded.items():
+        if ok:
+            message[f"{formats[s3_key]} path"] = f"s3://{BUCKET_NAME}/{s3_key}"
+    failed = [formats[s3_key] for s3_key, ok in uploaded.items() if not ok]
+    if failed:
+        message["failed_uploads"] = failed
+        logger.error("No se pudieron subir a S3 los archivos {} del perfil {}.", failed, profile_name)
+    else:
+        logger.info("Perfil generado exitosamente para {}.", profile_name)
+    logger.debug("Rutas de los archivos generados: {}", message)
+
+    if profile_manifest.enabled:
+        sizes = {formats[s3_key]: len(objects[s3_key]) for s3_key, ok in uploaded.items() if ok}
+        try:
+            with timed_stage(None, "manifest"):
+                profile_manifest.record_run(profile_name, actual_datetime, sizes)
+        except Exception as e:
+            logger.warning("No se pudo registrar el perfil {} en el manifiesto: {}", profile_name, e)
+
+    return message
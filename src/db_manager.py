@@ -1,12 +1,23 @@
 
-from typing import Optional
+from typing import Optional, Iterator, Iterable, Dict, Any, List, Tuple
+import hashlib
+import io
+import itertools
+import os
+import threading
+import time
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 import warnings
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
-import cx_Oracle
-from contextlib import closing
+from contextlib import closing, contextmanager
 from pydantic import BaseModel, Field, validator
+from arrow_io import arrow_to_pandas, memory_report
+from common import as_subquery, current_query_scope
 from logger_config import get_logger
 
 # Configuración de logs
@@ -49,15 +60,328 @@ class DatabaseConfig(BaseModel):
         Returns:
             str: URL de conexión.
         """
+        if self.db_type == "oracle":
+            # El driver de Oracle solo se carga si se usa: requiere las librerías cliente de Oracle
+            import cx_Oracle
+            return f"oracle+cx_oracle://{self.user}:{self.password}@{cx_Oracle.makedsn(self.host, self.port, service_name=self.database)}"
         db_urls = {
             "postgresql": f"postgresql+psycopg2://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}",
             "redshift": f"redshift+psycopg2://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}",
             "mysql": f"mysql+pymysql://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}",
             "sqlserver": f"mssql+pyodbc://{self.user}:{self.password}@{self.host},{self.port}/{self.database}?driver={self.driver or '{ODBC Driver 17 for SQL Server}'}",
-            "oracle": f"oracle+cx_oracle://{self.user}:{self.password}@{cx_Oracle.makedsn(self.host, self.port, service_name=self.database)}"
         }
         return db_urls[self.db_type]
 
+    def cache_key(self) -> str:
+        """
+        Genera un hash estable de la configuración de conexión (incluye las credenciales).
+
+        Returns:
+            str: Hash SHA-256 de la URL de conexión.
+        """
+        return hashlib.sha256(self.get_connection_url().encode("utf-8")).hexdigest()
+
+    def identity(self) -> Tuple[str, str, int, str, str]:
+        """
+        Identifica el destino de la conexión sin la contraseña, para detectar rotaciones de credenciales.
+
+        Returns:
+            Tuple[str, str, int, str, str]: (db_type, host, port, database, user).
+        """
+        return (self.db_type, self.host, self.port, self.database, self.user)
+
+
+# Parámetros del pool de conexiones por tipo de base de datos
+DEFAULT_POOL_SETTINGS: Dict[str, Any] = {
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_pre_ping": True,
+    "pool_recycle": 1800,
+}
+# Duración máxima de cada sentencia en el servidor, salvo que se configure otra por tipo de base de datos
+DEFAULT_STATEMENT_TIMEOUT_SECONDS = 3600
+POOL_SETTINGS_BY_DB_TYPE: Dict[str, Dict[str, Any]] = {
+    "postgresql": {},
+    "redshift": {"pool_recycle": 600},  # Redshift cierra conexiones inactivas con frecuencia
+    "mysql": {"pool_recycle": 3600},
+    "sqlserver": {},
+    "oracle": {},
+}
+
+
+def get_pool_settings(db_type: str) -> Dict[str, Any]:
+    """
+    Obtiene los parámetros del pool para un tipo de base de datos.
+
+    Cada parámetro se puede sobrescribir con las variables de entorno `DB_<PARAMETRO>_<DB_TYPE>`
+    (por ejemplo `DB_POOL_SIZE_REDSHIFT`) o `DB_<PARAMETRO>` para todos los tipos.
+
+    Args:
+        db_type (str): Tipo de base de datos.
+
+    Returns:
+        Dict[str, Any]: Argumentos de pool para `create_engine`.
+    """
+    settings = {**DEFAULT_POOL_SETTINGS, **POOL_SETTINGS_BY_DB_TYPE.get(db_type, {})}
+    for name, default in settings.items():
+        value = os.environ.get(f"DB_{name.upper()}_{db_type.upper()}", os.environ.get(f"DB_{name.upper()}"))
+        if value is None:
+            continue
+        settings[name] = value.lower() in ("1", "true", "yes") if isinstance(default, bool) else int(value)
+    return settings
+
+
+def get_statement_timeout(db_type: str) -> float:
+    """
+    Obtiene el tiempo máximo de ejecución de cada sentencia para un tipo de base de datos.
+
+    Se configura con `DB_STATEMENT_TIMEOUT_SECONDS_<DB_TYPE>` o `DB_STATEMENT_TIMEOUT_SECONDS` para
+    todos los tipos (0 lo desactiva).
+
+    Args:
+        db_type (str): Tipo de base de datos.
+
+    Returns:
+        float: Segundos (0 si no hay límite).
+    """
+    value = os.environ.get(f"DB_STATEMENT_TIMEOUT_SECONDS_{db_type.upper()}",
+                           os.environ.get("DB_STATEMENT_TIMEOUT_SECONDS", DEFAULT_STATEMENT_TIMEOUT_SECONDS))
+    return max(0.0, float(value))
+
+
+def set_statement_timeout(dbapi_connection: Any, db_type: str, seconds: float) -> None:
+    """
+    Limita en el servidor la duración de las sentencias de una conexión nueva.
+
+    PostgreSQL y Redshift usan `statement_timeout`, MySQL `max_execution_time` (solo SELECT), SQL Server
+    el tiempo de espera de consulta de ODBC (el driver pide al servidor cancelar la sentencia) y Oracle
+    `call_timeout` de cx_Oracle.
+
+    Args:
+        dbapi_connection (Any): Conexión del driver.
+        db_type (str): Tipo de base de datos.
+        seconds (float): Duración máxima de cada sentencia.
+    """
+    milliseconds = int(seconds * 1000)
+    if db_type in ("postgresql", "redshift", "mysql"):
+        statement = (f"SET SESSION max_execution_time = {milliseconds}" if db_type == "mysql"
+                     else f"SET statement_timeout = {milliseconds}")
+        with closing(dbapi_connection.cursor()) as cursor:
+            cursor.execute(statement)
+        dbapi_connection.commit()
+    elif db_type == "sqlserver":
+        dbapi_connection.timeout = max(1, int(seconds))
+    elif db_type == "oracle":
+        dbapi_connection.call_timeout = milliseconds
+
+
+class EngineRegistry:
+    """
+    Registro de motores SQLAlchemy compartidos por todo el proceso.
+
+    Los motores se indexan por el hash de la configuración de conexión, de modo que las peticiones
+    con las mismas credenciales reutilizan el pool de conexiones. Cuando llega una configuración nueva
+    para el mismo destino (rotación de credenciales), el motor anterior se libera.
+    """
+
+    def __init__(self):
+        """Inicializa un registro vacío."""
+        self._engines: Dict[str, Engine] = {}
+        self._keys_by_identity: Dict[Tuple[str, str, int, str, str], str] = {}
+        self._lock = threading.Lock()
+
+    def get_engine(self, config: DatabaseConfig) -> Engine:
+        """
+        Devuelve el motor asociado a la configuración, creándolo si no existe.
+
+        Args:
+            config (DatabaseConfig): Configuración de la base de datos.
+
+        Returns:
+            Engine: Motor SQLAlchemy con su pool de conexiones.
+        """
+        key = config.cache_key()
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is not None:
+                return engine
+
+            previous_key = self._keys_by_identity.get(config.identity())
+            if previous_key is not None:
+                logging.info("Credenciales rotadas para {}://{}; se libera el motor anterior.",
+                             config.db_type, config.host)
+                self._engines.pop(previous_key).dispose()
+
+            pool_settings = get_pool_settings(config.db_type)
+            engine = create_engine(config.get_connection_url(), **pool_settings)
+            statement_timeout = get_statement_timeout(config.db_type)
+            if statement_timeout:
+                event.listen(engine, "connect", lambda dbapi_connection, _: set_statement_timeout(
+                    dbapi_connection, config.db_type, statement_timeout))
+            self._engines[key] = engine
+            self._keys_by_identity[config.identity()] = key
+            logging.info("Motor {} creado con pool {} y tiempo máximo por sentencia de {} s.",
+                         config.db_type, pool_settings, statement_timeout or 'sin límite')
+            return engine
+
+    def dispose(self, config: DatabaseConfig) -> None:
+        """
+        Libera el motor asociado a la configuración y cierra sus conexiones.
+
+        Args:
+            config (DatabaseConfig): Configuración de la base de datos.
+        """
+        with self._lock:
+            key = self._keys_by_identity.pop(config.identity(), None)
+            engine = self._engines.pop(key, None) if key else None
+        if engine is not None:
+            engine.dispose()
+            logging.info("Motor {} liberado.", config.db_type)
+
+    def dispose_all(self) -> None:
+        """Libera todos los motores registrados (por ejemplo, al detener la API)."""
+        with self._lock:
+            engines = list(self._engines.values())
+            self._engines.clear()
+            self._keys_by_identity.clear()
+        for engine in engines:
+            engine.dispose()
+        logging.info("{} motores de base de datos liberados.", len(engines))
+
+
+# Registro compartido por todos los SQLProcessor del proceso
+engine_registry = EngineRegistry()
+
+
+# Fragmentos de mensajes de error que indican credenciales inválidas en cada motor
+AUTH_ERROR_MARKERS = (
+    "password authentication failed",  # PostgreSQL / Redshift
+    "access denied for user",          # MySQL
+    "login failed for user",           # SQL Server
+    "ora-01017",                       # Oracle
+)
+
+
+def is_authentication_error(error: Exception) -> bool:
+    """
+    Indica si un error de base de datos se debe a credenciales inválidas (por ejemplo, un secreto rotado).
+
+    Args:
+        error (Exception): Error capturado.
+
+    Returns:
+        bool: True si el mensaje corresponde a un fallo de autenticación.
+    """
+    message = str(error).lower()
+    return any(marker in message for marker in AUTH_ERROR_MARKERS)
+
+
+ARROW_BATCH_ROWS = int(os.environ.get('ARROW_BATCH_ROWS', 50_000))
+
+# Tipos Arrow de los OID de PostgreSQL leídos con COPY; el resto se infiere del CSV
+POSTGRES_ARROW_TYPES: Dict[int, pa.DataType] = {
+    16: pa.bool_(),
+    20: pa.int64(), 21: pa.int16(), 23: pa.int32(),
+    700: pa.float32(), 701: pa.float64(), 1700: pa.float64(),
+    18: pa.string(), 19: pa.string(), 25: pa.string(), 1042: pa.string(), 1043: pa.string(), 2950: pa.string(),
+    1082: pa.date32(), 1114: pa.timestamp("us"), 1184: pa.timestamp("us", tz="UTC"),
+}
+
+
+BULK_LOAD_CHUNK_ROWS = int(os.environ.get('BULK_LOAD_CHUNK_ROWS', 50_000))
+# Caracteres que se leen por llamada al transmitir un COPY ... FROM STDIN
+COPY_BUFFER_SIZE = 1024 * 1024
+# Parámetros máximos por sentencia en los INSERT de varias filas (límite de Redshift)
+MULTI_INSERT_MAX_PARAMS = 32_767
+# Marcador de los valores nulos en el CSV de COPY (así una cadena vacía no se carga como nula)
+COPY_NULL = "\\N"
+# Marcador de parámetro de cada `paramstyle` de DB-API
+PARAM_PLACEHOLDERS = {"qmark": "?", "format": "%s", "pyformat": "%s", "numeric": ":{}", "named": ":{}"}
+
+
+class FrameCsvStream:
+    """
+    Archivo de solo lectura que entrega como CSV, bloque a bloque, una secuencia de DataFrames.
+
+    Lo consume `COPY ... FROM STDIN`: solo el CSV del bloque actual permanece en memoria.
+    """
+
+    def __init__(self, frames: Iterable[pd.DataFrame]):
+        """
+        Args:
+            frames (Iterable[pd.DataFrame]): Bloques a cargar, con las columnas de la tabla destino.
+        """
+        self._frames = iter(frames)
+        self._current = io.StringIO()
+        self.rows = 0
+
+    def read(self, size: int = -1) -> str:
+        """Devuelve hasta `size` caracteres del CSV (todo el resto si `size` es negativo)."""
+        parts = []
+        remaining = size
+        while size < 0 or remaining > 0:
+            data = self._current.read(remaining if size >= 0 else -1)
+            if data:
+                parts.append(data)
+                remaining -= len(data)
+                continue
+            frame = next(self._frames, None)
+            if frame is None:
+                break
+            self.rows += len(frame)
+            self._current = io.StringIO(integral_floats_to_int(frame).to_csv(index=False, header=False, na_rep=COPY_NULL))
+        return "".join(parts)
+
+
+def integral_floats_to_int(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte a `Int64` las columnas float cuyos valores son todos enteros.
+
+    pandas lee como float64 las columnas enteras con nulos, y el CSV escribiría "1.0", que `COPY`
+    rechaza en una columna INTEGER/BIGINT; como `Int64` se escribe "1".
+
+    Args:
+        frame (pd.DataFrame): Bloque a cargar.
+
+    Returns:
+        pd.DataFrame: El mismo bloque, o una copia con esas columnas convertidas.
+    """
+    integral = []
+    for position, dtype in enumerate(frame.dtypes):
+        if pd.api.types.is_float_dtype(dtype):
+            values = frame.iloc[:, position].to_numpy(dtype="float64", na_value=np.nan)
+            values = values[~np.isnan(values)]
+            # Fuera de ±2**53 un float ya no representa enteros exactos (y excluye inf)
+            if len(values) and np.all(np.abs(values) < 2 ** 53) and np.all(values == np.floor(values)):
+                integral.append(position)
+    if not integral:
+        return frame
+    frame = frame.copy()
+    for position in integral:
+        frame.isetitem(position, frame.iloc[:, position].astype("Int64"))
+    return frame
+
+
+def frame_chunks(df: pd.DataFrame, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Divide un DataFrame en bloques consecutivos de `chunksize` filas."""
+    for start in range(0, len(df), max(1, chunksize)):
+        yield df.iloc[start:start + chunksize]
+
+
+def frame_rows(frame: pd.DataFrame) -> List[Tuple[Any, ...]]:
+    """Convierte un bloque en tuplas de valores de Python, con None en lugar de NaN/NaT."""
+    columns = []
+    for position, dtype in enumerate(frame.dtypes):
+        column = frame.iloc[:, position]
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            # Los drivers reconocen `datetime`, no siempre su subclase `pd.Timestamp`
+            values = column.array.to_pydatetime()
+        else:
+            values = column.to_numpy(dtype=object)
+        values[column.isna().to_numpy()] = None
+        columns.append(values.tolist())
+    return list(zip(*columns))
+
 
 def handle_sql_exceptions(func):
     """Decorador para manejar excepciones SQL y registrar errores."""
@@ -65,7 +389,7 @@ def handle_sql_exceptions(func):
         try:
             return func(self, *args, **kwargs)
         except Exception as e:
-            logging.error(f"Error en {func.__name__}: {e}")
+            logging.error("Error en {}: {}", func.__name__, e)
             raise DatabaseConnectionError(f"Fallo en {func.__name__}: {e}")
     return wrapper
 
@@ -97,19 +421,59 @@ class SQLProcessor:
 
     @handle_sql_exceptions
     def connect(self):
-        """Establece conexión con la base de datos y crea el motor SQLAlchemy."""
+        """Establece conexión con la base de datos usando el motor compartido del registro."""
         self.disconnect()  # Asegurar que no haya conexiones previas
-        self.engine = create_engine(self.config.get_connection_url())
+        self.engine = engine_registry.get_engine(self.config)
         Session = sessionmaker(bind=self.engine)
         self.session = Session()
-        logging.info(f"Conexión a {self.config.db_type} establecida exitosamente.")
+        logging.info("Conexión a {} establecida exitosamente.", self.config.db_type)
 
     def disconnect(self):
-        """Cierra la conexión con la base de datos si está activa."""
+        """Cierra la sesión activa; las conexiones vuelven al pool del motor compartido."""
         if self.session:
             self.session.close()
             logging.info("Conexión cerrada correctamente.")
 
+    def dispose_engine(self):
+        """Cierra la sesión y libera el motor compartido (por ejemplo, tras un error de autenticación)."""
+        self.disconnect()
+        engine_registry.dispose(self.config)
+        self.engine = None
+
+    @contextmanager
+    def _cancellable(self, dbapi_connection: Any) -> Iterator[None]:
+        """
+        Registra la consulta que se ejecuta en la conexión en el alcance de cancelación de la petición.
+
+        Si la petición se cancela (ver `QueryCancelScope`), la consulta se cancela en el servidor: con
+        `cancel()` en PostgreSQL, Redshift y Oracle, `KILL QUERY` en MySQL e `interrupt()` en SQLite.
+        Los drivers sin cancelación (pyodbc) dependen del tiempo máximo por sentencia.
+
+        Args:
+            dbapi_connection (Any): Conexión del driver donde se ejecuta la consulta.
+        """
+        scope = current_query_scope()
+        cancel = self._query_canceller(dbapi_connection) if scope is not None else None
+        if cancel is None:
+            yield
+            return
+        token = scope.register(cancel)
+        try:
+            yield
+        finally:
+            scope.unregister(token)
+
+    def _query_canceller(self, dbapi_connection: Any):
+        """Devuelve la función que cancela la consulta en curso de una conexión, o None si el driver no lo permite."""
+        if self.config.db_type == "mysql":
+            thread_id = dbapi_connection.thread_id()
+
+            def kill_query() -> None:
+                with self.engine.connect() as connection:
+                    connection.execute(text(f"KILL QUERY {int(thread_id)}"))
+            return kill_query
+        return getattr(dbapi_connection, "cancel", None) or getattr(dbapi_connection, "interrupt", None)
+
     @handle_sql_exceptions
     def execute_query(self, query: str):
         """
@@ -133,33 +497,247 @@ class SQLProcessor:
         Returns:
             pd.DataFrame: Datos obtenidos.
         """
-        return pd.read_sql(text(query), self.engine)
+        with self.engine.connect() as connection, self._cancellable(connection.connection.dbapi_connection):
+            return pd.read_sql(text(query), connection)
+
+    def fetch_data_chunks(self, query: str, chunksize: int = 50_000,
+                          params: Optional[Dict[str, Any]] = None) -> Iterator[pd.DataFrame]:
+        """
+        Ejecuta una consulta SQL con un cursor del lado del servidor y devuelve los resultados por bloques.
+
+        Solo un bloque de `chunksize` filas permanece en memoria a la vez, por lo que el consumo
+        no depende del tamaño total del resultado.
+
+        Args:
+            query (str): Consulta SQL.
+            chunksize (int, opcional): Número de filas por bloque.
+            params (Optional[Dict[str, Any]]): Parámetros enlazados de la consulta (`:nombre`).
+
+        Yields:
+            pd.DataFrame: Bloques consecutivos del resultado.
+
+        Raises:
+            DatabaseConnectionError: Si falla la ejecución o la lectura de algún bloque.
+        """
+        # No se usa `handle_sql_exceptions`: en un generador los errores aparecen al iterar.
+        try:
+            with self.engine.connect() as connection, self._cancellable(connection.connection.dbapi_connection):
+                connection = connection.execution_options(stream_results=True, max_row_buffer=chunksize)
+                for chunk in pd.read_sql(text(query), connection, chunksize=chunksize, params=params):
+                    yield chunk
+        except Exception as e:
+            logging.error("Error en fetch_data_chunks: {}", e)
+            raise DatabaseConnectionError(f"Fallo en fetch_data_chunks: {e}")
 
     @handle_sql_exceptions
-    def upload_csv_to_table(self, file_path: str, table_name: str, delimiter: str = ","):
+    def fetch_arrow(self, query: str, batch_size: int = ARROW_BATCH_ROWS) -> pd.DataFrame:
+        """
+        Ejecuta una consulta SQL leyendo el resultado en formato columnar con Arrow.
+
+        En PostgreSQL el resultado se transmite con `COPY ... TO STDOUT` en CSV directamente al lector
+        de Arrow; en los demás motores se lee por lotes con un cursor del lado del servidor y cada lote
+        se convierte en un `RecordBatch`. El texto queda como `string[pyarrow]`, sin objetos de Python
+        por valor. La comparación de memoria con la lectura por `fetch_data` se guarda en
+        `df.attrs["arrow_memory"]`.
+
+        Args:
+            query (str): Consulta SQL.
+            batch_size (int, opcional): Filas por lote en la lectura por cursor.
+
+        Returns:
+            pd.DataFrame: Datos obtenidos.
+        """
+        if self.config.db_type == "postgresql":
+            table = self._copy_to_arrow(query)
+        else:
+            table = self._cursor_to_arrow(query, batch_size)
+
+        df = arrow_to_pandas(table)
+        df.attrs["arrow_memory"] = memory_report(table, df)
+        logging.info("Consulta leída con Arrow: {}", df.attrs['arrow_memory'])
+        return df
+
+    def _copy_to_arrow(self, query: str) -> pa.Table:
+        """Lee el resultado de una consulta de PostgreSQL con `COPY ... TO STDOUT` hacia una tabla Arrow."""
+        subquery = as_subquery(query)
+        connection = self.engine.raw_connection()
+        try:
+            with self._cancellable(connection.dbapi_connection):
+                with closing(connection.cursor()) as cursor:
+                    cursor.execute(f"SELECT * FROM {subquery} LIMIT 0")
+                    columns = [(column[0], column[1]) for column in cursor.description]
+
+                read_fd, write_fd = os.pipe()
+                errors = []
+
+                def copy_to_pipe():
+                    try:
+                        with os.fdopen(write_fd, "wb") as sink, closing(connection.cursor()) as cursor:
+                            cursor.copy_expert(f"COPY (SELECT * FROM {subquery}) TO STDOUT WITH (FORMAT csv, HEADER true)", sink)
+                    except Exception as e:
+                        errors.append(e)
+
+                writer = threading.Thread(target=copy_to_pipe, name="pg-copy", daemon=True)
+                writer.start()
+                try:
+                    with os.fdopen(read_fd, "rb") as source:
+                        table = pa_csv.read_csv(
+                            source,
+                            convert_options=pa_csv.ConvertOptions(
+                                column_types={name: POSTGRES_ARROW_TYPES[oid] for name, oid in columns
+                                              if oid in POSTGRES_ARROW_TYPES},
+                                true_values=["t"],
+                                false_values=["f"],
+                                # COPY CSV escribe NULL como campo vacío sin comillas; "NA", "NULL", etc. son texto
+                                null_values=[""],
+                                strings_can_be_null=True,
+                                quoted_strings_can_be_null=False,
+                            ),
+                        )
+                finally:
+                    writer.join()
+                if errors:
+                    raise errors[0]
+            connection.commit()
+            return table
+        finally:
+            connection.close()
+
+    def _cursor_to_arrow(self, query: str, batch_size: int) -> pa.Table:
+        """Lee el resultado de una consulta por lotes con un cursor del lado del servidor hacia una tabla Arrow."""
+        tables = []
+        with self.engine.connect() as connection, self._cancellable(connection.connection.dbapi_connection):
+            connection = connection.execution_options(stream_results=True, max_row_buffer=batch_size)
+            result = connection.execute(text(query))
+            columns = list(result.keys())
+            for rows in result.partitions(batch_size):
+                arrays = [pa.array(values) for values in zip(*rows)]
+                tables.append(pa.Table.from_batches([pa.RecordBatch.from_arrays(arrays, names=columns)]))
+
+        if not tables:
+            return pa.table({column: pa.array([], pa.null()) for column in columns})
+        # Un lote sin valores en una columna tiene tipo nulo; se unifican los tipos entre lotes
+        return pa.concat_tables(tables, promote_options="permissive")
+
+    @handle_sql_exceptions
+    def upload_csv_to_table(self, file_path: str, table_name: str, delimiter: str = ",",
+                            chunksize: int = BULK_LOAD_CHUNK_ROWS) -> Dict[str, Any]:
         """
         Carga un archivo CSV en una tabla de la base de datos.
 
+        El archivo se lee por bloques de `chunksize` filas, por lo que puede ser más grande que la memoria
+        disponible; cada bloque se envía con la carga masiva del motor (ver `upload_dataframe_to_table`)
+        y todo el archivo se carga en una sola transacción. Si la tabla no existe, sus tipos se infieren
+        del primer bloque.
+
         Args:
             file_path (str): Ruta del archivo CSV.
             table_name (str): Nombre de la tabla.
             delimiter (str, opcional): Delimitador del CSV.
+            chunksize (int, opcional): Filas por bloque.
+
+        Returns:
+            Dict[str, Any]: Filas cargadas, método, duración y filas por segundo.
         """
-        df = pd.read_csv(file_path, delimiter=delimiter)
-        self.upload_dataframe_to_table(df, table_name)
+        with pd.read_csv(file_path, delimiter=delimiter, chunksize=chunksize) as reader:
+            return self._bulk_load(reader, table_name)
 
     @handle_sql_exceptions
-    def upload_dataframe_to_table(self, df: pd.DataFrame, table_name: str):
+    def upload_dataframe_to_table(self, df: pd.DataFrame, table_name: str,
+                                  chunksize: int = BULK_LOAD_CHUNK_ROWS) -> Dict[str, Any]:
         """
-        Sube un DataFrame a una tabla en la base de datos.
+        Sube un DataFrame a una tabla en la base de datos con la carga masiva de cada motor.
+
+        - PostgreSQL: `COPY ... FROM STDIN` en CSV, generado bloque a bloque.
+        - SQL Server: `executemany` con `fast_executemany` de pyodbc (parámetros enviados en arreglos).
+        - MySQL y Oracle: `executemany` por bloques (PyMySQL lo envía como INSERT de varias filas y
+          cx_Oracle con arreglos de parámetros).
+        - Redshift (no admite `COPY FROM STDIN`): INSERT de varias filas con `execute_values` de psycopg2.
+
+        Si la tabla no existe se crea con los tipos que asigna pandas. La creación de la tabla y todas
+        las filas van en una sola transacción (salvo en MySQL y Oracle, donde el DDL confirma la
+        transacción), de modo que una carga fallida no deja una tabla vacía.
 
         Args:
             df (pd.DataFrame): DataFrame a cargar.
             table_name (str): Nombre de la tabla destino.
+            chunksize (int, opcional): Filas por bloque.
+
+        Returns:
+            Dict[str, Any]: Filas cargadas, método, duración y filas por segundo.
         """
         if df.empty:
             logging.warning("El DataFrame está vacío, no se subirá.")
-            return
+            return {"rows": 0, "method": None, "seconds": 0.0, "rows_per_second": 0.0}
+
+        return self._bulk_load(frame_chunks(df, chunksize), table_name)
+
+    def _bulk_load(self, frames: Iterable[pd.DataFrame], table_name: str) -> Dict[str, Any]:
+        """Crea la tabla si no existe y carga los bloques con el método del motor."""
+        start = time.perf_counter()
+        frames = iter(frames)
+        first = next(frames, None)
+        if first is None:
+            return {"rows": 0, "method": None, "seconds": 0.0, "rows_per_second": 0.0}
+        frames = itertools.chain([first], frames)
+        columns = [str(column) for column in first.columns]
+
+        with self.engine.begin() as connection:
+            first.head(0).to_sql(table_name, connection, if_exists="append", index=False)
+            dbapi_connection = connection.connection.dbapi_connection
+            if self.config.db_type == "postgresql":
+                method, rows = "copy", self._copy_from_frames(dbapi_connection, frames, table_name, columns)
+            elif self.config.db_type == "redshift":
+                method, rows = "multi_insert", self._multi_insert_frames(dbapi_connection, frames, table_name, columns)
+            else:
+                method = "fast_executemany" if self.config.db_type == "sqlserver" else "executemany"
+                rows = self._executemany_frames(dbapi_connection, frames, table_name, columns)
+
+        elapsed = time.perf_counter() - start
+        stats = {"rows": rows, "method": method, "seconds": round(elapsed, 4),
+                 "rows_per_second": round(rows / elapsed, 1) if elapsed > 0 else 0.0}
+        logging.info("{} filas cargadas en {} con {} en {:.3f} s "
+                     "({} filas/s).", rows, table_name, method, elapsed, stats['rows_per_second'])
+        return stats
+
+    def _copy_from_frames(self, dbapi_connection: Any, frames: Iterable[pd.DataFrame], table_name: str,
+                          columns: List[str]) -> int:
+        """Carga los bloques en PostgreSQL con un único `COPY ... FROM STDIN` (en la transacción de `dbapi_connection`)."""
+        quote = self.engine.dialect.identifier_preparer.quote
+        statement = (f"COPY {quote(table_name)} ({', '.join(quote(column) for column in columns)}) "
+                     f"FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')")
+        stream = FrameCsvStream(frames)
+        with closing(dbapi_connection.cursor()) as cursor:
+            cursor.copy_expert(statement, stream, size=COPY_BUFFER_SIZE)
+        return stream.rows
+
+    def _executemany_frames(self, dbapi_connection: Any, frames: Iterable[pd.DataFrame], table_name: str,
+                            columns: List[str]) -> int:
+        """Carga los bloques con `executemany` sobre la conexión DB-API (con `fast_executemany` en SQL Server)."""
+        quote = self.engine.dialect.identifier_preparer.quote
+        placeholder = PARAM_PLACEHOLDERS[self.engine.dialect.paramstyle]
+        statement = (f"INSERT INTO {quote(table_name)} ({', '.join(quote(column) for column in columns)}) "
+                     f"VALUES ({', '.join(placeholder.format(i + 1) for i in range(len(columns)))})")
+        rows = 0
+        with closing(dbapi_connection.cursor()) as cursor:
+            if self.config.db_type == "sqlserver":
+                cursor.fast_executemany = True
+            for frame in frames:
+                cursor.executemany(statement, frame_rows(frame))
+                rows += len(frame)
+        return rows
+
+    def _multi_insert_frames(self, dbapi_connection: Any, frames: Iterable[pd.DataFrame], table_name: str,
+                             columns: List[str]) -> int:
+        """Carga los bloques con INSERT de varias filas (`execute_values` de psycopg2), sin superar el límite de parámetros."""
+        from psycopg2.extras import execute_values
 
-        df.to_sql(table_name, self.engine, if_exists="append", index=False)
-        logging.info(f"DataFrame subido a {table_name}.")
+        quote = self.engine.dialect.identifier_preparer.quote
+        statement = f"INSERT INTO {quote(table_name)} ({', '.join(quote(column) for column in columns)}) VALUES %s"
+        rows_per_statement = max(1, MULTI_INSERT_MAX_PARAMS // max(1, len(columns)))
+        rows = 0
+        with closing(dbapi_connection.cursor()) as cursor:
+            for frame in frames:
+                execute_values(cursor, statement, frame_rows(frame), page_size=rows_per_statement)
+                rows += len(frame)
+        return rows
@@ -0,0 +1,173 @@
+from typing import Dict, Any, Optional, Tuple, TYPE_CHECKING
+import os
+import re
+import time
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+from logger_config import get_logger
+
+# Configuración de logs
+logger = get_logger()
+
+DATE_SAMPLE_ROWS = int(os.environ.get('DATE_SAMPLE_ROWS', 1000))
+
+# Fechas ISO (`2024-01-31`, `2024-01-31 10:00:00`, `2024-01-31T10:00:00Z`)
+ISO_DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?(Z|[+-]\d{2}(:?\d{2})?)?$")
+# Tipos enteros candidatos, del más chico al más grande
+INTEGER_BITS = (8, 16, 32)
+
+if TYPE_CHECKING:
+    from ydata_profiling.config import Settings
+
+
+def _is_text(series: pd.Series) -> bool:
+    """Indica si una columna contiene texto (`object` o `string`, incluido `string[pyarrow]`)."""
+    if isinstance(series.dtype, pd.ArrowDtype):
+        return ptypes.is_string_dtype(series.dtype)
+    if ptypes.is_object_dtype(series.dtype):
+        # Las columnas `object` también pueden contener Decimal, fechas o valores mixtos
+        return ptypes.infer_dtype(series, skipna=True) == "string"
+    return ptypes.is_string_dtype(series.dtype)
+
+
+def _downcast_integers(series: pd.Series) -> pd.Series:
+    """
+    Reduce una columna entera con signo al menor tipo que contiene sus valores, sus valores negados
+    y su rango (`max - min`), que ydata-profiling calcula en el tipo de la columna.
+
+    Returns:
+        pd.Series: Columna reducida, o la original si ningún tipo más chico alcanza.
+    """
+    if isinstance(series.dtype, pd.ArrowDtype) or ptypes.is_unsigned_integer_dtype(series.dtype):
+        return series
+    low, high = series.min(), series.max()
+    if pd.isna(low):
+        return series
+    low, high = int(low), int(high)
+    nullable = isinstance(series.dtype, pd.api.extensions.ExtensionDtype)
+    for bits in INTEGER_BITS:
+        limit = int(np.iinfo(f"int{bits}").max)
+        if -limit <= low and high <= limit and high - low <= limit:
+            return series.astype(f"Int{bits}" if nullable else f"int{bits}")
+    return series
+
+
+def _is_iso_date(series: pd.Series) -> bool:
+    """Indica si las primeras `DATE_SAMPLE_ROWS` filas no nulas de una columna de texto son fechas ISO."""
+    sample = series.dropna().head(DATE_SAMPLE_ROWS)
+    return not sample.empty and all(ISO_DATE_PATTERN.match(value) for value in sample)
+
+
+def _parse_dates(series: pd.Series) -> pd.Series:
+    """
+    Convierte a fechas una columna de texto con fechas ISO.
+
+    Returns:
+        pd.Series: Columna convertida, o la original si algún valor fuera de la muestra no es una fecha ISO.
+    """
+    try:
+        return pd.to_datetime(series, format="ISO8601")
+    except (ValueError, TypeError):
+        return series
+
+
+def _text_target(series: pd.Series, config: "Settings", is_date: bool) -> Optional[str]:
+    """
+    Devuelve el tipo de ydata-profiling ('DateTime' o 'Categorical') al que se puede convertir una
+    columna de texto sin cambiar el reporte.
+
+    Usa las mismas reglas de inferencia de ydata-profiling. Si la columna cumple más de una (por
+    ejemplo, texto numérico con entre 6 y 50 valores distintos es `Numeric` y `Categorical` a la vez),
+    ydata-profiling elige según el orden de su grafo de tipos y la columna se deja como está.
+
+    Args:
+        series (pd.Series): Columna de texto.
+        config (Settings): Configuración de ydata-profiling con la que se perfila la columna.
+        is_date (bool): Si la muestra de la columna tiene solo fechas ISO.
+
+    Returns:
+        Optional[str]: Tipo al que convertir, o None si la columna debe quedar como texto.
+    """
+    from ydata_profiling.model.typeset_relations import string_is_category, string_is_datetime, string_is_numeric
+
+    # Sin inferencia de tipos ydata-profiling tipa todo el texto como `Text`
+    if not config.infer_dtypes:
+        return None
+    is_category = string_is_category(series, {}, config)
+    if is_date:
+        return "DateTime" if not is_category and string_is_datetime(series, {}) else None
+    if is_category and not string_is_numeric(series, {}, config) and not string_is_datetime(series, {}):
+        return "Categorical"
+    return None
+
+
+def optimize_dtypes(df: pd.DataFrame,
+                    config: Optional["Settings"] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Reduce la memoria de un DataFrame antes del perfilado sin cambiar sus valores ni el reporte.
+
+    - Reduce los enteros al menor tipo que contiene sus valores, sus valores negados y su rango.
+    - Mantiene los `float64`: en `float32` las estadísticas de ydata-profiling cambiarían en los últimos dígitos.
+    - Convierte una sola vez a `datetime64` las columnas de texto con fechas ISO que ydata-profiling
+      tiparía como `DateTime`.
+    - Convierte a `category` las columnas de texto que ydata-profiling tiparía como `Categorical`.
+      Las que tiparía como `Text`, `Boolean` o `Numeric`, o de tipo ambiguo, se mantienen: con otro
+      tipo el reporte cambia. Tampoco se convierten las columnas de texto con nulos.
+
+    Args:
+        df (pd.DataFrame): DataFrame obtenido de la base de datos.
+        config (Optional[Settings]): Configuración de ydata-profiling con la que se perfila el DataFrame.
+            Por defecto, la configuración por defecto de ydata-profiling.
+
+    Returns:
+        Tuple[pd.DataFrame, Dict[str, Any]]: DataFrame optimizado y reporte con la memoria antes
+        y después y las conversiones aplicadas.
+    """
+    from ydata_profiling.config import Settings
+
+    start = time.perf_counter()
+    config = config or Settings()
+    memory_before = int(df.memory_usage(index=False, deep=True).sum())
+    optimized = df.copy(deep=False)
+    conversions: Dict[str, str] = {}
+
+    for column in optimized.columns:
+        series = optimized[column]
+        before = str(series.dtype)
+
+        if ptypes.is_bool_dtype(series.dtype):
+            continue
+        if ptypes.is_integer_dtype(series.dtype):
+            converted = _downcast_integers(series)
+        elif _is_text(series):
+            # Los nulos de texto aparecen como `None` en las muestras del reporte y como NaN/NaT al convertirlos
+            if series.hasnans:
+                continue
+            converted = series
+            # Filtros baratos antes de las reglas de inferencia, que recorren la columna completa
+            is_date = _is_iso_date(series)
+            if is_date or series.nunique() <= config.vars.cat.cardinality_threshold:
+                target = _text_target(series, config, is_date)
+                if target == "DateTime":
+                    converted = _parse_dates(series)
+                elif target == "Categorical":
+                    converted = series.astype("category")
+        else:
+            continue
+
+        if str(converted.dtype) != before:
+            optimized[column] = converted
+            conversions[column] = f"{before} -> {converted.dtype}"
+
+    memory_after = int(optimized.memory_usage(index=False, deep=True).sum())
+    report = {
+        "memory_before_bytes": memory_before,
+        "memory_after_bytes": memory_after,
+        "saved_pct": round(100 * (memory_before - memory_after) / memory_before, 2) if memory_before else 0.0,
+        "conversions": conversions,
+        "seconds": round(time.perf_counter() - start, 4),
+    }
+    logger.info("Tipos optimizados: {} -> {} bytes ({}% menos) en {} s; conversiones: {}",
+                memory_before, memory_after, report["saved_pct"], report["seconds"], conversions)
+    return optimized, report
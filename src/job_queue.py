@@ -0,0 +1,190 @@
+from typing import Dict, Any, Optional, List, Callable
+from enum import Enum
+from datetime import datetime
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+import uuid
+from fastapi import HTTPException
+from pydantic import BaseModel, Field
+from logger_config import get_logger
+
+# Configuración de logs
+logger = get_logger()
+
+PROFILING_WORKERS = int(os.environ.get('PROFILING_WORKERS', 2))
+PROFILING_MAX_QUEUED = int(os.environ.get('PROFILING_MAX_QUEUED', 20))
+PROFILING_JOB_HISTORY = int(os.environ.get('PROFILING_JOB_HISTORY', 500))
+
+
+class JobQueueFullError(Exception):
+    """Excepción lanzada cuando la cola de trabajos alcanzó su capacidad máxima."""
+    pass
+
+
+class JobState(str, Enum):
+    """Estados posibles de un trabajo de perfilado."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class ProfilingJob(BaseModel):
+    """
+    Estado de un trabajo de perfilado ejecutado en segundo plano.
+    """
+
+    job_id: str = Field(..., description="Identificador único del trabajo")
+    profile_name: str = Field(..., description="Nombre del perfil solicitado")
+    sql_filename: str = Field(..., description="Archivo SQL solicitado")
+    state: JobState = Field(JobState.QUEUED, description="Estado actual del trabajo")
+    created_at: datetime = Field(default_factory=datetime.now, description="Fecha de encolado")
+    started_at: Optional[datetime] = Field(None, description="Fecha de inicio de la ejecución")
+    finished_at: Optional[datetime] = Field(None, description="Fecha de finalización")
+    timings: Dict[str, float] = Field(default_factory=dict, description="Duración en segundos de cada etapa")
+    result: Optional[Dict[str, Any]] = Field(None, description="Resultado del perfilado, incluidas las rutas en S3")
+    error: Optional[str] = Field(None, description="Detalle del error si el trabajo falló")
+    status_code: Optional[int] = Field(None, description="Código HTTP equivalente al resultado")
+
+
+class ProfilingJobManager:
+    """
+    Cola acotada de trabajos de perfilado ejecutados por un pool fijo de hilos.
+
+    Los trabajos terminados se conservan en memoria hasta `max_history` para consultar su estado.
+    """
+
+    def __init__(self, max_workers: int = PROFILING_WORKERS, max_queued: int = PROFILING_MAX_QUEUED,
+                 max_history: int = PROFILING_JOB_HISTORY):
+        """
+        Inicializa el pool de trabajadores.
+
+        Args:
+            max_workers (int): Número de trabajos que se ejecutan en paralelo.
+            max_queued (int): Número máximo de trabajos en espera antes de rechazar nuevos.
+            max_history (int): Número máximo de trabajos que se conservan para consulta.
+        """
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.max_history = max_history
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="profiling-job")
+        self._jobs: "OrderedDict[str, ProfilingJob]" = OrderedDict()
+        self._pending = 0
+        self._lock = threading.Lock()
+        logger.info("Cola de perfilado inicializada con {} trabajadores y capacidad de {} trabajos.",
+                    max_workers, max_queued)
+
+    def submit(self, func: Callable[..., Dict[str, Any]], profile_request: Any) -> ProfilingJob:
+        """
+        Encola un trabajo de perfilado.
+
+        Args:
+            func (Callable): Función a ejecutar; recibe la petición y un diccionario de tiempos por etapa.
+            profile_request (Any): Petición validada con `profile_name` y `sql_filename`.
+
+        Returns:
+            ProfilingJob: Trabajo creado en estado `queued`.
+
+        Raises:
+            JobQueueFullError: Si hay demasiados trabajos pendientes.
+        """
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queued:
+                raise JobQueueFullError(f"La cola de perfilado está llena ({self._pending} trabajos pendientes).")
+
+            job = ProfilingJob(
+                job_id=uuid.uuid4().hex,
+                profile_name=profile_request.profile_name,
+                sql_filename=profile_request.sql_filename,
+            )
+            self._jobs[job.job_id] = job
+            self._pending += 1
+            self._evict_finished()
+
+        self._executor.submit(self._run, job, func, profile_request)
+        logger.info("Trabajo {} encolado para el perfil {}.", job.job_id, job.profile_name)
+        return job
+
+    def _run(self, job: ProfilingJob, func: Callable[..., Dict[str, Any]], profile_request: Any) -> None:
+        """Ejecuta un trabajo y registra su resultado o error."""
+        if job.state == JobState.CANCELLED:
+            return
+
+        with logger.contextualize(job_id=job.job_id):
+            self._execute(job, func, profile_request)
+
+    def _execute(self, job: ProfilingJob, func: Callable[..., Dict[str, Any]], profile_request: Any) -> None:
+        """Ejecuta la función del trabajo y actualiza su estado."""
+        job.state = JobState.RUNNING
+        job.started_at = datetime.now()
+        logger.info("Trabajo {} en ejecución.", job.job_id)
+        try:
+            job.result = func(profile_request, job.timings)
+            job.state = JobState.SUCCEEDED
+            job.status_code = 200
+        except HTTPException as e:
+            job.state = JobState.FAILED
+            job.error = str(e.detail)
+            job.status_code = e.status_code
+        except Exception as e:
+            job.state = JobState.FAILED
+            job.error = str(e)
+            job.status_code = 500
+        finally:
+            job.finished_at = datetime.now()
+            with self._lock:
+                self._pending -= 1
+            logger.info("Trabajo {} finalizado con estado '{}'.", job.job_id, job.state.value)
+
+    def _evict_finished(self) -> None:
+        """Elimina los trabajos terminados más antiguos cuando se supera `max_history`."""
+        finished = [job_id for job_id, job in self._jobs.items()
+                    if job.state in (JobState.SUCCEEDED, JobState.FAILED, JobState.CANCELLED)]
+        for job_id in finished[:max(0, len(self._jobs) - self.max_history)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[ProfilingJob]:
+        """
+        Obtiene un trabajo por su identificador.
+
+        Args:
+            job_id (str): Identificador del trabajo.
+
+        Returns:
+            Optional[ProfilingJob]: El trabajo, o None si no existe.
+        """
+        return self._jobs.get(job_id)
+
+    def list(self, state: Optional[JobState] = None, limit: int = 100) -> List[ProfilingJob]:
+        """
+        Lista los trabajos más recientes, opcionalmente filtrados por estado.
+
+        Args:
+            state (Optional[JobState]): Estado por el que filtrar.
+            limit (int): Número máximo de trabajos a devolver.
+
+        Returns:
+            List[ProfilingJob]: Trabajos ordenados del más reciente al más antiguo.
+        """
+        with self._lock:
+            jobs = list(self._jobs.values())
+        jobs = [job for job in reversed(jobs) if state is None or job.state == state]
+        return jobs[:limit]
+
+    def shutdown(self, wait: bool = False) -> None:
+        """
+        Detiene el pool de trabajadores y marca como cancelados los trabajos que no iniciaron.
+
+        Args:
+            wait (bool): Si es True, espera a que terminen los trabajos en ejecución.
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if job.state == JobState.QUEUED:
+                    job.state = JobState.CANCELLED
+                    job.finished_at = datetime.now()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        logger.info("Cola de perfilado detenida.")
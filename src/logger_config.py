@@ -1,46 +1,244 @@
-
-from datetime import datetime
+from typing import Dict, Any, Optional, TextIO, Tuple
+from datetime import datetime, timedelta
+import itertools
+import json
 import os
+import queue
+import sys
+import threading
+import traceback
 from loguru import logger
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# 'text': archivo de texto escrito en el hilo que registra el mensaje, con variables en las trazas;
+# 'json': un registro JSON por línea en consola y archivo, serializado y escrito por un hilo en segundo plano
+LOG_MODE = os.getenv('LOG_MODE', 'text').lower()
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+# Muestreo de los mensajes de alto volumen: se conserva 1 de cada N por nivel (por ejemplo "DEBUG=100,INFO=10")
+LOG_SAMPLE_EVERY = os.getenv('LOG_SAMPLE_EVERY', '')
+
+_configured = False
+_configure_lock = threading.Lock()
+
+
+def parse_sample_every(value: str) -> Dict[str, int]:
+    """
+    Interpreta la configuración de muestreo por nivel.
+
+    Args:
+        value (str): Pares `NIVEL=N` separados por coma.
+
+    Returns:
+        Dict[str, int]: Nivel -> se conserva 1 de cada N mensajes.
+    """
+    every: Dict[str, int] = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        level, _, n = item.partition("=")
+        every[level.strip().upper()] = max(1, int(n))
+    return every
+
+
+class SamplingFilter:
+    """
+    Filtro de loguru que conserva 1 de cada N mensajes de alto volumen por nivel y línea de origen.
+
+    Solo se muestrean los mensajes marcados con `sampled=True` (ver `get_sampled_logger`); el resto
+    pasa siempre. Los mensajes conservados llevan `sample_every` para poder reescalar los conteos.
+    """
+
+    def __init__(self, every: Dict[str, int]):
+        """
+        Args:
+            every (Dict[str, int]): Nivel -> se conserva 1 de cada N mensajes.
+        """
+        self.every = every
+        self._counters: Dict[Tuple[str, int], Any] = {}
+
+    def __call__(self, record: Dict[str, Any]) -> bool:
+        if not record["extra"].get("sampled"):
+            return True
+        every = self.every.get(record["level"].name, 1)
+        if every <= 1:
+            return True
+        key = (record["name"], record["line"])
+        counter = self._counters.get(key) or self._counters.setdefault(key, itertools.count())
+        if next(counter) % every:
+            return False
+        record["extra"]["sample_every"] = every
+        return True
+
+
+def serialize_record(record: Dict[str, Any]) -> str:
+    """
+    Serializa un registro de loguru como una línea JSON con el contexto (`request_id`, `job_id`, ...).
+
+    Args:
+        record (Dict[str, Any]): Registro de loguru.
+
+    Returns:
+        str: Línea JSON terminada en salto de línea.
+    """
+    payload: Dict[str, Any] = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "message": record["message"],
+        "module": record["module"],
+        "function": record["function"],
+        "line": record["line"],
+        "process": record["process"].id,
+        "thread": record["thread"].name,
+    }
+    payload.update({key: value for key, value in record["extra"].items() if key != "sampled"})
+    if record["exception"] is not None:
+        payload["exception"] = "".join(traceback.format_exception(*record["exception"]))
+    return json.dumps(payload, default=str, ensure_ascii=False) + "\n"
+
+
+class BackgroundSink:
+    """
+    Sink de loguru que escribe los registros en formato JSON desde un hilo en segundo plano.
+
+    El hilo que registra el mensaje solo agrega el registro a una cola en memoria; el hilo escritor
+    vacía la cola por lotes, serializa cada registro, lo escribe en la consola y en el archivo del
+    día (`AAAAMMDD_log_app.log`) y elimina los archivos con más de `retention_days` días.
+    """
+
+    def __init__(self, logs_dir: str, stream: Optional[TextIO] = sys.stderr, retention_days: int = 7):
+        """
+        Inicia el hilo escritor.
+
+        Args:
+            logs_dir (str): Directorio de los archivos de log.
+            stream (Optional[TextIO]): Consola donde se replican los registros (None para omitirla).
+            retention_days (int): Días que se conservan los archivos de log.
+        """
+        self.logs_dir = logs_dir
+        self.stream = stream
+        self.retention_days = retention_days
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._file: Optional[TextIO] = None
+        self._file_date: Optional[str] = None
+        self._thread = threading.Thread(target=self._drain, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, message: Any) -> None:
+        """Encola el registro del mensaje (lo llama loguru)."""
+        self._queue.put(message.record)
+
+    def stop(self) -> None:
+        """Escribe los registros pendientes y detiene el hilo (lo llama loguru al quitar el sink)."""
+        self._queue.put(None)
+        self._thread.join()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _rotate(self, file_date: str) -> None:
+        """Abre el archivo del día y elimina los archivos fuera del período de retención."""
+        if self._file is not None:
+            self._file.close()
+        self._file = open(os.path.join(self.logs_dir, f"{file_date}_log_app.log"), "a", encoding="utf-8")
+        self._file_date = file_date
+        oldest = (datetime.now() - timedelta(days=self.retention_days)).strftime('%Y%m%d')
+        for name in os.listdir(self.logs_dir):
+            if name.endswith("_log_app.log") and name[:8] < oldest:
+                os.remove(os.path.join(self.logs_dir, name))
+
+    def _drain(self) -> None:
+        """Bucle del hilo escritor."""
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [record for record in batch if record is not None]
+            try:
+                if records:
+                    file_date = records[-1]["time"].strftime('%Y%m%d')
+                    if file_date != self._file_date:
+                        self._rotate(file_date)
+                    text = "".join(serialize_record(record) for record in records)
+                    self._file.write(text)
+                    self._file.flush()
+                    if self.stream is not None:
+                        self.stream.write(text)
+                        self.stream.flush()
+            except Exception as e:
+                # Un error de escritura no debe detener el hilo: se informa en la consola y se sigue
+                sys.__stderr__.write(f"No se pudieron escribir {len(records)} registros de log: {e}\n")
+            if len(records) < len(batch):
+                return
+
+
+def _message_only(record: Dict[str, Any]) -> str:
+    """Formato mínimo: el JSON se genera en el hilo escritor de `BackgroundSink` a partir del registro."""
+    return "{message}"
+
+
+def _configure(logs_dir: str) -> None:
+    """Agrega los manejadores de la aplicación según `LOG_MODE`."""
+    sample_every = parse_sample_every(LOG_SAMPLE_EVERY)
+    if LOG_MODE == "json":
+        # Se reemplaza la consola por defecto (síncrona y con variables en las trazas)
+        logger.remove()
+        logger.add(BackgroundSink(logs_dir), level=LOG_LEVEL, format=_message_only,
+                   filter=SamplingFilter(sample_every), backtrace=False, diagnose=False, colorize=False)
+        return
+
+    log_file_date = datetime.now().strftime('%Y%m%d')
+    logger.add(
+        os.path.join(logs_dir, f'{log_file_date}_log_app.log'),
+        rotation="1 day",
+        retention="7 days",
+        backtrace=True,
+        diagnose=True,
+        level=LOG_LEVEL,
+        colorize=False,
+        format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {module}:{function}:{line} | {message}",
+        filter=SamplingFilter(sample_every),
+    )
+
+
 def get_logger() -> logger:
     """
     Configura y devuelve una instancia de logger para la aplicación.
 
     - Escribe logs en consola y en un archivo dentro de `logs/`.
-    - Evita agregar múltiples manejadores duplicados.
+    - Configura los manejadores una sola vez por proceso.
     - Se asegura de que el directorio de logs exista antes de escribir.
-    
+
     Returns:
         logger: Instancia global de Loguru Logger.
     """
+    global _configured
+    if _configured:
+        return logger
+
     app_main_path = os.getenv('APPMAINPATH')
     if not app_main_path:
         raise ValueError("La variable de entorno 'APPMAINPATH' no está definida.")
 
-    logs_dir = os.path.join(app_main_path, 'logs')
-    os.makedirs(logs_dir, exist_ok=True)  # Asegurar que el directorio existe
+    with _configure_lock:
+        if not _configured:
+            logs_dir = os.path.join(app_main_path, 'logs')
+            os.makedirs(logs_dir, exist_ok=True)  # Asegurar que el directorio existe
 
-    log_file_date = datetime.now().strftime('%Y%m%d')
-    log_file_path = os.path.join(logs_dir, f'{log_file_date}_log_app.log')
-
-    # Obtener todos los manejadores activos en Loguru
-    existing_handlers = {h for h in logger.__dict__["_core"].handlers.values()}
-
-    # Si no hay un manejador de archivo, lo agregamos
-    if not any("log_app.log" in str(h) for h in existing_handlers):
-        logger.add(
-            log_file_path,
-            rotation="1 day",
-            retention="7 days",
-            backtrace=True,
-            diagnose=True,
-            level="INFO",
-            colorize=False,
-            format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {module}:{function}:{line} | {message}",
-        )
+            _configure(logs_dir)
+            _configured = True
 
     return logger
+
+
+def get_sampled_logger() -> logger:
+    """
+    Devuelve el logger para mensajes de alto volumen (por bloque, por lote o por objeto), que se
+    muestrean según `LOG_SAMPLE_EVERY`.
+
+    Returns:
+        logger: Logger con `sampled=True`.
+    """
+    return get_logger().bind(sampled=True)
@@ -0,0 +1,100 @@
+from typing import Optional, Tuple
+import resource
+import sys
+from prometheus_client import Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
+
+# Buckets pensados para perfilados que van de milisegundos a decenas de minutos
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+ROWS_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+BYTES_BUCKETS = tuple(2 ** exponent for exponent in range(16, 37, 2))  # 64 KB .. 64 GB
+
+STAGE_DURATION = Histogram(
+    "dataprofiler_stage_duration_seconds", "Duración de cada etapa del perfilado.",
+    ["stage"], buckets=DURATION_BUCKETS,
+)
+STAGE_PEAK_RSS = Histogram(
+    "dataprofiler_stage_peak_rss_bytes", "Pico de memoria residente del proceso al terminar cada etapa.",
+    ["stage"], buckets=BYTES_BUCKETS,
+)
+STAGE_FAILURES = Counter(
+    "dataprofiler_stage_failures_total", "Etapas terminadas con una excepción.",
+    ["stage", "exception"],
+)
+ROWS_FETCHED = Histogram(
+    "dataprofiler_rows_fetched", "Filas leídas por perfilado.",
+    ["mode"], buckets=ROWS_BUCKETS,
+)
+BYTES_FETCHED = Histogram(
+    "dataprofiler_bytes_fetched", "Memoria del DataFrame leído por perfilado.",
+    ["mode"], buckets=BYTES_BUCKETS,
+)
+PROFILES = Counter(
+    "dataprofiler_profiles_total", "Perfilados terminados por modo y resultado.",
+    ["mode", "status"],
+)
+PROCESS_PEAK_RSS = Gauge(
+    "dataprofiler_process_peak_rss_bytes", "Pico de memoria residente del proceso desde su inicio.",
+)
+
+
+def peak_rss_bytes() -> int:
+    """
+    Devuelve el pico de memoria residente del proceso.
+
+    Returns:
+        int: Bytes (`ru_maxrss` está en KB en Linux y en bytes en macOS).
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def observe_stage(stage: str, seconds: float, error: Optional[BaseException] = None) -> None:
+    """
+    Registra la duración, el pico de memoria y, si hubo, la falla de una etapa.
+
+    Args:
+        stage (str): Nombre de la etapa.
+        seconds (float): Duración de la etapa.
+        error (Optional[BaseException]): Excepción con que terminó la etapa.
+    """
+    STAGE_DURATION.labels(stage).observe(seconds)
+    peak = peak_rss_bytes()
+    STAGE_PEAK_RSS.labels(stage).observe(peak)
+    PROCESS_PEAK_RSS.set(peak)
+    if error is not None:
+        STAGE_FAILURES.labels(stage, type(error).__name__).inc()
+
+
+def observe_fetch(mode: str, rows: int, nbytes: Optional[int] = None) -> None:
+    """
+    Registra el volumen leído por un perfilado.
+
+    Args:
+        mode (str): Modo de perfilado.
+        rows (int): Filas leídas.
+        nbytes (Optional[int]): Bytes del DataFrame en memoria, si se materializó.
+    """
+    ROWS_FETCHED.labels(mode).observe(rows)
+    if nbytes is not None:
+        BYTES_FETCHED.labels(mode).observe(nbytes)
+
+
+def count_profile(mode: str, status: str) -> None:
+    """
+    Cuenta un perfilado terminado.
+
+    Args:
+        mode (str): Modo de perfilado.
+        status (str): Resultado ('succeeded', 'cached', 'failed' o 'cancelled').
+    """
+    PROFILES.labels(mode, status).inc()
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Genera la exposición de métricas en formato de texto de Prometheus.
+
+    Returns:
+        Tuple[bytes, str]: Contenido y tipo de contenido de la respuesta.
+    """
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,289 @@
+from typing import Dict, Any, Optional, List, Sequence
+from contextlib import closing
+from datetime import datetime
+import json
+import math
+import os
+import sqlite3
+import threading
+import pandas as pd
+from sketches import QUANTILES
+from logger_config import get_logger
+
+# Configuración de logs
+logger = get_logger()
+
+APPMAINPATH = os.environ.get('APPMAINPATH')
+PROFILE_HISTORY_ENABLED = os.environ.get('PROFILE_HISTORY_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+PROFILE_HISTORY_DB = os.environ.get('PROFILE_HISTORY_DB', f"{APPMAINPATH}/profile_history.db")
+# Umbrales a partir de los cuales una columna se marca con deriva entre dos ejecuciones
+DRIFT_MISSING_THRESHOLD = float(os.environ.get('DRIFT_MISSING_THRESHOLD', 0.05))
+DRIFT_MEAN_THRESHOLD = float(os.environ.get('DRIFT_MEAN_THRESHOLD', 0.5))
+DRIFT_QUANTILE_THRESHOLD = float(os.environ.get('DRIFT_QUANTILE_THRESHOLD', 0.5))
+DRIFT_DISTINCT_THRESHOLD = float(os.environ.get('DRIFT_DISTINCT_THRESHOLD', 0.2))
+
+# Estadísticas numéricas guardadas como columnas de la tabla (el resto queda en `stats`)
+METRIC_COLUMNS: Dict[str, str] = {
+    "n": "n", "n_missing": "n_missing", "p_missing": "p_missing", "n_distinct": "n_distinct",
+    "p_distinct": "p_distinct", "mean": "mean", "std": "std", "min": "min", "max": "max",
+    **{name: f"p{name.rstrip('%').zfill(2)}" for name in QUANTILES},
+}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS profile_runs (
+    profile_name TEXT NOT NULL,
+    run_at TEXT NOT NULL,
+    n_rows INTEGER,
+    n_columns INTEGER,
+    paths TEXT,
+    PRIMARY KEY (profile_name, run_at)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS column_stats (
+    profile_name TEXT NOT NULL,
+    column_name TEXT NOT NULL,
+    run_at TEXT NOT NULL,
+    type TEXT,
+    {', '.join(f'{column} REAL' for column in METRIC_COLUMNS.values())},
+    stats TEXT,
+    PRIMARY KEY (profile_name, column_name, run_at)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS column_stats_run ON column_stats (profile_name, run_at);
+"""
+
+
+def _as_float(value: Any) -> Optional[float]:
+    """Convierte una estadística a float, o None si no es numérica o no es finita."""
+    if isinstance(value, bool):
+        return float(value)
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _relative_change(base: Optional[float], target: Optional[float]) -> Optional[float]:
+    """Cambio relativo de `base` a `target`, o None si no se puede calcular."""
+    if base is None or target is None or base == 0:
+        return None
+    return (target - base) / abs(base)
+
+
+class ProfileHistory:
+    """
+    Historial local de los resúmenes por columna de cada perfilado, en una base SQLite.
+
+    Cada ejecución guarda una fila por columna con clave (perfil, columna, fecha de ejecución), de modo
+    que las tendencias y la deriva entre ejecuciones se consultan sin descargar los JSON de S3.
+    """
+
+    def __init__(self, db_path: str, enabled: bool = PROFILE_HISTORY_ENABLED):
+        """
+        Inicializa el historial y crea las tablas si no existen.
+
+        Args:
+            db_path (str): Ruta del archivo SQLite.
+            enabled (bool): Si es False, no se guarda ni se consulta nada.
+        """
+        self.db_path = db_path
+        self.enabled = enabled
+        self._lock = threading.RLock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre una conexión (una por operación; SQLite en modo WAL admite lecturas concurrentes)."""
+        if not self._initialized:
+            with self._lock:
+                if not self._initialized:
+                    os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+                    with closing(sqlite3.connect(self.db_path)) as connection:
+                        connection.execute("PRAGMA journal_mode=WAL")
+                        connection.executescript(SCHEMA)
+                    self._initialized = True
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def record_run(self, profile_name: str, run_at: datetime, summary: pd.DataFrame,
+                   paths: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Guarda el resumen por columna de una ejecución (reemplaza la ejecución si ya existía).
+
+        Args:
+            profile_name (str): Nombre del perfil.
+            run_at (datetime): Fecha de la ejecución (la misma de los archivos en S3).
+            summary (pd.DataFrame): Tabla resumen con el formato del CSV (columna `variable`).
+            paths (Optional[Dict[str, Any]]): Rutas en S3 de los archivos generados.
+
+        Returns:
+            int: Columnas guardadas.
+        """
+        if not self.enabled:
+            return 0
+        run_key = run_at.isoformat()
+        rows = []
+        for record in summary.to_dict(orient="records"):
+            stats = {key: value for key, value in record.items() if key != "variable"}
+            rows.append((
+                profile_name, str(record["variable"]), run_key, stats.get("type"),
+                *(_as_float(stats.get(name)) for name in METRIC_COLUMNS),
+                json.dumps(stats, default=str),
+            ))
+        n_rows = max((row[4] for row in rows if row[4] is not None), default=None)
+
+        placeholders = ", ".join("?" for _ in range(len(METRIC_COLUMNS) + 5))
+        with self._lock, closing(self._connect()) as connection, connection:
+            connection.execute("DELETE FROM column_stats WHERE profile_name = ? AND run_at = ?", (profile_name, run_key))
+            connection.execute("INSERT OR REPLACE INTO profile_runs VALUES (?, ?, ?, ?, ?)",
+                               (profile_name, run_key, n_rows, len(rows), json.dumps(paths or {}, default=str)))
+            connection.executemany(f"INSERT INTO column_stats VALUES ({placeholders})", rows)
+        logger.info("Historial de {}: {} columnas guardadas para la ejecución {}.", profile_name, len(rows), run_key)
+        return len(rows)
+
+    def runs(self, profile_name: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Lista las ejecuciones guardadas de un perfil, de la más reciente a la más antigua.
+
+        Args:
+            profile_name (str): Nombre del perfil.
+            limit (int): Ejecuciones máximas.
+
+        Returns:
+            List[Dict[str, Any]]: Fecha, filas, columnas y rutas en S3 de cada ejecución.
+        """
+        if not self.enabled:
+            return []
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT * FROM profile_runs WHERE profile_name = ? ORDER BY run_at DESC LIMIT ?", (profile_name, limit)
+            ).fetchall()
+        return [{**dict(row), "paths": json.loads(row["paths"] or "{}")} for row in rows]
+
+    def trend(self, profile_name: str, column: str, metrics: Sequence[str],
+              since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Devuelve la evolución de estadísticas de una columna entre dos fechas.
+
+        Args:
+            profile_name (str): Nombre del perfil.
+            column (str): Columna perfilada.
+            metrics (Sequence[str]): Estadísticas (ver `METRIC_COLUMNS`).
+            since (Optional[datetime]): Fecha mínima de ejecución (incluida).
+            until (Optional[datetime]): Fecha máxima de ejecución (incluida).
+
+        Returns:
+            List[Dict[str, Any]]: Un punto por ejecución, en orden cronológico, con `run_at`, `type` y cada estadística.
+
+        Raises:
+            ValueError: Si alguna estadística no se guarda en el historial.
+        """
+        unknown = [metric for metric in metrics if metric not in METRIC_COLUMNS]
+        if unknown:
+            raise ValueError(f"Estadísticas no soportadas: {unknown}. Estadísticas válidas: {list(METRIC_COLUMNS)}")
+        if not self.enabled:
+            return []
+        selected = ", ".join(f'{METRIC_COLUMNS[metric]} AS "{metric}"' for metric in metrics)
+        query = f"SELECT run_at, type{', ' + selected if selected else ''} FROM column_stats " \
+                "WHERE profile_name = ? AND column_name = ? AND run_at >= ? AND run_at <= ? ORDER BY run_at"
+        params = (profile_name, column, since.isoformat() if since else "", until.isoformat() if until else "9999")
+        with closing(self._connect()) as connection:
+            return [dict(row) for row in connection.execute(query, params).fetchall()]
+
+    def _run_columns(self, connection: sqlite3.Connection, profile_name: str, run_at: str) -> Dict[str, sqlite3.Row]:
+        """Lee las columnas guardadas de una ejecución."""
+        rows = connection.execute("SELECT * FROM column_stats WHERE profile_name = ? AND run_at = ?",
+                                  (profile_name, run_at)).fetchall()
+        return {row["column_name"]: row for row in rows}
+
+    def drift(self, profile_name: str, base_run: Optional[str] = None,
+              target_run: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Compara las estadísticas de cada columna entre dos ejecuciones.
+
+        Por columna se calcula la diferencia de la proporción de faltantes, el desplazamiento de la media
+        en desviaciones estándar de la ejecución base, la razón de desviaciones estándar, el cambio relativo
+        de valores distintos y el mayor desplazamiento de los cuantiles en rangos intercuartílicos de la
+        base. Una columna tiene deriva si cambia de tipo, aparece o desaparece, o si alguna medida supera
+        su umbral (`DRIFT_*_THRESHOLD`).
+
+        Args:
+            profile_name (str): Nombre del perfil.
+            base_run (Optional[str]): Fecha de la ejecución base. Por defecto, la penúltima.
+            target_run (Optional[str]): Fecha de la ejecución comparada. Por defecto, la última.
+
+        Returns:
+            Dict[str, Any]: Ejecuciones comparadas, umbrales, columnas con deriva y detalle por columna.
+
+        Raises:
+            ValueError: Si no hay dos ejecuciones para comparar o alguna no existe.
+        """
+        if not self.enabled:
+            raise ValueError("El historial de perfiles está desactivado.")
+        with closing(self._connect()) as connection:
+            latest = [row["run_at"] for row in connection.execute(
+                "SELECT run_at FROM profile_runs WHERE profile_name = ? ORDER BY run_at DESC LIMIT 2", (profile_name,))]
+            target_run = target_run or (latest[0] if latest else None)
+            base_run = base_run or next((run for run in latest if run != target_run), None)
+            if base_run is None or target_run is None:
+                raise ValueError(f"El perfil {profile_name} no tiene dos ejecuciones para comparar.")
+            base = self._run_columns(connection, profile_name, base_run)
+            target = self._run_columns(connection, profile_name, target_run)
+        for run_at, columns in ((base_run, base), (target_run, target)):
+            if not columns:
+                raise ValueError(f"No existe la ejecución {run_at} del perfil {profile_name}.")
+
+        columns: Dict[str, Dict[str, Any]] = {}
+        for name in list(base) + [name for name in target if name not in base]:
+            columns[name] = self._column_drift(base.get(name), target.get(name))
+        return {
+            "profile_name": profile_name,
+            "base_run": base_run,
+            "target_run": target_run,
+            "thresholds": {"missing": DRIFT_MISSING_THRESHOLD, "mean": DRIFT_MEAN_THRESHOLD,
+                           "quantile": DRIFT_QUANTILE_THRESHOLD, "distinct": DRIFT_DISTINCT_THRESHOLD},
+            "drifted_columns": [name for name, result in columns.items() if result["drifted"]],
+            "columns": columns,
+        }
+
+    @staticmethod
+    def _column_drift(base: Optional[sqlite3.Row], target: Optional[sqlite3.Row]) -> Dict[str, Any]:
+        """Calcula las medidas de deriva de una columna entre dos ejecuciones."""
+        if base is None or target is None:
+            return {"status": "added" if base is None else "removed", "drifted": True, "reasons": ["columns"]}
+
+        result: Dict[str, Any] = {"status": "present", "base_type": base["type"], "target_type": target["type"]}
+        reasons = ["type"] if base["type"] != target["type"] else []
+
+        if base["p_missing"] is not None and target["p_missing"] is not None:
+            result["missing_delta"] = target["p_missing"] - base["p_missing"]
+            if abs(result["missing_delta"]) > DRIFT_MISSING_THRESHOLD:
+                reasons.append("missing")
+
+        if base["mean"] is not None and target["mean"] is not None and base["std"]:
+            result["mean_shift"] = (target["mean"] - base["mean"]) / base["std"]
+            result["std_ratio"] = target["std"] / base["std"] if target["std"] is not None else None
+            if abs(result["mean_shift"]) > DRIFT_MEAN_THRESHOLD:
+                reasons.append("mean")
+
+        iqr = (base["p75"] - base["p25"]) if base["p75"] is not None and base["p25"] is not None else None
+        shifts = [abs(target[column] - base[column]) / iqr
+                  for column in (METRIC_COLUMNS[name] for name in QUANTILES)
+                  if iqr and base[column] is not None and target[column] is not None]
+        if shifts:
+            result["quantile_shift"] = max(shifts)
+            if result["quantile_shift"] > DRIFT_QUANTILE_THRESHOLD:
+                reasons.append("quantiles")
+
+        distinct_change = _relative_change(base["n_distinct"], target["n_distinct"])
+        if distinct_change is not None:
+            result["distinct_change"] = distinct_change
+            if abs(distinct_change) > DRIFT_DISTINCT_THRESHOLD:
+                reasons.append("distinct")
+
+        result["drifted"] = bool(reasons)
+        result["reasons"] = reasons
+        return result
+
+
+# Historial compartido por todas las peticiones del proceso
+profile_history = ProfileHistory(PROFILE_HISTORY_DB)
@@ -0,0 +1,198 @@
+from typing import Dict, Any, Optional, Tuple
+from datetime import datetime
+import json
+import os
+import random
+import re
+import threading
+import time
+from aws_s3_handler import get_s3_manager
+from logger_config import get_logger
+
+# Configuración de logs
+logger = get_logger()
+
+REGION_NAME = os.environ.get('REGION_NAME')
+BUCKET_NAME = os.environ.get('BUCKET_NAME')
+PROFILE_MANIFEST_ENABLED = os.environ.get('PROFILE_MANIFEST_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+PROFILE_MANIFEST_KEY = os.environ.get('PROFILE_MANIFEST_KEY', "profiling/_manifest.json")
+PROFILE_MANIFEST_MAX_RETRIES = int(os.environ.get('PROFILE_MANIFEST_MAX_RETRIES', 8))
+# Prefijo de los reportes en S3 y formato de sus claves: `profiling/{AAAAMMDD_HHMMSS}_{perfil}.{formato}`
+PROFILE_S3_PREFIX = "profiling/"
+ARTIFACT_KEY_PATTERN = re.compile(r"^(\d{8}_\d{6})_(.+)\.(html|json|csv)$")
+MANIFEST_VERSION = 1
+
+
+def artifact_key(run: str, profile_name: str, output_format: str) -> str:
+    """Clave en S3 de un archivo generado por una ejecución."""
+    return f"{PROFILE_S3_PREFIX}{run}_{profile_name}.{output_format.lower()}"
+
+
+class ManifestConflictError(Exception):
+    """El manifiesto cambió en S3 en todos los intentos de actualizarlo."""
+
+
+class ProfileManifest:
+    """
+    Índice en S3 de los perfiles generados: perfil -> ejecución -> formato -> tamaño en bytes.
+
+    Es un único objeto JSON compacto (`PROFILE_MANIFEST_KEY`) que se actualiza al terminar cada
+    perfilado, de modo que `GET /profiles` responde con una sola lectura en lugar de listar el bucket.
+    Las actualizaciones usan escrituras condicionales de S3 (`If-Match` con el ETag leído), por lo
+    que varias réplicas pueden actualizarlo a la vez sin perder ejecuciones: si otra réplica escribió
+    antes, se vuelve a leer y se reintenta. Las claves de los archivos no se guardan porque se derivan
+    de la ejecución, el perfil y el formato (ver `artifact_key`).
+    """
+
+    def __init__(self, region_name: Optional[str], bucket_name: Optional[str],
+                 key: str = PROFILE_MANIFEST_KEY, enabled: bool = PROFILE_MANIFEST_ENABLED,
+                 max_retries: int = PROFILE_MANIFEST_MAX_RETRIES):
+        """
+        Inicializa el manifiesto (no accede a S3 hasta el primer uso).
+
+        Args:
+            region_name (Optional[str]): Región del bucket.
+            bucket_name (Optional[str]): Bucket de los reportes.
+            key (str): Clave del manifiesto en el bucket.
+            enabled (bool): Si es False, las ejecuciones no se registran.
+            max_retries (int): Intentos de actualización ante escrituras concurrentes.
+        """
+        self.region_name = region_name
+        self.bucket_name = bucket_name
+        self.key = key
+        self.enabled = enabled and bool(bucket_name)
+        self.max_retries = max(1, max_retries)
+        # Serializa las actualizaciones del proceso para evitar conflictos entre sus propias peticiones
+        self._lock = threading.Lock()
+
+    def _read(self) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Lee el manifiesto y su ETag; (None, None) si todavía no existe."""
+        result = get_s3_manager(self.region_name).read_object(self.bucket_name, self.key)
+        if result is None:
+            return None, None
+        body, etag = result
+        return json.loads(body), etag
+
+    def _build_from_listing(self) -> Dict[str, Any]:
+        """
+        Construye el manifiesto a partir del listado completo de `profiling/`.
+
+        Returns:
+            Dict[str, Any]: Manifiesto con todas las ejecuciones encontradas en el bucket.
+
+        Raises:
+            RuntimeError: Si no se pudo listar el bucket.
+        """
+        objects = get_s3_manager(self.region_name).list_objects(self.bucket_name, PROFILE_S3_PREFIX)
+        if objects is False:
+            raise RuntimeError(f"No se pudo listar s3://{self.bucket_name}/{PROFILE_S3_PREFIX}.")
+        profiles: Dict[str, Dict[str, Dict[str, int]]] = {}
+        for obj in objects:
+            match = ARTIFACT_KEY_PATTERN.match(obj["Key"][len(PROFILE_S3_PREFIX):])
+            if match:
+                run, profile_name, output_format = match.groups()
+                profiles.setdefault(profile_name, {}).setdefault(run, {})[output_format] = obj["Size"]
+        logger.info("Manifiesto construido desde el listado: {} perfiles, {} objetos.", len(profiles), len(objects))
+        return {"version": MANIFEST_VERSION, "profiles": profiles}
+
+    def _update(self, change, rebuild: bool = False) -> Dict[str, Any]:
+        """
+        Aplica un cambio al manifiesto con escritura condicional, reintentando ante conflictos.
+
+        Si el manifiesto no existe (o `rebuild` es True), se construye primero desde el listado del bucket.
+
+        Args:
+            change: Función que modifica el manifiesto en su lugar.
+            rebuild (bool): Reconstruir el manifiesto desde el listado antes de aplicar el cambio.
+
+        Returns:
+            Dict[str, Any]: Manifiesto escrito.
+
+        Raises:
+            ManifestConflictError: Si otra réplica lo modificó en todos los intentos.
+        """
+        s3_manager = get_s3_manager(self.region_name)
+        with self._lock:
+            for attempt in range(1, self.max_retries + 1):
+                manifest, etag = self._read()
+                if manifest is None or rebuild:
+                    manifest = self._build_from_listing()
+                change(manifest)
+                manifest["updated_at"] = datetime.now().isoformat(timespec="seconds")
+                body = json.dumps(manifest, separators=(",", ":"), sort_keys=True)
+                if s3_manager.write_object_if(body, self.bucket_name, self.key, etag):
+                    return manifest
+                logger.info("El manifiesto cambió durante la actualización; reintento {} de {}.",
+                            attempt, self.max_retries)
+                time.sleep(random.uniform(0, 0.05 * 2 ** attempt))
+        raise ManifestConflictError(f"No se pudo actualizar s3://{self.bucket_name}/{self.key} "
+                                    f"tras {self.max_retries} intentos.")
+
+    def record_run(self, profile_name: str, run: str, sizes: Dict[str, int]) -> None:
+        """
+        Registra los archivos subidos por una ejecución.
+
+        Args:
+            profile_name (str): Nombre del perfil.
+            run (str): Marca de tiempo de la ejecución (`AAAAMMDD_HHMMSS`, la de los nombres de archivo).
+            sizes (Dict[str, int]): Formato ('html', 'json', 'csv') -> tamaño en bytes.
+        """
+        if not self.enabled or not sizes:
+            return
+
+        def change(manifest: Dict[str, Any]) -> None:
+            runs = manifest.setdefault("profiles", {}).setdefault(profile_name, {})
+            runs.setdefault(run, {}).update({output_format.lower(): size for output_format, size in sizes.items()})
+
+        self._update(change)
+        logger.debug("Ejecución {} de {} registrada en el manifiesto.", run, profile_name)
+
+    def rebuild(self) -> Dict[str, Any]:
+        """
+        Reconstruye el manifiesto desde el listado del bucket (por ejemplo, tras borrar reportes a mano).
+
+        Returns:
+            Dict[str, Any]: Manifiesto escrito.
+        """
+        return self._update(lambda manifest: None, rebuild=True)
+
+    def lookup(self, profile_name: Optional[str] = None, limit: int = 20) -> Dict[str, Any]:
+        """
+        Consulta las ejecuciones de los perfiles con una sola lectura del manifiesto.
+
+        Args:
+            profile_name (Optional[str]): Perfil a consultar. Si es None, se devuelven todos.
+            limit (int): Ejecuciones más recientes por perfil.
+
+        Returns:
+            Dict[str, Any]: Fecha de actualización y, por perfil, sus ejecuciones con la ruta y el tamaño de cada archivo.
+        """
+        manifest, _ = self._read()
+        if manifest is None:
+            return {"updated_at": None, "profiles": {}}
+        profiles = manifest.get("profiles", {})
+        if profile_name is not None:
+            profiles = {profile_name: profiles[profile_name]} if profile_name in profiles else {}
+        return {
+            "updated_at": manifest.get("updated_at"),
+            "profiles": {
+                name: [
+                    {
+                        "run": run,
+                        "artifacts": {
+                            output_format.upper(): {
+                                "path": f"s3://{self.bucket_name}/{artifact_key(run, name, output_format)}",
+                                "size": size,
+                            }
+                            for output_format, size in runs[run].items()
+                        },
+                    }
+                    for run in sorted(runs, reverse=True)[:limit]
+                ]
+                for name, runs in sorted(profiles.items())
+            },
+        }
+
+
+# Manifiesto compartido por todas las peticiones del proceso
+profile_manifest = ProfileManifest(REGION_NAME, BUCKET_NAME)
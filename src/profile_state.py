@@ -0,0 +1,141 @@
+from typing import Dict, Any, Optional
+from datetime import datetime
+import hashlib
+import json
+import os
+from pathlib import Path
+import pandas as pd
+from pydantic import BaseModel, Field
+from aws_s3_handler import S3Manager
+from column_stats import ProfileAccumulator
+from logger_config import get_logger
+
+# Configuración de logs
+logger = get_logger()
+
+PROFILE_STATE_S3_PREFIX = os.environ.get('PROFILE_STATE_S3_PREFIX', "profiling/state")
+
+
+class ProfileState(BaseModel):
+    """
+    Estado combinable de un perfil incremental y la última marca de agua procesada.
+    """
+
+    profile_name: str = Field(..., description="Nombre del perfil")
+    sql_hash: str = Field(..., description="Hash SHA-256 del texto de la consulta SQL")
+    watermark_column: str = Field(..., description="Columna usada como marca de agua")
+    watermark: Optional[Any] = Field(None, description="Mayor valor de la marca de agua ya procesado")
+    watermark_kind: Optional[str] = Field(None, description="Tipo de la marca de agua ('datetime' o 'numeric')")
+    accumulator: Dict[str, Any] = Field(..., description="Estado serializado de `ProfileAccumulator`")
+    runs: int = Field(0, description="Número de ejecuciones incorporadas")
+    updated_at: datetime = Field(default_factory=datetime.now, description="Fecha de la última actualización")
+
+    def get_accumulator(self) -> ProfileAccumulator:
+        """Reconstruye el perfil acumulado."""
+        return ProfileAccumulator.from_dict(self.accumulator)
+
+    def get_watermark(self) -> Any:
+        """Devuelve la marca de agua con su tipo original, lista para enlazar en la consulta."""
+        if self.watermark is None:
+            return None
+        if self.watermark_kind == "datetime":
+            return pd.Timestamp(self.watermark).to_pydatetime()
+        return self.watermark
+
+
+def hash_sql(sql: str) -> str:
+    """
+    Calcula el hash del texto de una consulta SQL.
+
+    Args:
+        sql (str): Consulta SQL.
+
+    Returns:
+        str: Hash SHA-256 en hexadecimal.
+    """
+    return hashlib.sha256(sql.strip().encode("utf-8")).hexdigest()
+
+
+class ProfileStateStore:
+    """
+    Almacén de estados de perfiles incrementales en disco local y, opcionalmente, en S3 junto a los reportes.
+    """
+
+    def __init__(self, local_dir: str, s3_manager: Optional[S3Manager] = None, bucket_name: Optional[str] = None,
+                 s3_prefix: str = PROFILE_STATE_S3_PREFIX):
+        """
+        Inicializa el almacén.
+
+        Args:
+            local_dir (str): Directorio local de los estados.
+            s3_manager (Optional[S3Manager]): Cliente de S3. Si es None, solo se usa el disco local.
+            bucket_name (Optional[str]): Bucket donde se replican los estados.
+            s3_prefix (str): Prefijo de los estados dentro del bucket.
+        """
+        self.local_dir = Path(local_dir)
+        self.local_dir.mkdir(parents=True, exist_ok=True)
+        self.s3_manager = s3_manager
+        self.bucket_name = bucket_name
+        self.s3_prefix = s3_prefix
+
+    def _local_path(self, profile_name: str) -> Path:
+        """Ruta local del estado de un perfil."""
+        return self.local_dir / f"{profile_name}.json"
+
+    def _s3_key(self, profile_name: str) -> str:
+        """Ruta en S3 del estado de un perfil."""
+        return f"{self.s3_prefix}/{profile_name}.json"
+
+    def load(self, profile_name: str) -> Optional[ProfileState]:
+        """
+        Carga el estado de un perfil, primero desde disco y, si no existe, desde S3.
+
+        Args:
+            profile_name (str): Nombre del perfil.
+
+        Returns:
+            Optional[ProfileState]: Estado guardado, o None si el perfil nunca se ejecutó.
+        """
+        local_path = self._local_path(profile_name)
+        if not local_path.exists() and self.s3_manager is not None and self.bucket_name:
+            self.s3_manager.download_file(self.bucket_name, self._s3_key(profile_name), str(local_path))
+
+        if not local_path.exists():
+            logger.info("No existe estado incremental para el perfil {}.", profile_name)
+            return None
+
+        with open(local_path, "r") as f:
+            state = ProfileState(**json.load(f))
+        logger.info("Estado incremental de {} cargado (marca de agua: {}).", profile_name, state.watermark)
+        return state
+
+    def save(self, state: ProfileState) -> None:
+        """
+        Guarda el estado de un perfil en disco y lo replica en S3 si está configurado.
+
+        Args:
+            state (ProfileState): Estado a guardar.
+        """
+        local_path = self._local_path(state.profile_name)
+        tmp_path = local_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as f:
+            f.write(state.model_dump_json(indent=4))
+        os.replace(tmp_path, local_path)
+
+        if self.s3_manager is not None and self.bucket_name:
+            self.s3_manager.upload_file(str(local_path), self.bucket_name, self._s3_key(state.profile_name))
+        logger.info("Estado incremental de {} guardado (marca de agua: {}).", state.profile_name, state.watermark)
+
+    def delete(self, profile_name: str) -> None:
+        """
+        Elimina el estado de un perfil para forzar una reconstrucción completa.
+
+        Args:
+            profile_name (str): Nombre del perfil.
+        """
+        local_path = self._local_path(profile_name)
+        if local_path.exists():
+            local_path.unlink()
+        if self.s3_manager is not None and self.bucket_name:
+            self.s3_manager.delete_file(self.bucket_name, self._s3_key(profile_name))
+        logger.info("Estado incremental de {} eliminado.", profile_name)
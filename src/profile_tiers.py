@@ -0,0 +1,141 @@
+from typing import Dict, Any, List, Optional, TYPE_CHECKING
+import os
+import pandas as pd
+from logger_config import get_logger
+
+# Configuración de logs
+logger = get_logger()
+
+# Niveles de perfilado, del más barato al más completo
+PROFILE_TIERS = ("minimal", "standard", "full")
+PROFILE_TIME_BUDGET_SECONDS = float(os.environ.get('PROFILE_TIME_BUDGET_SECONDS', 600))
+PROFILE_MEMORY_BUDGET_MB = float(os.environ.get('PROFILE_MEMORY_BUDGET_MB', 4096))
+# Celdas (filas x columnas) por segundo que procesa cada nivel; sirven para estimar la duración
+TIER_CELLS_PER_SECOND: Dict[str, float] = {
+    "minimal": float(os.environ.get('PROFILE_MINIMAL_CELLS_PER_SECOND', 2_000_000)),
+    "standard": float(os.environ.get('PROFILE_STANDARD_CELLS_PER_SECOND', 200_000)),
+    "full": float(os.environ.get('PROFILE_FULL_CELLS_PER_SECOND', 20_000)),
+}
+# Segundos por cada par de columnas numéricas en las interacciones del nivel `full`
+PROFILE_SECONDS_PER_INTERACTION = float(os.environ.get('PROFILE_SECONDS_PER_INTERACTION', 0.1))
+# Memoria máxima del perfilado como múltiplo de la memoria del DataFrame
+TIER_MEMORY_FACTOR: Dict[str, float] = {"minimal": 2.0, "standard": 3.0, "full": 5.0}
+
+if TYPE_CHECKING:
+    from ydata_profiling.config import Settings
+
+
+def tier_settings(tier: str) -> "Settings":
+    """
+    Devuelve la configuración de ydata-profiling de un nivel.
+
+    - `minimal`: configuración mínima de ydata-profiling (sin correlaciones, interacciones, diagramas
+      de faltantes, duplicados ni estadísticas de caracteres del texto).
+    - `standard`: configuración por defecto sin interacciones ni las matrices de faltantes.
+    - `full`: configuración por defecto de ydata-profiling.
+
+    Args:
+        tier (str): Nivel de perfilado.
+
+    Returns:
+        Settings: Configuración de `ProfileReport`.
+    """
+    from ydata_profiling.config import Settings
+    from ydata_profiling.utils.paths import get_config
+
+    if tier == "minimal":
+        return Settings().from_file(get_config("config_minimal.yaml"))
+    if tier == "standard":
+        return Settings().update({
+            "interactions": {"continuous": False},
+            "missing_diagrams": {"bar": True, "matrix": False, "heatmap": False},
+        })
+    if tier == "full":
+        return Settings()
+    raise ValueError(f"Nivel de perfilado no soportado: {tier}")
+
+
+def tier_analyses(tier: str) -> List[str]:
+    """
+    Lista los análisis que habilita la configuración de un nivel, además de las estadísticas por variable.
+
+    ydata-profiling omite los que no aplican a los datos (por ejemplo, las correlaciones con una sola
+    columna numérica o los diagramas de faltantes sin nulos), por lo que el reporte puede no incluirlos.
+
+    Args:
+        tier (str): Nivel de perfilado.
+
+    Returns:
+        List[str]: Análisis habilitados.
+    """
+    settings = tier_settings(tier)
+    analyses = ["variables"]
+    if settings.vars.cat.characters or settings.vars.cat.words:
+        analyses.append("text_statistics")
+    analyses += [f"correlations.{name}" for name, correlation in settings.correlations.items() if correlation.calculate]
+    if settings.interactions.continuous:
+        analyses.append("interactions")
+    analyses += [f"missing.{name}" for name, enabled in settings.missing_diagrams.items() if enabled]
+    if settings.duplicates.head > 0:
+        analyses.append("duplicates")
+    if settings.samples.head > 0 or settings.samples.tail > 0 or settings.samples.random > 0:
+        analyses.append("samples")
+    return analyses
+
+
+def choose_profile_tier(df: pd.DataFrame, requested: str = "auto",
+                        time_budget_seconds: Optional[float] = None,
+                        memory_budget_mb: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Resuelve el nivel de perfilado de un DataFrame.
+
+    Con `auto` se elige el nivel más completo cuya duración estimada (celdas / celdas por segundo del
+    nivel, más un costo por par de columnas numéricas si hay interacciones) y memoria estimada
+    (memoria del DataFrame por el factor del nivel) caben en los presupuestos. Si ninguno cabe, se usa `minimal`.
+
+    Args:
+        df (pd.DataFrame): DataFrame a perfilar.
+        requested (str): Nivel pedido ('auto', 'minimal', 'standard' o 'full').
+        time_budget_seconds (Optional[float]): Duración máxima. Por defecto, `PROFILE_TIME_BUDGET_SECONDS`.
+        memory_budget_mb (Optional[float]): Memoria máxima. Por defecto, `PROFILE_MEMORY_BUDGET_MB`.
+
+    Returns:
+        Dict[str, Any]: Nivel pedido y elegido, motivo, celdas, estimaciones y análisis habilitados.
+    """
+    time_budget = time_budget_seconds or PROFILE_TIME_BUDGET_SECONDS
+    memory_budget = (memory_budget_mb or PROFILE_MEMORY_BUDGET_MB) * 1024 ** 2
+    cells = int(df.shape[0] * df.shape[1])
+    memory_bytes = int(df.memory_usage(index=False, deep=True).sum())
+    n_numeric = df.select_dtypes(include="number").shape[1]
+
+    def estimate(tier: str) -> Dict[str, float]:
+        seconds = cells / TIER_CELLS_PER_SECOND[tier]
+        if tier_settings(tier).interactions.continuous:
+            seconds += n_numeric ** 2 * PROFILE_SECONDS_PER_INTERACTION
+        return {"seconds": round(seconds, 2),
+                "memory_bytes": int(memory_bytes * TIER_MEMORY_FACTOR[tier])}
+
+    if requested != "auto":
+        tier, reason = requested, "nivel solicitado"
+    else:
+        tier, reason = "minimal", "ningún nivel cabe en los presupuestos de tiempo y memoria"
+        for candidate in reversed(PROFILE_TIERS):
+            estimated = estimate(candidate)
+            if estimated["seconds"] <= time_budget and estimated["memory_bytes"] <= memory_budget:
+                tier, reason = candidate, (f"{cells} celdas: ~{estimated['seconds']} s y "
+                                           f"~{estimated['memory_bytes']} bytes dentro del presupuesto")
+                break
+
+    estimated = estimate(tier)
+    logger.info("Nivel de perfilado '{}' (solicitado '{}'): {}.", tier, requested, reason)
+    return {
+        "requested": requested,
+        "tier": tier,
+        "reason": reason,
+        "cells": cells,
+        "estimated_seconds": estimated["seconds"],
+        "estimated_memory_bytes": estimated["memory_bytes"],
+        "time_budget_seconds": time_budget,
+        "memory_budget_bytes": int(memory_budget),
+        "configured_analyses": tier_analyses(tier),
+    }
@@ -0,0 +1,412 @@
+from typing import Any, Callable, Optional, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from multiprocessing.connection import Connection
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import uuid
+import pandas as pd
+import pyarrow as pa
+from arrow_io import write_ipc, read_ipc
+from logger_config import get_logger
+
+# Configuración de logs
+logger = get_logger()
+
+# 0 desactiva el pool y el perfilado se ejecuta en el proceso de la API
+PROFILING_POOL_SIZE = int(os.environ.get('PROFILING_POOL_SIZE', 0))
+PROFILING_MAX_TASKS_PER_CHILD = int(os.environ.get('PROFILING_MAX_TASKS_PER_CHILD', 10))
+# Procesos usados para perfilar grupos de columnas cuando el pool general está desactivado
+WIDE_PROFILING_WORKERS = int(os.environ.get('WIDE_PROFILING_WORKERS', os.cpu_count() or 2))
+PROFILING_TIMEOUT_SECONDS = float(os.environ.get('PROFILING_TIMEOUT_SECONDS', 1800))
+# /dev/shm mantiene el archivo de traspaso en memoria compartida cuando está disponible
+PROFILING_HANDOFF_DIR = os.environ.get(
+    'PROFILING_HANDOFF_DIR', "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+)
+
+
+class ProfilingTimeoutError(Exception):
+    """Excepción lanzada cuando un perfilado supera el tiempo máximo permitido."""
+    pass
+
+
+def _run_from_ipc(func: Callable[..., Any], ipc_path: str, *args: Any) -> Any:
+    """
+    Punto de entrada en el proceso hijo: reconstruye el DataFrame desde Arrow IPC y ejecuta la función.
+
+    Args:
+        func (Callable): Función a nivel de módulo que recibe el DataFrame como primer argumento.
+        ipc_path (str): Ruta del archivo Arrow IPC con el DataFrame.
+        *args: Argumentos adicionales de la función.
+
+    Returns:
+        Any: Resultado de la función.
+    """
+    return func(read_ipc(ipc_path), *args)
+
+
+def _run_from_ipc_columns(func: Callable[..., Any], ipc_path: str, columns: List[str], *args: Any) -> Any:
+    """
+    Punto de entrada en el proceso hijo para un grupo de columnas: lee solo esas columnas del archivo Arrow IPC.
+
+    Args:
+        func (Callable): Función a nivel de módulo que recibe el DataFrame como primer argumento.
+        ipc_path (str): Ruta del archivo Arrow IPC con el DataFrame completo.
+        columns (List[str]): Columnas del grupo.
+        *args: Argumentos adicionales de la función.
+
+    Returns:
+        Any: Resultado de la función.
+    """
+    return func(read_ipc(ipc_path, columns=columns), *args)
+
+
+def _worker_loop(conn: Connection) -> None:
+    """
+    Bucle del proceso hijo: ejecuta las tareas que recibe por `conn` hasta recibir None.
+
+    Args:
+        conn (Connection): Extremo del hijo de la tubería con el proceso de la API.
+    """
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        func, args = task
+        try:
+            result = ("ok", func(*args))
+        except Exception as e:
+            result = ("error", e)
+        try:
+            conn.send(result)
+        except Exception as e:
+            # El resultado o la excepción no se pudieron serializar
+            conn.send(("error", RuntimeError(f"{type(e).__name__}: {e}")))
+
+
+class _Worker:
+    """Proceso hijo del pool con su propia tubería, de modo que se puede terminar sin afectar a los demás."""
+
+    def __init__(self, context: Any, generation: int):
+        """
+        Inicia el proceso hijo.
+
+        Args:
+            context: Contexto de multiprocessing ('spawn').
+            generation (int): Generación del pool; los procesos de generaciones anteriores no se reutilizan.
+        """
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_loop, args=(child_conn,), name="profiling-worker", daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.generation = generation
+        self.tasks = 0
+
+    def stop(self) -> None:
+        """Detiene el proceso al terminar su tarea actual (lo termina si no responde)."""
+        try:
+            self.conn.send(None)
+            self.process.join(timeout=5)
+        except OSError:
+            pass
+        self.kill()
+
+    def kill(self) -> None:
+        """Termina el proceso de inmediato."""
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=5)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+        self.conn.close()
+
+
+class ProfilingPool:
+    """
+    Pool de procesos para ejecutar el perfilado fuera del proceso de la API.
+
+    El DataFrame se entrega a los procesos hijos a través de un archivo Arrow IPC en memoria compartida,
+    por lo que nunca se serializa con pickle. Los procesos se reciclan cada `max_tasks_per_child` tareas
+    para limitar el crecimiento de memoria.
+
+    Cada tarea ocupa un proceso propio mientras se ejecuta: si supera el tiempo máximo se termina solo
+    ese proceso, y las tareas de otras peticiones que se ejecutan a la vez no se ven afectadas.
+    """
+
+    def __init__(self, max_workers: int = PROFILING_POOL_SIZE, max_tasks_per_child: int = PROFILING_MAX_TASKS_PER_CHILD,
+                 timeout: float = PROFILING_TIMEOUT_SECONDS, handoff_dir: str = PROFILING_HANDOFF_DIR):
+        """
+        Inicializa la configuración del pool. Los procesos se crean en el primer uso.
+
+        Args:
+            max_workers (int): Número de procesos hijos.
+            max_tasks_per_child (int): Tareas que ejecuta cada proceso antes de ser reemplazado.
+            timeout (float): Tiempo máximo en segundos por tarea.
+            handoff_dir (str): Directorio de los archivos Arrow IPC de traspaso.
+        """
+        self.max_workers = max_workers
+        self.max_tasks_per_child = max_tasks_per_child
+        self.timeout = timeout
+        self.handoff_dir = handoff_dir
+        self._context = multiprocessing.get_context("spawn")
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._idle: List[_Worker] = []
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _checkout(self) -> _Worker:
+        """Toma un proceso libre o inicia uno nuevo (requiere haber adquirido un lugar en `_slots`)."""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+            generation = self._generation
+        worker = _Worker(self._context, generation)
+        logger.info("Proceso de perfilado {} iniciado "
+                    "(máximo {} tareas por proceso).", worker.process.pid, self.max_tasks_per_child)
+        return worker
+
+    def _checkin(self, worker: _Worker) -> None:
+        """Devuelve un proceso al pool, o lo detiene si ya ejecutó `max_tasks_per_child` tareas o el pool se detuvo."""
+        with self._lock:
+            if worker.generation == self._generation and worker.tasks < self.max_tasks_per_child:
+                self._idle.append(worker)
+                return
+        worker.stop()
+
+    def _execute(self, func: Callable[..., Any], args: Tuple[Any, ...], timeout: float) -> Any:
+        """
+        Ejecuta `func(*args)` en un proceso del pool.
+
+        Args:
+            func (Callable): Función a nivel de módulo.
+            args (Tuple): Argumentos de la función.
+            timeout (float): Tiempo máximo en segundos, incluida la espera por un proceso libre.
+
+        Returns:
+            Any: Resultado de la función.
+
+        Raises:
+            ProfilingTimeoutError: Si la tarea supera el tiempo máximo (su proceso se termina).
+            RuntimeError: Si el proceso hijo terminó de forma inesperada.
+        """
+        deadline = time.monotonic() + timeout
+        if not self._slots.acquire(timeout=timeout):
+            raise ProfilingTimeoutError(f"No hubo un proceso de perfilado libre antes de {timeout} segundos.")
+        worker = None
+        try:
+            worker = self._checkout()
+            try:
+                worker.conn.send((func, args))
+                finished = worker.conn.poll(max(0.0, deadline - time.monotonic()))
+                if finished:
+                    status, value = worker.conn.recv()
+            except (EOFError, OSError) as e:
+                worker.kill()
+                worker = None
+                raise RuntimeError(f"El proceso de perfilado terminó de forma inesperada: {e!r}")
+            if not finished:
+                logger.error("El perfilado superó el tiempo máximo de {} s; "
+                             "se termina el proceso {}.", timeout, worker.process.pid)
+                # Una tarea en ejecución no se puede interrumpir: se termina solo su proceso.
+                worker.kill()
+                worker = None
+                raise ProfilingTimeoutError(f"El perfilado superó el tiempo máximo de {timeout} segundos.")
+            worker.tasks += 1
+            if status == "error":
+                raise value
+            return value
+        finally:
+            if worker is not None:
+                self._checkin(worker)
+            self._slots.release()
+
+    def _execute_many(self, tasks: List[Tuple[Callable[..., Any], Tuple[Any, ...]]], timeout: float) -> List[Any]:
+        """
+        Ejecuta varias tareas en paralelo en los procesos del pool.
+
+        Args:
+            tasks (List[Tuple[Callable, Tuple]]): Función y argumentos de cada tarea.
+            timeout (float): Tiempo máximo en segundos para todas las tareas.
+
+        Returns:
+            List[Any]: Resultado de cada tarea, en el mismo orden.
+
+        Raises:
+            Exception: La primera excepción de las tareas (las que aún no empezaron se cancelan).
+        """
+        deadline = time.monotonic() + timeout
+        executor = ThreadPoolExecutor(max_workers=max(1, min(len(tasks), self.max_workers)),
+                                      thread_name_prefix="profiling-pool")
+        try:
+            futures = [executor.submit(lambda task=task: self._execute(*task, max(0.0, deadline - time.monotonic())))
+                       for task in tasks]
+            done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+            failed = [future for future in done if future.exception() is not None]
+            if failed:
+                raise failed[0].exception()
+            return [future.result() for future in futures]
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, func: Callable[..., Any], df: pd.DataFrame, *args: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Ejecuta `func(df, *args)` en un proceso hijo.
+
+        Args:
+            func (Callable): Función a nivel de módulo (debe poder importarse desde el proceso hijo).
+            df (pd.DataFrame): DataFrame a perfilar.
+            *args: Argumentos adicionales de la función.
+            timeout (Optional[float]): Tiempo máximo en segundos. Por defecto, el del pool.
+
+        Returns:
+            Any: Resultado de la función.
+
+        Raises:
+            ProfilingTimeoutError: Si la tarea supera el tiempo máximo.
+        """
+        timeout = timeout or self.timeout
+        ipc_path = os.path.join(self.handoff_dir, f"dataprofiler_{uuid.uuid4().hex}.arrow")
+        try:
+            try:
+                write_ipc(df, ipc_path)
+            except pa.ArrowException as e:
+                # Columnas con tipos mezclados no se pueden representar en Arrow: se perfila en este proceso.
+                logger.warning("No se pudo convertir el DataFrame a Arrow ({}); se perfila en el proceso actual.", e)
+                return func(df, *args)
+
+            return self._execute(_run_from_ipc, (func, ipc_path, *args), timeout)
+        finally:
+            if os.path.exists(ipc_path):
+                os.remove(ipc_path)
+
+    def run_column_groups(self, func: Callable[..., Any], df: pd.DataFrame, column_groups: List[List[str]],
+                          *args: Any, timeout: Optional[float] = None) -> List[Any]:
+        """
+        Ejecuta `func(df[grupo], *args)` para cada grupo de columnas en paralelo en los procesos hijos.
+
+        El DataFrame se escribe una sola vez en Arrow IPC y cada proceso lee mediante memory-mapping
+        únicamente las columnas de su grupo.
+
+        Args:
+            func (Callable): Función a nivel de módulo (debe poder importarse desde el proceso hijo).
+            df (pd.DataFrame): DataFrame completo.
+            column_groups (List[List[str]]): Columnas de cada grupo.
+            *args: Argumentos adicionales de la función.
+            timeout (Optional[float]): Tiempo máximo en segundos para todos los grupos. Por defecto, el del pool.
+
+        Returns:
+            List[Any]: Resultado de cada grupo, en el mismo orden que `column_groups`.
+
+        Raises:
+            ProfilingTimeoutError: Si los grupos no terminan dentro del tiempo máximo.
+        """
+        timeout = timeout or self.timeout
+        ipc_path = os.path.join(self.handoff_dir, f"dataprofiler_{uuid.uuid4().hex}.arrow")
+        try:
+            try:
+                write_ipc(df, ipc_path)
+            except pa.ArrowException as e:
+                logger.warning("No se pudo convertir el DataFrame a Arrow ({}); "
+                               "se perfilan los grupos en el proceso actual.", e)
+                return [func(df[columns], *args) for columns in column_groups]
+
+            return self._execute_many([(_run_from_ipc_columns, (func, ipc_path, columns, *args))
+                                       for columns in column_groups], timeout)
+        finally:
+            if os.path.exists(ipc_path):
+                os.remove(ipc_path)
+
+    def warm_up(self, func: Callable[[], Any], timeout: Optional[float] = None) -> List[Any]:
+        """
+        Inicia los procesos del pool y ejecuta `func()` una vez por proceso antes de recibir tareas.
+
+        Las tareas se ejecutan a la vez y cada una ocupa un proceso distinto mientras dura.
+
+        Args:
+            func (Callable): Función a nivel de módulo sin argumentos.
+            timeout (Optional[float]): Tiempo máximo en segundos. Por defecto, el del pool.
+
+        Returns:
+            List[Any]: Resultado de cada ejecución.
+
+        Raises:
+            ProfilingTimeoutError: Si el calentamiento supera el tiempo máximo.
+        """
+        return self._execute_many([(func, ())] * self.max_workers, timeout or self.timeout)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Detiene el pool de procesos.
+
+        Los procesos libres se detienen de inmediato y los ocupados al terminar su tarea.
+
+        Args:
+            wait (bool): Si es True, espera a que terminen las tareas en curso.
+        """
+        if wait:
+            for _ in range(self.max_workers):
+                self._slots.acquire()
+        with self._lock:
+            workers, self._idle = self._idle, []
+            self._generation += 1
+        if wait:
+            for _ in range(self.max_workers):
+                self._slots.release()
+        for worker in workers:
+            worker.stop()
+        logger.info("Pool de perfilado detenido.")
+
+
+_profiling_pool: Optional[ProfilingPool] = None
+_profiling_pool_lock = threading.Lock()
+
+
+def get_profiling_pool() -> Optional[ProfilingPool]:
+    """
+    Devuelve el pool de perfilado compartido del proceso, o None si está desactivado.
+
+    Returns:
+        Optional[ProfilingPool]: Pool configurado con `PROFILING_POOL_SIZE` procesos.
+    """
+    global _profiling_pool
+    if PROFILING_POOL_SIZE <= 0:
+        return None
+    with _profiling_pool_lock:
+        if _profiling_pool is None:
+            _profiling_pool = ProfilingPool()
+    return _profiling_pool
+
+
+_wide_pool: Optional[ProfilingPool] = None
+
+
+def get_column_group_pool() -> ProfilingPool:
+    """
+    Devuelve el pool usado para perfilar grupos de columnas de tablas anchas.
+
+    Es el pool general si está activo; si no, un pool propio de `WIDE_PROFILING_WORKERS` procesos.
+
+    Returns:
+        ProfilingPool: Pool de procesos.
+    """
+    global _wide_pool
+    profiling_pool = get_profiling_pool()
+    if profiling_pool is not None:
+        return profiling_pool
+    with _profiling_pool_lock:
+        if _wide_pool is None:
+            _wide_pool = ProfilingPool(max_workers=WIDE_PROFILING_WORKERS)
+    return _wide_pool
+
+
+def shutdown_profiling_pool() -> None:
+    """Detiene los pools compartidos que hayan sido creados."""
+    for pool in (_profiling_pool, _wide_pool):
+        if pool is not None:
+            pool.shutdown(wait=False)
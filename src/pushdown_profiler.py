@@ -0,0 +1,246 @@
+from typing import Dict, Any, List
+import os
+import pandas as pd
+from common import as_subquery
+from column_stats import SUMMARY_COLUMNS, KIND_TO_TYPE, normalize_series, infer_kind
+from db_manager import SQLProcessor
+from logger_config import get_logger, get_sampled_logger
+
+# Configuración de logs
+logger = get_logger()
+# Mensajes por lote de columnas, muestreados según LOG_SAMPLE_EVERY
+sampled_logger = get_sampled_logger()
+
+PUSHDOWN_SAMPLE_ROWS = int(os.environ.get('PUSHDOWN_SAMPLE_ROWS', 1000))
+PUSHDOWN_COLUMNS_PER_QUERY = int(os.environ.get('PUSHDOWN_COLUMNS_PER_QUERY', 50))
+
+# Particularidades de SQL de cada motor soportado por `DatabaseConfig`
+DIALECTS: Dict[str, Dict[str, str]] = {
+    "postgresql": {"quote": '"{}"', "float": "CAST({} AS DOUBLE PRECISION)", "stddev": "STDDEV_SAMP"},
+    "redshift": {"quote": '"{}"', "float": "CAST({} AS DOUBLE PRECISION)", "stddev": "STDDEV_SAMP"},
+    "mysql": {"quote": "`{}`", "float": "({} * 1.0)", "stddev": "STDDEV_SAMP"},
+    "sqlserver": {"quote": "[{}]", "float": "CAST({} AS FLOAT)", "stddev": "STDEV"},
+    "oracle": {"quote": '"{}"', "float": "CAST({} AS BINARY_DOUBLE)", "stddev": "STDDEV"},
+}
+
+
+def quote_identifier(name: str, db_type: str) -> str:
+    """
+    Cita un nombre de columna según el motor.
+
+    En Oracle, SQLAlchemy devuelve en minúsculas los nombres que en la base están en mayúsculas,
+    por lo que se vuelven a convertir antes de citarlos.
+
+    Args:
+        name (str): Nombre de la columna.
+        db_type (str): Tipo de base de datos.
+
+    Returns:
+        str: Identificador citado.
+    """
+    if db_type == "oracle" and name == name.lower():
+        name = name.upper()
+    return DIALECTS[db_type]["quote"].format(name)
+
+
+def limit_query(sql: str, n_rows: int, db_type: str) -> str:
+    """
+    Genera una consulta que devuelve como máximo `n_rows` filas de la consulta original.
+
+    Args:
+        sql (str): Consulta SQL original.
+        n_rows (int): Número máximo de filas.
+        db_type (str): Tipo de base de datos.
+
+    Returns:
+        str: Consulta limitada.
+    """
+    subquery = as_subquery(sql)
+    if db_type == "sqlserver":
+        return f"SELECT TOP {n_rows} * FROM {subquery}"
+    if db_type == "oracle":
+        return f"SELECT * FROM {subquery} FETCH FIRST {n_rows} ROWS ONLY"
+    return f"SELECT * FROM {subquery} LIMIT {n_rows}"
+
+
+class PushdownProfiler:
+    """
+    Perfilador que calcula las estadísticas de cada columna dentro de la base de datos.
+
+    La consulta del usuario se envuelve en consultas de agregación generadas según el motor,
+    de modo que solo viajan por la red una fila de resultados por lote de columnas, una muestra
+    para inferir tipos y, opcionalmente, los histogramas.
+    """
+
+    def __init__(self, sqlprocessor: SQLProcessor, sample_rows: int = PUSHDOWN_SAMPLE_ROWS,
+                 columns_per_query: int = PUSHDOWN_COLUMNS_PER_QUERY):
+        """
+        Inicializa el perfilador.
+
+        Args:
+            sqlprocessor (SQLProcessor): Procesador conectado a la base de datos.
+            sample_rows (int): Filas de muestra usadas para inferir el tipo de cada columna.
+            columns_per_query (int): Columnas agregadas por consulta (limita el tamaño de cada SELECT).
+        """
+        self.sqlprocessor = sqlprocessor
+        self.db_type = sqlprocessor.config.db_type
+        self.dialect = DIALECTS[self.db_type]
+        self.sample_rows = sample_rows
+        self.columns_per_query = columns_per_query
+
+    def profile(self, sql: str, histogram_bins: int = 0) -> Dict[str, Any]:
+        """
+        Perfila una consulta SQL con agregaciones en la base de datos.
+
+        Args:
+            sql (str): Consulta SQL del usuario.
+            histogram_bins (int): Número de intervalos de los histogramas numéricos (0 para omitirlos).
+
+        Returns:
+            Dict[str, Any]: Reporte con secciones `table`, `variables` y `sample`.
+        """
+        logger.info("Obteniendo muestra de {} filas para inferir tipos...", self.sample_rows)
+        sample = self.sqlprocessor.fetch_data(limit_query(sql, self.sample_rows, self.db_type))
+        kinds = {column: self._infer_column_kind(sample[column]) for column in sample.columns}
+
+        columns = list(kinds)
+        variables: Dict[str, Dict[str, Any]] = {}
+        n_rows = 0
+        for start in range(0, len(columns), self.columns_per_query):
+            batch = columns[start:start + self.columns_per_query]
+            sampled_logger.info("Calculando agregados de las columnas {}-{} de {}...", start + 1, start + len(batch), len(columns))
+            row = self._fetch_aggregates(sql, batch, kinds, start)
+            n_rows = int(row["n_rows"])
+            for index, column in enumerate(batch, start=start):
+                variables[column] = self._build_summary(row, index, kinds[column], n_rows)
+
+        if histogram_bins > 0:
+            for column, kind in kinds.items():
+                if kind == "numeric" and variables[column]["min"] is not None:
+                    variables[column]["histogram"] = self._fetch_histogram(sql, column, variables[column], histogram_bins)
+
+        n_cells_missing = sum(summary["n_missing"] for summary in variables.values())
+        n_cells = n_rows * len(columns)
+        table = {
+            "n": n_rows,
+            "n_var": len(columns),
+            "n_cells_missing": n_cells_missing,
+            "n_vars_with_missing": sum(1 for summary in variables.values() if summary["n_missing"]),
+            "n_vars_all_missing": sum(1 for summary in variables.values() if n_rows and summary["n_missing"] == n_rows),
+            "p_cells_missing": n_cells_missing / n_cells if n_cells else 0.0,
+        }
+        return {"table": table, "variables": variables, "sample": sample.head(10).to_dict(orient="records")}
+
+    @staticmethod
+    def _infer_column_kind(series: pd.Series) -> str:
+        """Infiere el tipo de una columna a partir de la muestra."""
+        non_null = normalize_series(series).dropna()
+        return infer_kind(non_null) if not non_null.empty else "categorical"
+
+    def _fetch_aggregates(self, sql: str, columns: List[str], kinds: Dict[str, str], start: int) -> Dict[str, Any]:
+        """Ejecuta una consulta de agregación para un lote de columnas y devuelve su única fila."""
+        expressions = ["COUNT(*) AS n_rows"]
+        for index, column in enumerate(columns, start=start):
+            expressions.extend(self._column_expressions(column, index, kinds[column]))
+
+        query = f"SELECT {', '.join(expressions)} FROM {as_subquery(sql)}"
+        result = self.sqlprocessor.fetch_data(query)
+        # Oracle devuelve los alias en mayúsculas
+        return {str(key).lower(): value for key, value in result.iloc[0].items()}
+
+    def _column_expressions(self, column: str, index: int, kind: str) -> List[str]:
+        """Genera las expresiones de agregación de una columna según su tipo."""
+        col = quote_identifier(column, self.db_type)
+        alias = f"c{index}"
+        expressions = [
+            f"COUNT({col}) AS {alias}_count",
+            f"COUNT(DISTINCT {col}) AS {alias}_distinct",
+        ]
+        if kind in ("numeric", "datetime"):
+            expressions += [f"MIN({col}) AS {alias}_min", f"MAX({col}) AS {alias}_max"]
+        if kind == "numeric":
+            as_float = self.dialect["float"].format(col)
+            expressions += [
+                f"SUM({as_float}) AS {alias}_sum",
+                f"AVG({as_float}) AS {alias}_mean",
+                f"{self.dialect['stddev']}({as_float}) AS {alias}_std",
+                f"SUM(CASE WHEN {col} = 0 THEN 1 ELSE 0 END) AS {alias}_zeros",
+                f"SUM(CASE WHEN {col} < 0 THEN 1 ELSE 0 END) AS {alias}_negative",
+            ]
+        return expressions
+
+    @staticmethod
+    def _build_summary(row: Dict[str, Any], index: int, kind: str, n_rows: int) -> Dict[str, Any]:
+        """Convierte los agregados de una columna al formato del CSV de `run_profiling`."""
+        alias = f"c{index}"
+        count = int(row[f"{alias}_count"])
+        n_distinct = int(row[f"{alias}_distinct"])
+        n_missing = n_rows - count
+        summary: Dict[str, Any] = {key: None for key in SUMMARY_COLUMNS}
+        summary.update({
+            "type": KIND_TO_TYPE[kind],
+            "n": n_rows,
+            "count": count,
+            "n_missing": n_missing,
+            "p_missing": n_missing / n_rows if n_rows else 0.0,
+            "n_distinct": n_distinct,
+            "p_distinct": n_distinct / count if count else 0.0,
+            "is_unique": n_distinct == count and count > 0,
+        })
+
+        if kind in ("numeric", "datetime") and row[f"{alias}_min"] is not None:
+            summary["min"], summary["max"] = row[f"{alias}_min"], row[f"{alias}_max"]
+            summary["range"] = summary["max"] - summary["min"]
+
+        if kind == "numeric" and count:
+            to_float = lambda value: float(value) if value is not None and not pd.isna(value) else float("nan")
+            mean, std = to_float(row[f"{alias}_mean"]), to_float(row[f"{alias}_std"])
+            n_zeros, n_negative = int(row[f"{alias}_zeros"] or 0), int(row[f"{alias}_negative"] or 0)
+            summary.update({
+                "min": to_float(summary["min"]),
+                "max": to_float(summary["max"]),
+                "range": to_float(summary["range"]),
+                "mean": mean,
+                "std": std,
+                "variance": std ** 2,
+                "sum": to_float(row[f"{alias}_sum"]),
+                "cv": std / mean if mean else float("nan"),
+                "n_zeros": n_zeros,
+                "p_zeros": n_zeros / n_rows,
+                "n_negative": n_negative,
+                "p_negative": n_negative / n_rows,
+            })
+        return summary
+
+    def _fetch_histogram(self, sql: str, column: str, summary: Dict[str, Any], bins: int) -> Dict[str, List[Any]]:
+        """Calcula en la base de datos un histograma de `bins` intervalos de una columna numérica."""
+        col = quote_identifier(column, self.db_type)
+        as_float = self.dialect["float"].format(col)
+        low, high = summary["min"], summary["max"]
+        width = (high - low) / bins or 1.0
+        bucket = f"FLOOR(({as_float} - {low!r}) / {width!r})"
+        query = (f"SELECT {bucket} AS bucket, COUNT(*) AS n FROM {as_subquery(sql)} "
+                 f"WHERE {col} IS NOT NULL GROUP BY {bucket}")
+        result = self.sqlprocessor.fetch_data(query)
+        result.columns = [str(name).lower() for name in result.columns]
+
+        counts = [0] * bins
+        for bucket_index, n in zip(result["bucket"], result["n"]):
+            # El valor máximo cae en el intervalo `bins`; se agrega al último
+            counts[min(int(bucket_index), bins - 1)] += int(n)
+        return {"counts": counts, "bin_edges": [low + width * i for i in range(bins + 1)]}
+
+
+def report_to_frame(report: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Construye la tabla resumen de un reporte con el mismo formato que el CSV de `run_profiling`.
+
+    Args:
+        report (Dict[str, Any]): Reporte generado por `PushdownProfiler.profile`.
+
+    Returns:
+        pd.DataFrame: Una fila por variable.
+    """
+    rows = [{"variable": column, **{key: summary.get(key) for key in SUMMARY_COLUMNS}}
+            for column, summary in report["variables"].items()]
+    return pd.DataFrame(rows, columns=["variable", *SUMMARY_COLUMNS])
@@ -0,0 +1,248 @@
+from typing import Dict, Any, Optional, Tuple, Iterator
+from contextlib import contextmanager
+import json
+import os
+import re
+import threading
+from common import as_subquery
+from db_manager import SQLProcessor
+from pushdown_profiler import limit_query
+from logger_config import get_logger
+
+# Configuración de logs
+logger = get_logger()
+
+QUERY_GUARD_ENABLED = os.environ.get('QUERY_GUARD_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+# Memoria máxima estimada del DataFrame de una petición
+QUERY_MEMORY_BUDGET_MB = int(os.environ.get('QUERY_MEMORY_BUDGET_MB', 2048))
+# Memoria estimada de todos los DataFrames que se leen y perfilan a la vez en el proceso
+QUERY_MEMORY_POOL_MB = int(os.environ.get('QUERY_MEMORY_POOL_MB', 4096))
+# Acción si la estimación supera el presupuesto: 'reject', 'sample' o 'queue'
+QUERY_OVER_BUDGET_ACTION = os.environ.get('QUERY_OVER_BUDGET_ACTION', 'reject').lower()
+QUERY_QUEUE_TIMEOUT_SECONDS = float(os.environ.get('QUERY_QUEUE_TIMEOUT_SECONDS', 600))
+# Filas leídas para medir la memoria por fila en pandas
+QUERY_WIDTH_SAMPLE_ROWS = int(os.environ.get('QUERY_WIDTH_SAMPLE_ROWS', 1000))
+
+OVER_BUDGET_ACTIONS = ("reject", "sample", "queue")
+# Motores cuyo plan estimado da el número de filas sin ejecutar la consulta; el resto usa COUNT(*)
+EXPLAIN_DB_TYPES = ("postgresql", "redshift")
+# Predicado de muestreo aleatorio por fila de cada motor (`{fraction}` entre 0 y 1)
+SAMPLE_PREDICATES: Dict[str, str] = {
+    "postgresql": "RANDOM() < {fraction}",
+    "redshift": "RANDOM() < {fraction}",
+    "mysql": "RAND() < {fraction}",
+    # RAND() se evalúa una sola vez por consulta en SQL Server; NEWID() cambia en cada fila
+    "sqlserver": "(CAST(CHECKSUM(NEWID()) AS BIGINT) + 2147483648) / 4294967296.0 < {fraction}",
+    "oracle": "DBMS_RANDOM.VALUE < {fraction}",
+}
+
+
+class QueryBudgetExceededError(ValueError):
+    """Excepción lanzada cuando la memoria estimada del resultado supera el presupuesto y la acción es rechazar."""
+    pass
+
+
+class AdmissionTimeoutError(Exception):
+    """Excepción lanzada cuando una lectura no obtiene memoria del pool antes del tiempo máximo de espera."""
+    pass
+
+
+class MemoryAdmission:
+    """
+    Control de admisión por memoria para las lecturas completas del proceso.
+
+    Cada petición reserva la memoria estimada de su DataFrame antes de consultar la base y la libera
+    al terminar; si el pool no tiene espacio, la petición espera a que otras terminen.
+    """
+
+    def __init__(self, capacity_bytes: int):
+        """
+        Args:
+            capacity_bytes (int): Memoria total que se puede reservar a la vez.
+        """
+        self.capacity_bytes = capacity_bytes
+        self._reserved = 0
+        self._waiting = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def reserve(self, n_bytes: int, timeout: float = QUERY_QUEUE_TIMEOUT_SECONDS) -> Iterator[None]:
+        """
+        Reserva memoria del pool mientras dura el bloque.
+
+        Una reserva mayor que el pool se limita a su capacidad: espera a que el pool esté libre y se
+        ejecuta sola.
+
+        Args:
+            n_bytes (int): Memoria estimada.
+            timeout (float): Segundos máximos de espera.
+
+        Raises:
+            AdmissionTimeoutError: Si no hay espacio en el pool antes de `timeout`.
+        """
+        n_bytes = min(max(0, int(n_bytes)), self.capacity_bytes)
+        with self._condition:
+            self._waiting += 1
+            try:
+                admitted = self._condition.wait_for(lambda: self._reserved + n_bytes <= self.capacity_bytes, timeout)
+            finally:
+                self._waiting -= 1
+            if not admitted:
+                raise AdmissionTimeoutError(
+                    f"No hubo {n_bytes / 1024 ** 2:.0f} MB disponibles para la lectura tras {timeout:.0f} s de espera "
+                    f"({self._reserved / 1024 ** 2:.0f} de {self.capacity_bytes / 1024 ** 2:.0f} MB reservados)."
+                )
+            self._reserved += n_bytes
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._reserved -= n_bytes
+                self._condition.notify_all()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Devuelve el estado del pool.
+
+        Returns:
+            Dict[str, int]: Capacidad, memoria reservada y peticiones en espera.
+        """
+        with self._condition:
+            return {"capacity_bytes": self.capacity_bytes, "reserved_bytes": self._reserved, "waiting": self._waiting}
+
+
+def _explain_rows(sqlprocessor: SQLProcessor, sql: str) -> int:
+    """Filas estimadas por el planificador de PostgreSQL o Redshift, sin ejecutar la consulta."""
+    statement = f"SELECT * FROM {as_subquery(sql)}"
+    if sqlprocessor.config.db_type == "postgresql":
+        plan = sqlprocessor.fetch_data(f"EXPLAIN (FORMAT JSON) {statement}").iloc[0, 0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    for line in sqlprocessor.fetch_data(f"EXPLAIN {statement}").iloc[:, 0]:
+        match = re.search(r"rows=(\d+)", str(line))
+        if match:
+            return int(match.group(1))
+    raise ValueError("El plan de la consulta no incluye una estimación de filas.")
+
+
+def estimate_query(sqlprocessor: SQLProcessor, sql: str,
+                   width_sample_rows: int = QUERY_WIDTH_SAMPLE_ROWS) -> Dict[str, Any]:
+    """
+    Estima las filas y la memoria en pandas del resultado de una consulta sin leerlo completo.
+
+    La memoria por fila se mide leyendo las primeras `width_sample_rows` filas (incluye el costo de
+    los objetos de Python del texto). Si la muestra no se llena, el resultado es la muestra y la
+    estimación es exacta; si no, las filas se estiman con el plan (`EXPLAIN`) en PostgreSQL y Redshift
+    o con un `COUNT(*)` en la base de datos en los demás motores.
+
+    Args:
+        sqlprocessor (SQLProcessor): Procesador conectado a la base de datos.
+        sql (str): Consulta SQL.
+        width_sample_rows (int): Filas leídas para medir la memoria por fila.
+
+    Returns:
+        Dict[str, Any]: Método, filas estimadas, bytes por fila y bytes estimados.
+    """
+    db_type = sqlprocessor.config.db_type
+    sample = sqlprocessor.fetch_data(limit_query(sql, width_sample_rows, db_type))
+    bytes_per_row = int(sample.memory_usage(index=False, deep=True).sum() / len(sample)) if len(sample) else 0
+
+    if len(sample) < width_sample_rows:
+        method, rows = "sample", len(sample)
+    elif db_type in EXPLAIN_DB_TYPES:
+        method, rows = "explain", max(_explain_rows(sqlprocessor, sql), len(sample))
+    else:
+        method = "count"
+        rows = int(sqlprocessor.fetch_data(f"SELECT COUNT(*) AS n_rows FROM {as_subquery(sql)}").iloc[0, 0])
+    return {"method": method, "estimated_rows": rows, "bytes_per_row": bytes_per_row,
+            "estimated_bytes": rows * bytes_per_row}
+
+
+def sample_query(sql: str, fraction: float, max_rows: int, db_type: str) -> str:
+    """
+    Genera una consulta que devuelve una muestra aleatoria de la consulta original.
+
+    Cada fila se conserva con probabilidad `fraction` en una sola pasada en la base de datos, y el
+    resultado se limita a `max_rows` filas por si el número de filas estimado era menor que el real.
+    En motores sin predicado de muestreo se devuelven las primeras `max_rows` filas.
+
+    Args:
+        sql (str): Consulta SQL original.
+        fraction (float): Proporción de filas a conservar.
+        max_rows (int): Filas máximas de la muestra.
+        db_type (str): Tipo de base de datos.
+
+    Returns:
+        str: Consulta muestreada.
+    """
+    predicate = SAMPLE_PREDICATES.get(db_type)
+    if predicate is not None and fraction < 1:
+        # Notación científica si hace falta, para que una fracción pequeña no se redondee a 0
+        sql = f"SELECT * FROM {as_subquery(sql)} WHERE {predicate.format(fraction=f'{fraction:.8g}')}"
+    return limit_query(sql, max_rows, db_type)
+
+
+def guard_query(sqlprocessor: SQLProcessor, sql: str, action: Optional[str] = None,
+                budget_bytes: int = QUERY_MEMORY_BUDGET_MB * 1024 ** 2,
+                pool_bytes: int = QUERY_MEMORY_POOL_MB * 1024 ** 2) -> Tuple[str, Dict[str, Any]]:
+    """
+    Decide cómo leer una consulta según la memoria estimada de su resultado.
+
+    Si la estimación no supera `budget_bytes` se lee completa. Si lo supera, según `action`:
+    - 'reject': se rechaza la petición.
+    - 'sample': se lee una muestra aleatoria de las filas que caben en el presupuesto.
+    - 'queue': se lee completa cuando haya memoria libre en el pool del proceso (si cabe en él;
+      si no, se rechaza).
+
+    Args:
+        sqlprocessor (SQLProcessor): Procesador conectado a la base de datos.
+        sql (str): Consulta SQL.
+        action (Optional[str]): Acción si se supera el presupuesto (por defecto `QUERY_OVER_BUDGET_ACTION`).
+        budget_bytes (int): Memoria máxima estimada del DataFrame de la petición.
+        pool_bytes (int): Memoria total del pool de admisión.
+
+    Returns:
+        Tuple[str, Dict[str, Any]]: Consulta a ejecutar y decisión (estimación, presupuesto, acción
+            aplicada y memoria a reservar en el pool).
+
+    Raises:
+        QueryBudgetExceededError: Si la estimación supera el presupuesto y se debe rechazar.
+        ValueError: Si la acción no es válida.
+    """
+    action = (action or QUERY_OVER_BUDGET_ACTION).lower()
+    if action not in OVER_BUDGET_ACTIONS:
+        raise ValueError(f"Acción '{action}' no soportada. Acciones válidas: {OVER_BUDGET_ACTIONS}")
+
+    estimate = estimate_query(sqlprocessor, sql)
+    decision: Dict[str, Any] = {**estimate, "budget_bytes": budget_bytes, "action": "none",
+                                "reserved_bytes": estimate["estimated_bytes"]}
+    estimated_mb = estimate["estimated_bytes"] / 1024 ** 2
+    if estimate["estimated_bytes"] <= budget_bytes:
+        logger.info("Consulta dentro del presupuesto: ~{} filas, ~{:.0f} MB "
+                    "(estimación '{}').", estimate['estimated_rows'], estimated_mb, estimate['method'])
+        return sql, decision
+
+    over_budget = (f"El resultado estimado de la consulta (~{estimate['estimated_rows']} filas, ~{estimated_mb:.0f} MB "
+                   f"en memoria, estimación '{estimate['method']}') supera el presupuesto de "
+                   f"{budget_bytes / 1024 ** 2:.0f} MB")
+    if action == "reject" or (action == "queue" and estimate["estimated_bytes"] > pool_bytes):
+        raise QueryBudgetExceededError(f"{over_budget}. Use el modo 'streaming' o 'pushdown', o "
+                                       f"\"over_budget\": \"sample\" para perfilar una muestra.")
+
+    if action == "queue":
+        logger.warning("{}; se espera memoria libre en el pool para leerla completa.", over_budget)
+        decision["action"] = "queue"
+        return sql, decision
+
+    sample_rows = max(1, budget_bytes // max(1, estimate["bytes_per_row"]))
+    fraction = min(1.0, sample_rows / estimate["estimated_rows"])
+    logger.warning("{}; se perfila una muestra aleatoria de hasta {} filas "
+                   "({:.2%} de las filas).", over_budget, sample_rows, fraction)
+    decision.update(action="sample", sample_rows=sample_rows, sample_fraction=round(fraction, 6),
+                    reserved_bytes=sample_rows * estimate["bytes_per_row"])
+    return sample_query(sql, fraction, sample_rows, sqlprocessor.config.db_type), decision
+
+
+# Pool de memoria compartido por todas las peticiones del proceso
+memory_admission = MemoryAdmission(QUERY_MEMORY_POOL_MB * 1024 ** 2)
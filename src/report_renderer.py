@@ -0,0 +1,149 @@
+from typing import Dict, Any, List, Sequence
+from dataclasses import asdict, is_dataclass
+import json
+import numpy as np
+import pandas as pd
+from profile_tiers import tier_settings
+from column_stats import ProfileAccumulator, APPROXIMATE_ALL
+from logger_config import get_logger
+
+# Configuración de logs
+logger = get_logger()
+
+OUTPUT_FORMATS = ("html", "json", "csv")
+# Claves de cada variable que no se incluyen en el CSV resumen
+VARS_TO_OMIT: List[str] = ["value_counts_without_nan", "value_counts_index_sorted", "histogram",
+                           "top_values", "top_values_exact", "error_bounds"]
+
+
+def encode_description(value: Any) -> Any:
+    """
+    Convierte la descripción de ydata-profiling a tipos nativos de Python.
+
+    Replica la codificación que usa `ProfileReport.to_json` y la conversión de claves de `json.dumps`,
+    para que el JSON y el CSV generados desde memoria sean idénticos a los que se obtenían leyendo
+    el archivo JSON.
+
+    Args:
+        value (Any): Descripción o parte de ella.
+
+    Returns:
+        Any: Valor serializable a JSON.
+    """
+    if is_dataclass(value):
+        value = asdict(value)
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, dict):
+        # Las claves quedan como en el JSON: los números y booleanos pasan a texto
+        encoded = {}
+        for key, item in value.items():
+            key = encode_description(key)
+            encoded[key if isinstance(key, str) else json.dumps(key)] = encode_description(item)
+        return encoded
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, list):
+        return [encode_description(v) for v in value]
+    if isinstance(value, set):
+        return {encode_description(v) for v in value}
+    if isinstance(value, pd.Series):
+        return encode_description(value.to_list())
+    if isinstance(value, pd.DataFrame):
+        return encode_description(value.to_dict(orient="records"))
+    if isinstance(value, np.ndarray):
+        return encode_description(value.tolist())
+    # Importación diferida: ydata-profiling tarda segundos en cargarse y solo se necesita al perfilar
+    from ydata_profiling.model.sample import Sample
+    if isinstance(value, Sample):
+        return encode_description(value.dict())
+    return str(value)
+
+
+def summary_from_variables(variables: Dict[str, Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Construye la tabla resumen (una fila por variable) directamente desde la descripción.
+
+    Args:
+        variables (Dict[str, Dict[str, Any]]): Sección `variables` de la descripción codificada.
+
+    Returns:
+        pd.DataFrame: Tabla con la columna `variable` y una columna por estadística.
+    """
+    consolidated_data = {
+        name: {key: value for key, value in stats.items() if key not in VARS_TO_OMIT}
+        for name, stats in variables.items()
+    }
+    return pd.DataFrame(consolidated_data).T.reset_index().rename(columns={"index": "variable"})
+
+
+def approximate_description(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Calcula con estimadores aproximados (HyperLogLog, KLL y Misra-Gries) la descripción de las columnas.
+
+    Args:
+        df (pd.DataFrame): Columnas a perfilar.
+
+    Returns:
+        Dict[str, Any]: Reporte con secciones `table` y `variables`, como el de `ProfileAccumulator`.
+    """
+    accumulator = ProfileAccumulator(approximate_columns=[APPROXIMATE_ALL])
+    accumulator.update(df)
+    return accumulator.to_report()
+
+
+def render_profile(df: pd.DataFrame, title: str, outputs: Sequence[str] = OUTPUT_FORMATS,
+                   tier: str = "full", approximate_columns: Sequence[str] = ()) -> Dict[str, str]:
+    """
+    Calcula la descripción del DataFrame una sola vez y genera en memoria los formatos solicitados.
+
+    Las columnas de `approximate_columns` no pasan por ydata-profiling: se resumen con estimadores
+    aproximados y se agregan a la sección `variables` del JSON y al CSV en el orden original. El HTML
+    solo incluye las columnas exactas.
+
+    Se define a nivel de módulo para poder ejecutarse en los procesos del pool de perfilado.
+
+    Args:
+        df (pd.DataFrame): DataFrame a ser perfilado.
+        title (str): Título del reporte.
+        outputs (Sequence[str]): Formatos a generar ('html', 'json', 'csv').
+        tier (str): Nivel de perfilado ('minimal', 'standard' o 'full').
+        approximate_columns (Sequence[str]): Columnas con estadísticas aproximadas (`*` para todas).
+
+    Returns:
+        Dict[str, str]: Formato -> contenido generado.
+    """
+    from ydata_profiling import ProfileReport
+    from ydata_profiling.model.summarizer import format_summary, redact_summary
+
+    approximate = [column for column in df.columns
+                   if APPROXIMATE_ALL in approximate_columns or column in approximate_columns]
+    exact_df = df.drop(columns=approximate) if approximate else df
+    profile = ProfileReport(exact_df, title=title, config=tier_settings(tier)) if len(exact_df.columns) else None
+    rendered: Dict[str, str] = {}
+
+    if "json" in outputs or "csv" in outputs:
+        if profile is not None:
+            description = encode_description(format_summary(profile.get_description()))
+            description = redact_summary(description, profile.config)
+        else:
+            description = {"table": {}, "variables": {}}
+        if approximate:
+            approximated = approximate_description(df[approximate])
+            variables = {**description["variables"], **approximated["variables"]}
+            description["variables"] = {column: variables[column] for column in df.columns}
+            table = description["table"]
+            for key in ("n_cells_missing", "n_vars_with_missing", "n_vars_all_missing"):
+                table[key] = table.get(key, 0) + approximated["table"][key]
+            table.update({"n": len(df), "n_var": len(df.columns), "approximate_columns": approximate,
+                          "p_cells_missing": table["n_cells_missing"] / df.size if df.size else 0.0})
+        if "json" in outputs:
+            rendered["json"] = json.dumps(description, indent=4)
+        if "csv" in outputs:
+            rendered["csv"] = summary_from_variables(description["variables"]).to_csv(index=False)
+
+    if "html" in outputs and profile is not None:
+        rendered["html"] = profile.to_html()
+
+    logger.info("Reporte '{}' generado en los formatos: {}.", title, list(rendered))
+    return rendered
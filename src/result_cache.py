@@ -0,0 +1,192 @@
+from typing import Dict, Any, Optional, List
+from datetime import datetime, timedelta
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from pydantic import BaseModel, Field
+from logger_config import get_logger
+
+# Configuración de logs
+logger = get_logger()
+
+APPMAINPATH = os.environ.get('APPMAINPATH')
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get('RESULT_CACHE_MAX_ENTRIES', 1000))
+RESULT_CACHE_MAX_AGE_SECONDS = int(os.environ.get('RESULT_CACHE_MAX_AGE_SECONDS', 86_400))
+
+
+class CacheEntry(BaseModel):
+    """
+    Resultado de un perfilado ya subido a S3, asociado a la huella de los datos con que se generó.
+    """
+
+    key: str = Field(..., description="Clave de la entrada (hash de la consulta, el perfil y las opciones)")
+    profile_name: str = Field(..., description="Nombre del perfil")
+    sql_hash: str = Field(..., description="Hash SHA-256 del texto de la consulta SQL")
+    fingerprint: str = Field(..., description="Huella de los datos (filas y valor máximo de la columna de huella)")
+    columns: List[str] = Field(default_factory=list, description="Columnas perfiladas")
+    rows: int = Field(0, description="Filas perfiladas")
+    profiling_message: Dict[str, Any] = Field(..., description="Rutas en S3 de los archivos generados")
+    profile_tier: Optional[Dict[str, Any]] = Field(None, description="Nivel de perfilado con que se generó (modo 'full')")
+    created_at: datetime = Field(default_factory=datetime.now, description="Fecha del perfilado")
+    last_hit_at: Optional[datetime] = Field(None, description="Fecha del último acierto")
+    hits: int = Field(0, description="Veces que se reutilizó el resultado")
+
+
+def cache_key(sql_hash: str, profile_name: str, options: Dict[str, Any]) -> str:
+    """
+    Calcula la clave de caché de un perfilado.
+
+    Args:
+        sql_hash (str): Hash del texto de la consulta SQL.
+        profile_name (str): Nombre del perfil.
+        options (Dict[str, Any]): Opciones que cambian el resultado (modo, formatos, etc.).
+
+    Returns:
+        str: Hash SHA-256 en hexadecimal.
+    """
+    payload = json.dumps({"sql_hash": sql_hash, "profile_name": profile_name, "options": options},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Caché de resultados de perfilado con un índice JSON en disco.
+
+    Una entrada se reutiliza solo si la huella actual de los datos coincide con la guardada. Las entradas
+    expiran por antigüedad y, si se supera el máximo, se descartan las usadas hace más tiempo.
+    """
+
+    def __init__(self, index_path: str, max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+                 max_age_seconds: int = RESULT_CACHE_MAX_AGE_SECONDS):
+        """
+        Inicializa la caché y carga el índice si existe.
+
+        Args:
+            index_path (str): Ruta del archivo JSON del índice.
+            max_entries (int): Número máximo de entradas (0 desactiva la caché).
+            max_age_seconds (int): Antigüedad máxima de una entrada en segundos.
+        """
+        self.index_path = Path(index_path)
+        self.max_entries = max_entries
+        self.max_age = timedelta(seconds=max_age_seconds)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, CacheEntry] = self._load()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Indica si la caché está activa."""
+        return self.max_entries > 0
+
+    def _load(self) -> Dict[str, CacheEntry]:
+        """Lee el índice desde disco; un índice ilegible se descarta."""
+        if not self.index_path.exists():
+            return {}
+        try:
+            with open(self.index_path, "r") as f:
+                return {key: CacheEntry(**entry) for key, entry in json.load(f).items()}
+        except Exception as e:
+            logger.warning("No se pudo leer el índice de la caché de resultados, se descarta: {}", e)
+            return {}
+
+    def _save(self) -> None:
+        """Escribe el índice en disco de forma atómica. Debe llamarse con el lock tomado."""
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({key: entry.model_dump(mode="json") for key, entry in self._entries.items()}, f, indent=4)
+        os.replace(tmp_path, self.index_path)
+
+    def _evict(self) -> int:
+        """Elimina las entradas expiradas y las menos usadas sobre el máximo. Debe llamarse con el lock tomado."""
+        now = datetime.now()
+        expired = [key for key, entry in self._entries.items() if now - entry.created_at > self.max_age]
+        for key in expired:
+            del self._entries[key]
+
+        overflow = len(self._entries) - self.max_entries
+        if overflow > 0:
+            by_last_use = sorted(self._entries.values(), key=lambda entry: entry.last_hit_at or entry.created_at)
+            for entry in by_last_use[:overflow]:
+                del self._entries[entry.key]
+        return len(expired) + max(overflow, 0)
+
+    def get(self, key: str, fingerprint: str) -> Optional[CacheEntry]:
+        """
+        Busca un resultado vigente cuya huella coincida con la actual.
+
+        Args:
+            key (str): Clave de la entrada.
+            fingerprint (str): Huella actual de los datos.
+
+        Returns:
+            Optional[CacheEntry]: Entrada reutilizable, o None si no existe, expiró o los datos cambiaron.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.fingerprint != fingerprint or datetime.now() - entry.created_at > self.max_age:
+                self.misses += 1
+                return None
+
+            entry.hits += 1
+            entry.last_hit_at = datetime.now()
+            self.hits += 1
+            self._save()
+            logger.info("Resultado en caché reutilizado para {} (huella {}).", entry.profile_name, fingerprint)
+            return entry.model_copy()
+
+    def put(self, entry: CacheEntry) -> None:
+        """
+        Guarda o reemplaza un resultado y aplica la política de expulsión.
+
+        Args:
+            entry (CacheEntry): Entrada a guardar.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[entry.key] = entry
+            evicted = self._evict()
+            self._save()
+        logger.info("Resultado de {} guardado en caché (huella {}, "
+                    "{} entradas expulsadas).", entry.profile_name, entry.fingerprint, evicted)
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """
+        Elimina una entrada (o todas) de la caché.
+
+        Args:
+            key (Optional[str]): Clave de la entrada. Si es None, se vacía la caché.
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+            self._save()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Devuelve los contadores de la caché.
+
+        Returns:
+            Dict[str, Any]: Aciertos, fallos, entradas y límites configurados.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "max_age_seconds": int(self.max_age.total_seconds()),
+            }
+
+
+# Caché compartida por todas las peticiones del proceso
+result_cache = ResultCache(f"{APPMAINPATH}/result_cache/index.json")
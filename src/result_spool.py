@@ -0,0 +1,258 @@
+from typing import Dict, Any, Optional
+from datetime import datetime, timedelta
+import hashlib
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+from pydantic import BaseModel, Field
+from arrow_io import write_ipc, read_ipc
+from logger_config import get_logger
+
+# Configuración de logs
+logger = get_logger()
+
+APPMAINPATH = os.environ.get('APPMAINPATH')
+SPOOL_DIR = os.environ.get('SPOOL_DIR', f"{APPMAINPATH}/spool")
+SPOOL_TTL_SECONDS = int(os.environ.get('SPOOL_TTL_SECONDS', 3600))
+# 0 desactiva el spool
+SPOOL_MAX_MB = int(os.environ.get('SPOOL_MAX_MB', 10_240))
+
+
+class SpoolEntry(BaseModel):
+    """
+    Resultado de una consulta guardado en un archivo Arrow IPC local.
+    """
+
+    key: str = Field(..., description="Clave de la entrada (hash de la consulta, el origen y el modo de lectura)")
+    sql_hash: str = Field(..., description="Hash SHA-256 del texto de la consulta SQL")
+    datasource: str = Field(..., description="Origen de datos (motor, servidor, puerto, base y usuario)")
+    fetch_backend: str = Field(..., description="Modo de lectura con que se obtuvo el resultado")
+    path: str = Field(..., description="Ruta del archivo Arrow IPC")
+    rows: int = Field(0, description="Filas del resultado")
+    size_bytes: int = Field(0, description="Tamaño del archivo")
+    attrs: Dict[str, Any] = Field(default_factory=dict, description="Atributos del DataFrame (`df.attrs`)")
+    created_at: datetime = Field(default_factory=datetime.now, description="Fecha de la lectura en la base de datos")
+    last_used_at: Optional[datetime] = Field(None, description="Fecha del último uso")
+    hits: int = Field(0, description="Veces que se reutilizó el resultado")
+
+
+def datasource_id(config: Any) -> str:
+    """
+    Identifica el origen de datos de una conexión sin incluir la contraseña.
+
+    Args:
+        config (DatabaseConfig): Configuración de la base de datos.
+
+    Returns:
+        str: Identificador `motor://usuario@servidor:puerto/base`.
+    """
+    return f"{config.db_type}://{config.user}@{config.host}:{config.port}/{config.database}"
+
+
+def spool_key(sql_hash: str, datasource: str, fetch_backend: str) -> str:
+    """
+    Calcula la clave de una entrada del spool.
+
+    Args:
+        sql_hash (str): Hash del texto de la consulta SQL.
+        datasource (str): Identificador del origen de datos.
+        fetch_backend (str): Modo de lectura (los tipos del DataFrame dependen de él).
+
+    Returns:
+        str: Hash SHA-256 en hexadecimal.
+    """
+    payload = json.dumps({"sql_hash": sql_hash, "datasource": datasource, "fetch_backend": fetch_backend}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultSpool:
+    """
+    Spool local de resultados de consultas en archivos Arrow IPC, con un índice JSON en disco.
+
+    Las lecturas siguientes de la misma consulta sobre el mismo origen se sirven mediante memory-mapping
+    del archivo, sin volver a consultar la base de datos. Las entradas expiran por antigüedad y, si se
+    supera la cuota de disco, se eliminan las usadas hace más tiempo.
+    """
+
+    def __init__(self, spool_dir: str, ttl_seconds: int = SPOOL_TTL_SECONDS, max_mb: int = SPOOL_MAX_MB):
+        """
+        Inicializa el spool y carga el índice si existe.
+
+        Args:
+            spool_dir (str): Directorio de los archivos y del índice.
+            ttl_seconds (int): Antigüedad máxima de una entrada en segundos.
+            max_mb (int): Cuota de disco en MB (0 desactiva el spool).
+        """
+        self.spool_dir = Path(spool_dir)
+        self.index_path = self.spool_dir / "index.json"
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.max_bytes = max_mb * 1024 ** 2
+        self._lock = threading.Lock()
+        self._entries: Dict[str, SpoolEntry] = self._load()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Indica si el spool está activo."""
+        return self.max_bytes > 0
+
+    def _load(self) -> Dict[str, SpoolEntry]:
+        """Lee el índice desde disco y descarta las entradas cuyo archivo ya no existe."""
+        if not self.index_path.exists():
+            return {}
+        try:
+            with open(self.index_path, "r") as f:
+                entries = {key: SpoolEntry(**entry) for key, entry in json.load(f).items()}
+            return {key: entry for key, entry in entries.items() if os.path.exists(entry.path)}
+        except Exception as e:
+            logger.warning("No se pudo leer el índice del spool de resultados, se descarta: {}", e)
+            return {}
+
+    def _save(self) -> None:
+        """Escribe el índice en disco de forma atómica. Debe llamarse con el lock tomado."""
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({key: entry.model_dump(mode="json") for key, entry in self._entries.items()}, f, indent=4)
+        os.replace(tmp_path, self.index_path)
+
+    def _remove(self, key: str) -> None:
+        """Elimina una entrada y su archivo. Debe llamarse con el lock tomado."""
+        entry = self._entries.pop(key, None)
+        if entry is not None and os.path.exists(entry.path):
+            os.remove(entry.path)
+
+    def _evict(self) -> int:
+        """Elimina las entradas expiradas y las menos usadas sobre la cuota. Debe llamarse con el lock tomado."""
+        now = datetime.now()
+        expired = [key for key, entry in self._entries.items() if now - entry.created_at > self.ttl]
+        for key in expired:
+            self._remove(key)
+
+        evicted = len(expired)
+        total = sum(entry.size_bytes for entry in self._entries.values())
+        by_last_use = sorted(self._entries.values(), key=lambda entry: entry.last_used_at or entry.created_at)
+        for entry in by_last_use:
+            if total <= self.max_bytes:
+                break
+            total -= entry.size_bytes
+            self._remove(entry.key)
+            evicted += 1
+        return evicted
+
+    def get(self, sql_hash: str, datasource: str, fetch_backend: str) -> Optional[pd.DataFrame]:
+        """
+        Busca un resultado vigente y lo lee mediante memory-mapping.
+
+        Args:
+            sql_hash (str): Hash del texto de la consulta SQL.
+            datasource (str): Identificador del origen de datos.
+            fetch_backend (str): Modo de lectura.
+
+        Returns:
+            Optional[pd.DataFrame]: DataFrame con `df.attrs["spool"]`, o None si no hay una entrada vigente.
+        """
+        if not self.enabled:
+            return None
+        key = spool_key(sql_hash, datasource, fetch_backend)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or datetime.now() - entry.created_at > self.ttl or not os.path.exists(entry.path):
+                self.misses += 1
+                return None
+            entry.hits += 1
+            entry.last_used_at = datetime.now()
+            self.hits += 1
+            self._save()
+            entry = entry.model_copy()
+
+        df = read_ipc(entry.path)
+        df.attrs.update(entry.attrs)
+        df.attrs["spool"] = {"hit": True, "key": key, "created_at": entry.created_at.isoformat(),
+                             "size_bytes": entry.size_bytes}
+        logger.info("Resultado leído desde el spool ({} filas, {} bytes, "
+                    "consultado el {}).", entry.rows, entry.size_bytes, entry.created_at.isoformat())
+        return df
+
+    def put(self, df: pd.DataFrame, sql_hash: str, datasource: str, fetch_backend: str) -> Optional[SpoolEntry]:
+        """
+        Guarda un resultado en el spool y aplica la política de expulsión.
+
+        Los resultados que no se pueden representar en Arrow o que superan la cuota no se guardan.
+
+        Args:
+            df (pd.DataFrame): Resultado de la consulta.
+            sql_hash (str): Hash del texto de la consulta SQL.
+            datasource (str): Identificador del origen de datos.
+            fetch_backend (str): Modo de lectura.
+
+        Returns:
+            Optional[SpoolEntry]: Entrada guardada, o None si no se guardó.
+        """
+        if not self.enabled:
+            return None
+        key = spool_key(sql_hash, datasource, fetch_backend)
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        # Nombre único: una lectura en curso de la versión anterior mantiene su archivo mapeado
+        path = str(self.spool_dir / f"{key}.{uuid.uuid4().hex[:8]}.arrow")
+        try:
+            size = write_ipc(df, path)
+        except pa.ArrowException as e:
+            logger.warning("No se pudo guardar el resultado en el spool ({}).", e)
+            if os.path.exists(path):
+                os.remove(path)
+            return None
+        if size > self.max_bytes:
+            logger.warning("El resultado ({} bytes) supera la cuota del spool; no se guarda.", size)
+            os.remove(path)
+            return None
+
+        attrs = {name: value for name, value in df.attrs.items() if name != "spool"}
+        entry = SpoolEntry(key=key, sql_hash=sql_hash, datasource=datasource, fetch_backend=fetch_backend,
+                           path=path, rows=len(df), size_bytes=size, attrs=attrs)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            evicted = self._evict()
+            self._save()
+        logger.info("Resultado guardado en el spool ({} filas, {} bytes, {} entradas expulsadas).",
+                    entry.rows, size, evicted)
+        return entry
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """
+        Elimina una entrada (o todas) del spool junto con sus archivos.
+
+        Args:
+            key (Optional[str]): Clave de la entrada. Si es None, se vacía el spool.
+        """
+        with self._lock:
+            for entry_key in ([key] if key is not None else list(self._entries)):
+                self._remove(entry_key)
+            self._save()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Devuelve los contadores del spool.
+
+        Returns:
+            Dict[str, Any]: Aciertos, fallos, entradas, bytes usados y límites configurados.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "size_bytes": sum(entry.size_bytes for entry in self._entries.values()),
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": int(self.ttl.total_seconds()),
+            }
+
+
+# Spool compartido por todas las peticiones del proceso
+result_spool = ResultSpool(SPOOL_DIR)
@@ -0,0 +1,234 @@
+from typing import Dict, Any, List, Sequence, Optional
+from datetime import datetime
+import html
+import json
+import os
+import numpy as np
+import pandas as pd
+from common import timed_stage
+from profiling_pool import get_column_group_pool
+from report_renderer import encode_description, summary_from_variables, OUTPUT_FORMATS
+from logger_config import get_logger
+
+# Configuración de logs
+logger = get_logger()
+
+WIDE_SHARD_COLUMNS = int(os.environ.get('WIDE_SHARD_COLUMNS', 50))
+WIDE_MISSING_PATTERNS = int(os.environ.get('WIDE_MISSING_PATTERNS', 10))
+
+# Cada grupo solo calcula las estadísticas por variable; los análisis entre columnas se hacen una
+# vez sobre el DataFrame completo en `cross_column_analysis`.
+SHARD_PROFILE_CONFIG: Dict[str, Any] = {
+    "correlations": {name: {"calculate": False} for name in ("auto", "pearson", "spearman", "kendall", "phi_k", "cramers")},
+    "missing_diagrams": {"bar": False, "matrix": False, "heatmap": False},
+    "interactions": {"continuous": False},
+    "duplicates": {"head": 0},
+    "samples": {"head": 0, "tail": 0, "random": 0},
+}
+# Estadísticas de la tabla que se suman entre grupos
+TABLE_SUM_KEYS = ("n_var", "n_cells_missing", "n_vars_with_missing", "n_vars_all_missing")
+
+
+def split_columns(columns: Sequence[str], shard_columns: int = WIDE_SHARD_COLUMNS) -> List[List[str]]:
+    """
+    Divide las columnas en grupos consecutivos de como máximo `shard_columns` columnas.
+
+    Args:
+        columns (Sequence[str]): Columnas del DataFrame.
+        shard_columns (int): Columnas por grupo.
+
+    Returns:
+        List[List[str]]: Grupos de columnas, en el orden original.
+    """
+    columns = list(columns)
+    return [columns[i:i + shard_columns] for i in range(0, len(columns), max(1, shard_columns))]
+
+
+def profile_column_group(df: pd.DataFrame, title: str) -> Dict[str, Any]:
+    """
+    Calcula con ydata-profiling las estadísticas por variable de un grupo de columnas.
+
+    Se define a nivel de módulo para poder ejecutarse en los procesos del pool de perfilado.
+
+    Args:
+        df (pd.DataFrame): Columnas del grupo.
+        title (str): Título del reporte.
+
+    Returns:
+        Dict[str, Any]: Secciones `analysis`, `package`, `table`, `variables` y `alerts` de la descripción codificada.
+    """
+    from ydata_profiling import ProfileReport
+    from ydata_profiling.model.summarizer import format_summary, redact_summary
+
+    profile = ProfileReport(df, title=title, progress_bar=False, **SHARD_PROFILE_CONFIG)
+    description = encode_description(format_summary(profile.get_description()))
+    description = redact_summary(description, profile.config)
+    return {key: description[key] for key in ("analysis", "package", "table", "variables", "alerts")}
+
+
+def _matrix_records(matrix: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convierte una matriz de correlación en registros con la columna `variable`."""
+    matrix = matrix.reset_index().rename(columns={"index": "variable"})
+    return encode_description(matrix.replace({np.nan: None}))
+
+
+def cross_column_analysis(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Calcula los análisis entre columnas sobre el DataFrame completo: correlaciones, patrones de
+    valores faltantes y filas duplicadas.
+
+    Args:
+        df (pd.DataFrame): DataFrame completo.
+
+    Returns:
+        Dict[str, Any]: Secciones `correlations`, `missing` y `duplicates`.
+    """
+    numeric = df.select_dtypes(include="number").astype("float64")
+    numeric = numeric.loc[:, numeric.nunique(dropna=True) > 1]
+    correlations: Dict[str, Any] = {}
+    if numeric.shape[1] > 1:
+        correlations["pearson"] = _matrix_records(numeric.corr(method="pearson"))
+        correlations["spearman"] = _matrix_records(numeric.corr(method="spearman"))
+
+    # Matriz de nulidad como bytes: una fila por registro, una columna por variable con faltantes
+    nullity = df.isna().to_numpy(dtype=np.uint8)
+    counts = nullity.sum(axis=0)
+    partial = [i for i, count in enumerate(counts) if 0 < count < len(df)]
+    missing: Dict[str, Any] = {
+        "counts": {column: int(count) for column, count in zip(df.columns, counts)},
+        "nullity_correlation": [],
+        "patterns": [],
+    }
+    if partial:
+        partial_nullity = nullity[:, partial]
+        partial_columns = [df.columns[i] for i in partial]
+        if len(partial) > 1:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                nullity_corr = np.corrcoef(partial_nullity, rowvar=False)
+            missing["nullity_correlation"] = _matrix_records(
+                pd.DataFrame(nullity_corr, index=partial_columns, columns=partial_columns)
+            )
+        packed = np.packbits(partial_nullity, axis=1)
+        _, first_rows, pattern_counts = np.unique(packed, axis=0, return_index=True, return_counts=True)
+        for position in np.argsort(-pattern_counts)[:WIDE_MISSING_PATTERNS]:
+            row = partial_nullity[first_rows[position]]
+            missing["patterns"].append({
+                "columns": [column for column, is_missing in zip(partial_columns, row) if is_missing],
+                "rows": int(pattern_counts[position]),
+            })
+
+    n_duplicates = int(pd.util.hash_pandas_object(df, index=False).duplicated().sum()) if len(df) else 0
+    return {
+        "correlations": correlations,
+        "missing": missing,
+        "duplicates": {"n_duplicates": n_duplicates, "p_duplicates": n_duplicates / len(df) if len(df) else 0.0},
+    }
+
+
+def merge_shards(shards: List[Dict[str, Any]], cross_column: Dict[str, Any], n_rows: int,
+                 memory_size: int) -> Dict[str, Any]:
+    """
+    Une las descripciones de los grupos de columnas en una sola descripción.
+
+    Args:
+        shards (List[Dict[str, Any]]): Resultados de `profile_column_group`, en el orden de las columnas.
+        cross_column (Dict[str, Any]): Resultado de `cross_column_analysis`.
+        n_rows (int): Filas del DataFrame.
+        memory_size (int): Memoria del DataFrame completo (cada grupo cuenta también el índice).
+
+    Returns:
+        Dict[str, Any]: Descripción con las secciones `analysis`, `table`, `variables`, `alerts`,
+        `correlations`, `missing` y `package`.
+    """
+    table: Dict[str, Any] = {"n": n_rows, **{key: 0 for key in TABLE_SUM_KEYS}, "memory_size": memory_size, "types": {}}
+    variables: Dict[str, Any] = {}
+    alerts: List[Any] = []
+    for shard in shards:
+        for key in TABLE_SUM_KEYS:
+            table[key] += shard["table"].get(key, 0)
+        for type_name, count in shard["table"].get("types", {}).items():
+            table["types"][type_name] = table["types"].get(type_name, 0) + count
+        variables.update(shard["variables"])
+        alerts.extend(shard["alerts"])
+
+    n_cells = n_rows * table["n_var"]
+    table["record_size"] = table["memory_size"] / n_rows if n_rows else 0
+    table["p_cells_missing"] = table["n_cells_missing"] / n_cells if n_cells else 0
+    table.update(cross_column["duplicates"])
+
+    analysis = dict(shards[0]["analysis"]) if shards else {}
+    analysis["date_end"] = str(datetime.now())
+    return {
+        "analysis": analysis,
+        "table": table,
+        "variables": variables,
+        "alerts": alerts,
+        "correlations": cross_column["correlations"],
+        "missing": cross_column["missing"],
+        "package": shards[0]["package"] if shards else {},
+    }
+
+
+def _render_html(description: Dict[str, Any], summary: pd.DataFrame, title: str) -> str:
+    """Genera un reporte HTML simple con las tablas de la descripción unida (el texto se escapa)."""
+    title = html.escape(title)
+    table = pd.DataFrame([{key: value for key, value in description["table"].items() if key != "types"}])
+    sections = [
+        f"<h1>{title}</h1>",
+        "<h2>Resumen</h2>", table.to_html(index=False),
+        "<h2>Variables</h2>", summary.to_html(index=False),
+    ]
+    for name, records in description["correlations"].items():
+        sections += [f"<h2>Correlación {html.escape(name)}</h2>", pd.DataFrame(records).to_html(index=False)]
+    if description["missing"]["patterns"]:
+        sections += ["<h2>Patrones de valores faltantes</h2>",
+                     pd.DataFrame(description["missing"]["patterns"]).to_html(index=False)]
+    if description["alerts"]:
+        sections += ["<h2>Alertas</h2>", "<ul>" + "".join(f"<li>{html.escape(str(alert))}</li>" for alert in description["alerts"]) + "</ul>"]
+    return f"<html><head><meta charset=\"utf-8\"><title>{title}</title></head><body>{''.join(sections)}</body></html>"
+
+
+def render_sharded_profile(df: pd.DataFrame, title: str, outputs: Sequence[str] = OUTPUT_FORMATS,
+                           shard_columns: int = WIDE_SHARD_COLUMNS,
+                           timings: Optional[Dict[str, float]] = None) -> Dict[str, str]:
+    """
+    Perfila una tabla ancha por grupos de columnas en paralelo y genera en memoria los formatos solicitados.
+
+    Las estadísticas por variable de cada grupo se calculan en los procesos del pool y se unen en una
+    sola descripción; los análisis entre columnas se calculan una vez en la etapa `cross_column`.
+    El CSV tiene el mismo formato que el que genera `render_profile`.
+
+    Args:
+        df (pd.DataFrame): DataFrame a ser perfilado.
+        title (str): Título del reporte.
+        outputs (Sequence[str]): Formatos a generar ('html', 'json', 'csv').
+        shard_columns (int): Columnas por grupo.
+        timings (Optional[Dict[str, float]]): Diccionario donde se registra la duración de cada etapa.
+
+    Returns:
+        Dict[str, str]: Formato -> contenido generado.
+    """
+    column_groups = split_columns(df.columns, shard_columns)
+    logger.info("Perfilando '{}' en {} grupos de hasta {} columnas.", title, len(column_groups), shard_columns)
+
+    with timed_stage(timings, "column_groups"):
+        if len(column_groups) > 1:
+            shards = get_column_group_pool().run_column_groups(profile_column_group, df, column_groups, title)
+        else:
+            shards = [profile_column_group(df, title)]
+
+    with timed_stage(timings, "cross_column"):
+        cross_column = cross_column_analysis(df)
+
+    description = merge_shards(shards, cross_column, len(df), int(df.memory_usage(deep=True).sum()))
+    summary = summary_from_variables(description["variables"])
+    rendered: Dict[str, str] = {}
+    if "html" in outputs:
+        rendered["html"] = _render_html(description, summary, title)
+    if "json" in outputs:
+        rendered["json"] = json.dumps(description, indent=4)
+    if "csv" in outputs:
+        rendered["csv"] = summary.to_csv(index=False)
+
+    logger.info("Reporte '{}' generado por grupos de columnas en los formatos: {}.", title, list(rendered))
+    return rendered
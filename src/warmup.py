@@ -0,0 +1,102 @@
+from typing import Dict, Any, List, Sequence
+import importlib
+import os
+import sys
+import time
+import pandas as pd
+from profiling_pool import get_profiling_pool
+from report_renderer import render_profile
+from logger_config import get_logger
+
+# Configuración de logs
+logger = get_logger()
+
+# Precarga las librerías del perfilado y genera un reporte de prueba antes de aceptar peticiones
+WARMUP_ON_STARTUP = os.environ.get('WARMUP_ON_STARTUP', 'false').lower() in ('1', 'true', 'yes')
+# Librerías que se cargan en el primer uso y que el calentamiento importa por adelantado
+PROFILING_MODULES = ("ydata_profiling", "ydata_profiling.model.summarizer")
+WARMUP_MODULES = PROFILING_MODULES + ("boto3", "boto3.s3.transfer", "botocore.config")
+
+
+def import_modules(modules: Sequence[str]) -> Dict[str, float]:
+    """
+    Importa módulos midiendo el tiempo de cada uno.
+
+    Args:
+        modules (Sequence[str]): Nombres de los módulos.
+
+    Returns:
+        Dict[str, float]: Módulo -> segundos de importación (0 si ya estaba cargado).
+    """
+    times: Dict[str, float] = {}
+    for name in modules:
+        start = time.perf_counter()
+        importlib.import_module(name)
+        times[name] = round(time.perf_counter() - start, 3)
+    return times
+
+
+def pending_modules(modules: Sequence[str] = WARMUP_MODULES) -> List[str]:
+    """Lista los módulos que todavía no se cargaron en el proceso."""
+    return [name for name in modules if name not in sys.modules]
+
+
+def _warm_profile() -> None:
+    """
+    Genera en memoria un reporte completo de un DataFrame pequeño.
+
+    Inicializa lo que ydata-profiling prepara en la primera ejecución: el sistema de tipos, los
+    gráficos de matplotlib y la compilación de las plantillas del HTML.
+    """
+    df = pd.DataFrame({
+        "number": [1.0, 2.5, None, 4.0, 2.5, 7.0],
+        "integer": [1, 2, 3, 4, 5, 6],
+        "category": ["a", "b", "a", None, "c", "a"],
+        "flag": [True, False, True, True, False, True],
+        "date": pd.date_range("2024-01-01", periods=6, freq="D"),
+    })
+    render_profile(df, "warmup", outputs=("html", "json", "csv"), tier="full")
+
+
+def warm_worker() -> Dict[str, float]:
+    """
+    Calienta un proceso del pool de perfilado.
+
+    Returns:
+        Dict[str, float]: Tiempos de importación en el proceso.
+    """
+    times = import_modules(PROFILING_MODULES)
+    _warm_profile()
+    return times
+
+
+def warm_up() -> Dict[str, Any]:
+    """
+    Precarga las librerías del perfilado y genera un reporte de prueba en el proceso de la API y en
+    los procesos del pool de perfilado (si está activo).
+
+    Returns:
+        Dict[str, Any]: Tiempos de importación por módulo, duración del reporte de prueba,
+        procesos del pool calentados y duración total.
+    """
+    start = time.perf_counter()
+    imports = import_modules(WARMUP_MODULES)
+
+    profile_start = time.perf_counter()
+    _warm_profile()
+    profile_seconds = round(time.perf_counter() - profile_start, 3)
+
+    pool_workers = 0
+    pool = get_profiling_pool()
+    if pool is not None:
+        pool_workers = len(pool.warm_up(warm_worker))
+
+    result = {
+        "imports": imports,
+        "profile_seconds": profile_seconds,
+        "pool_workers": pool_workers,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    logger.info("Calentamiento completado en {} s (reporte de prueba: {} s, "
+                "procesos del pool: {}).", result['seconds'], profile_seconds, pool_workers)
+    return result